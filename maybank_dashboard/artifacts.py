@@ -0,0 +1,65 @@
+import math
+import os
+import threading
+
+import pandas as pd
+
+
+# Penyimpanan artefak hasil pipeline (HTML jaringan dan workbook ranking) di memori.
+# Tiap file dibaca sekali; entri dibaca ulang hanya bila mtime/ukuran file berubah.
+class ArtifactStore:
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _get(self, path, loader):
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            item = self._items.get(path)
+            if item is not None and item[0] == stamp:
+                return item[1]
+
+        value = loader(path)
+        with self._lock:
+            self._items[path] = (stamp, value)
+            self.loads += 1
+        return value
+
+    def html(self, path):
+        def read(p):
+            with open(p, "r", encoding="utf-8") as f:
+                return f.read()
+        return self._get(path, read)
+
+    # Semua sheet workbook ranking: list DataFrame sesuai urutan sheet
+    def rankings(self, path):
+        def read(p):
+            sheets = pd.read_excel(p, sheet_name=None)
+            return [frame.set_axis(['Entity', 'Score'], axis=1) for frame in sheets.values()]
+        return self._get(path, read)
+
+    # Tabel CSV hasil pipeline (mis. df_metric.csv, nodes.csv)
+    def table(self, path):
+        return self._get(path, pd.read_csv)
+
+    # Satu halaman tabel ranking -> (DataFrame, jumlah halaman)
+    def rankings_page(self, path, sheet, page=1, page_size=10):
+        frame = self.rankings(path)[sheet]
+        n_pages = max(1, math.ceil(len(frame) / page_size))
+        page = min(max(page, 1), n_pages)
+        start = (page - 1) * page_size
+        return frame.iloc[start:start + page_size], n_pages
+
+    # Muat semua artefak yang ada sekaligus (file yang belum ada dilewati)
+    def preload(self, html_paths=(), ranking_paths=()):
+        for path in html_paths:
+            if os.path.exists(path):
+                self.html(path)
+        for path in ranking_paths:
+            if os.path.exists(path):
+                self.rankings(path)
+
+
+ARTIFACTS = ArtifactStore()
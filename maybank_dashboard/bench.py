@@ -0,0 +1,758 @@
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from centrality import betweenness, closeness, pagerank
+from dashboard_cube import build_dashboard_cube
+from edges import add_edge_columns, build_edge_columns, network_edge_columns
+from entity_index import EntityIndex, ego_network
+from filter_index import FilterIndex
+from flow_trace import FlowIndex, trace_flows
+from graph_core import ArrayGraph, top_k
+from ingest import (SOURCE_XLSX, build_cache, load_transactions, prepare_transactions, read_cache, read_source,
+                    stream_edge_table)
+from network_view import build_top_view, collapse_by_bank, compute_layout, render_network_html
+from pipeline import RANKINGS, peak_rss_mb, run_pipeline
+from pipeline import parse_args as parse_pipeline_args
+from query_service import QueryService, start_server
+from render_cache import RenderCache, filter_key
+from sensitivity import core_candidates
+from synthetic import generate_transactions, write_transactions
+from warmup import Warmup
+
+
+# Data contoh dengan skema yang sama seperti workbook transaksi
+def sample_transactions(n_rows, n_entities=5000, n_banks=20, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"N{i}" for i in range(n_entities)], dtype=object)
+    banks = np.array([f"B{i}" for i in range(1, n_banks + 1)], dtype=object)
+    return pd.DataFrame({
+        'debitor_name': names[rng.integers(0, n_entities, n_rows)],
+        'debitor_bank': 'B1',
+        'sender_recipient_name': names[rng.integers(0, n_entities, n_rows)],
+        'sender_recipient_bank': banks[rng.integers(0, n_banks, n_rows)],
+        'type': np.where(rng.random(n_rows) < 0.5, 'INCOMING', 'OUTGOING'),
+        'amount_tx_idr': rng.lognormal(16, 2, n_rows).round(2),
+        'trx': rng.integers(1, 50, n_rows),
+    })
+
+
+# Implementasi lama load_data (apply per baris) sebagai pembanding; juga acuan
+# di tests/test_edges.py
+def legacy_edge_columns(df):
+    def get_transaction_direction(row):
+        if row['type'].upper() == 'INCOMING':
+            return pd.Series({
+                'source': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})",
+                'target': f"{row['debitor_name']} ({row['debitor_bank']})"
+            })
+        elif row['type'].upper() == 'OUTGOING':
+            return pd.Series({
+                'source': f"{row['debitor_name']} ({row['debitor_bank']})",
+                'target': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})"
+            })
+        return pd.Series({'source': None, 'target': None})
+
+    return df.apply(get_transaction_direction, axis=1)
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_edge_direction(sizes, legacy_limit=50_000):
+    rows = []
+    for n in sizes:
+        df = sample_transactions(n)
+        t_new, new = timed(build_edge_columns, df, repeat=3)
+        row = {'rows': n, 'vectorized_s': round(t_new, 4)}
+        if n <= legacy_limit:
+            t_old, old = timed(legacy_edge_columns, df)
+            pd.testing.assert_frame_equal(new, old[['source', 'target']], check_dtype=False)
+            row['apply_s'] = round(t_old, 4)
+            row['speedup'] = round(t_old / t_new, 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# Cold start: parse workbook langsung vs baca cache Feather yang di-memory-map
+def bench_cold_start(src=SOURCE_XLSX, cache_dir=".cache-bench"):
+    t_excel, _ = timed(lambda: pd.read_excel(src).drop_duplicates())
+    t_build, data_path = timed(build_cache, src, cache_dir)
+    t_cache, df = timed(read_cache, data_path, repeat=3)
+    return pd.DataFrame([{
+        'rows': len(df),
+        'read_excel_s': round(t_excel, 3),
+        'build_cache_s': round(t_build, 3),
+        'read_cache_s': round(t_cache, 4),
+        'cache_mb': round(os.path.getsize(data_path) / 1e6, 2),
+        'speedup': round(t_excel / t_cache, 1),
+    }])
+
+
+# Implementasi lama core_candidates (loop per sampel) sebagai pembanding; juga
+# acuan di tests/test_sensitivity.py
+def legacy_core_candidates(df, metrics, k=20, n_samples=100, seed=42, thresh=0.8):
+    rng = np.random.RandomState(seed)
+    freq = pd.Series(0, index=df['node'].values, dtype=int)
+
+    for _ in range(n_samples):
+        w = rng.rand(len(metrics))
+        w = w / w.sum()
+
+        score = sum(df[m] * w_i for m, w_i in zip(metrics, w))
+        rank = score.rank(ascending=False, method='min')
+        idx_topk = rank.nsmallest(k).index
+        nodes_topk = df.loc[idx_topk, 'node'].values
+        freq.loc[nodes_topk] += 1
+
+    freq = freq / n_samples
+    return freq[freq >= thresh].sort_values(ascending=False)
+
+
+# Metrik acak ber-skala 0..1 dengan banyak nilai kembar (mirip hasil MinMaxScaler)
+def sample_metrics(n_nodes, metrics, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {'node': [f"N{i}|B1" for i in range(n_nodes)]}
+    for m in metrics:
+        values = rng.pareto(2.0, n_nodes)
+        values[rng.random(n_nodes) < 0.3] = 0
+        data[m] = values / values.max()
+    return pd.DataFrame(data)
+
+
+def bench_core_candidates(n_nodes, samples_list, metrics=('amt_in_deg', 'amt_betweenness', 'amt_pagerank'),
+                          legacy_limit=1_000):
+    df = sample_metrics(n_nodes, metrics)
+    rows = []
+    for n_samples in samples_list:
+        t_new, new = timed(core_candidates, df, list(metrics), n_samples=n_samples, seed=0, thresh=0.1)
+        row = {'nodes': n_nodes, 'n_samples': n_samples, 'batched_s': round(t_new, 4)}
+        if n_samples <= legacy_limit:
+            t_old, old = timed(legacy_core_candidates, df, list(metrics), n_samples=n_samples, seed=0, thresh=0.1)
+            pd.testing.assert_series_equal(new, old)
+            row['loop_s'] = round(t_old, 4)
+            row['speedup'] = round(t_old / t_new, 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def sample_graph(n_rows, seed=0):
+    df = add_edge_columns(sample_transactions(n_rows, n_entities=max(100, n_rows // 5), seed=seed))
+    return ArrayGraph.from_edge_frame(df)
+
+
+# Skala betweenness (3 pembobotan sekaligus) per jumlah core dan ukuran graf
+def bench_betweenness(sizes, workers_list, k=None):
+    rows = []
+    for n in sizes:
+        graph = sample_graph(n)
+        base = None
+        for workers in workers_list:
+            t, _ = timed(betweenness, graph, k=k, seed=0, workers=workers)
+            base = base or t
+            rows.append({'rows': n, 'nodes': graph.n_nodes, 'edges': graph.n_edges,
+                         'workers': workers, 'seconds': round(t, 3), 'speedup': round(base / t, 2)})
+    return pd.DataFrame(rows)
+
+
+# Node top-N + edge di antaranya, format sama dengan build_network_view
+def sample_view(n_nodes, seed=0):
+    graph = sample_graph(n_nodes * 4, seed)
+    values = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+    degree = graph.degree()
+    top_ids = top_k(values, n_nodes)
+    nodes = pd.DataFrame({'node': graph.names[top_ids], 'tx_value': values[top_ids], 'degree': degree[top_ids]})
+    return nodes, graph.subgraph(top_ids).edge_frame(), degree.max()
+
+
+# Render jaringan tab 2: physics di browser (lama) vs layout server (+LOD)
+def bench_render(sizes, lod_keep=300):
+    rows = []
+    for n in sizes:
+        nodes, edges, max_degree = sample_view(n)
+        t_old, html_old = timed(render_network_html, nodes, edges, max_degree, physics=True)
+        t_layout, laid_out = timed(compute_layout, nodes, edges)
+        t_new, html_new = timed(render_network_html, laid_out, edges, max_degree)
+
+        def lod_path():
+            lod_nodes, lod_edges = collapse_by_bank(nodes, edges, lod_keep)
+            return render_network_html(compute_layout(lod_nodes, lod_edges), lod_edges, max_degree)
+
+        t_lod, html_lod = timed(lod_path)
+        rows.append({
+            'nodes': len(nodes), 'edges': len(edges),
+            'physics_s': round(t_old, 3), 'physics_kb': len(html_old) // 1024,
+            'layout_s': round(t_layout + t_new, 3), 'layout_kb': len(html_new) // 1024,
+            'lod_s': round(t_lod, 3), 'lod_kb': len(html_lod) // 1024,
+        })
+    return pd.DataFrame(rows)
+
+
+# Banyak sesi bersamaan meminta beberapa view yang sama: file temp bersama (lama)
+# vs cache LRU di memori. Dihitung juga berapa respons yang tertukar antar sesi.
+def bench_render_cache(sessions=24, n_views=6, requests=5, n_nodes=200):
+    samples = [sample_view(n_nodes, seed) for seed in range(n_views)]
+    views = [compute_layout(nodes, view_edges) for nodes, view_edges, _ in samples]
+    edges = [view_edges for _, view_edges, _ in samples]
+    expected = [render_network_html(views[i], edges[i], n_nodes) for i in range(n_views)]
+    plan = [[(s + r) % n_views for r in range(requests)] for s in range(sessions)]
+    path = os.path.join(tempfile.gettempdir(), "network_graph_bench.html")
+
+    def legacy_session(view_ids):
+        wrong = 0
+        for i in view_ids:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(render_network_html(views[i], edges[i], n_nodes))
+            with open(path, "r", encoding="utf-8") as f:
+                wrong += f.read() != expected[i]
+        return wrong
+
+    cache = RenderCache(max_entries=n_views)
+
+    def cached_session(view_ids):
+        wrong = 0
+        for i in view_ids:
+            key = filter_key(view=i, top_n=n_nodes)
+            wrong += cache.get_or_render(key, render_network_html, views[i], edges[i], n_nodes) != expected[i]
+        return wrong
+
+    rows = []
+    for name, fn in [('temp_file', legacy_session), ('lru_cache', cached_session)]:
+        with ThreadPoolExecutor(sessions) as pool:
+            t, wrong = timed(lambda: sum(pool.map(fn, plan)))
+        rows.append({'mode': name, 'sessions': sessions, 'requests': sessions * requests,
+                     'seconds': round(t, 3), 'wrong_views': wrong})
+    os.remove(path)
+
+    stats = cache.stats()
+    assert stats['misses'] == n_views and rows[1]['wrong_views'] == 0
+    rows[1].update(hits=stats['hits'], misses=stats['misses'], waits=stats['waits'])
+    return pd.DataFrame(rows)
+
+
+# Pekerjaan tab Dashboard per rerun versi lama (regex + sort + groupby penuh)
+def legacy_dashboard_rerun(df, nodes_df, edges_df):
+    is_b1 = nodes_df['entity'].str.contains(r'\(B1\)', na=False)
+    kpis = (nodes_df[is_b1].shape[0], nodes_df[~is_b1].shape[0], edges_df.shape[0],
+            edges_df[(edges_df['type'] == 'INCOMING') & edges_df['target'].str.contains(r'\(B1\)', na=False)]['amount_tx_idr'].sum(),
+            edges_df[(edges_df['type'] == 'OUTGOING') & edges_df['source'].str.contains(r'\(B1\)', na=False)]['amount_tx_idr'].sum())
+    edges_df['source'].str.extract(r'\((B\d+)\)')[0].value_counts()
+    top5 = df.sort_values(by="amount_tx_idr", ascending=False).head(5)
+    types = df.groupby('type', observed=True).agg(Count=('type', 'count'), Total_Amount=('amount_tx_idr', 'sum'))
+    partner_stats = edges_df.copy()
+    partner_stats['Bank'] = partner_stats['source'].str.extract(r'\((B\d+)\)')[0]
+    partners = partner_stats.groupby('Bank').agg(Count=('Bank', 'size'), Total_Amount=('amount_tx_idr', 'sum'))
+    return kpis, top5, types, partners
+
+
+# Rerun tab Dashboard yang hanya membaca tabel agregat
+def cube_dashboard_rerun(cube):
+    kpis = (cube['n_maybank_nodes'], cube['n_external_entities'], cube['n_connections'],
+            cube['incoming_amount'], cube['outgoing_amount'])
+    return kpis, cube['top_transactions'].head(5), cube['type_summary'], cube['bank_partners'].head(10)
+
+
+def bench_dashboard(sizes, repeat=5):
+    rows = []
+    for n in sizes:
+        df = add_edge_columns(sample_transactions(n))
+        graph = ArrayGraph.from_edge_frame(df)
+        edges_df = graph.edge_frame().rename(columns={'weight_amount': 'amount_tx_idr'})
+        nodes_df = pd.DataFrame({'entity': graph.names})
+        t_build, cube = timed(build_dashboard_cube, df, nodes_df, edges_df)
+        t_old, old = timed(legacy_dashboard_rerun, df, nodes_df, edges_df, repeat=repeat)
+        t_new, new = timed(cube_dashboard_rerun, cube, repeat=repeat)
+        assert old[0][:3] == new[0][:3] and np.allclose(old[0][3:], new[0][3:])
+        rows.append({'rows': n, 'edges': len(edges_df), 'cube_build_s': round(t_build, 4),
+                     'rerun_old_s': round(t_old, 4), 'rerun_cube_s': round(t_new, 6)})
+    return pd.DataFrame(rows)
+
+
+# Puncak alokasi memori (tracemalloc) satu pemanggilan; waktu diukur terpisah
+# karena tracemalloc memperlambat alokasi objek Python
+def peak_memory(fn, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# RSS saat ini (Linux /proc); di platform lain jatuh ke peak RSS
+def current_rss_mb():
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()[0]
+
+
+# Satu skenario memori di proses baru. legacy: st.cache_data memberi setiap sesi
+# salinan hasil unpickle dari frame bertipe object. shared: semua sesi memegang
+# referensi ke frame kategori yang di-memory-map dari cache Feather.
+def _session_memory(path, cache_dir, mode, sessions):
+    columns = ['source', 'target', 'amount_tx_idr', 'trx', 'type']
+    if mode == 'legacy':
+        df = add_edge_columns(read_source(path).drop_duplicates())
+        payload = pickle.dumps((df, df[columns]))
+        del df
+        base = current_rss_mb()
+        held = [pickle.loads(payload) for _ in range(sessions)]
+    else:
+        df = load_transactions(path, cache_dir)
+        base = current_rss_mb()
+        held = [(df, df[columns]) for _ in range(sessions)]
+    # Rerun ringan per sesi (baca kolom, tanpa mengubah data bersama)
+    totals = [graph_df['amount_tx_idr'].sum() for _, graph_df in held]
+    assert len(set(totals)) == 1
+    return base, current_rss_mb()
+
+
+# Laporan RSS untuk N sesi bersamaan, sebelum (salinan per sesi) dan sesudah
+# (frame bersama). Tiap skenario di proses terpisah agar RSS tidak tercampur.
+def bench_session_memory(rows, sessions_list, workdir=".cache-bench"):
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f"sessions_{rows}.parquet")
+    write_transactions(generate_transactions(rows), path)
+    build_cache(path, workdir)
+
+    context = multiprocessing.get_context("spawn")
+    result = []
+    for mode in ('legacy', 'shared'):
+        for sessions in sessions_list:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                base, rss = pool.submit(_session_memory, path, workdir, mode, sessions).result()
+            result.append({'rows': rows, 'mode': mode, 'sessions': sessions, 'data_rss_mb': base,
+                           'rss_mb': rss, 'per_session_mb': round((rss - base) / sessions, 2)})
+    os.remove(path)
+    return pd.DataFrame(result)
+
+
+# Ingestion in-memory (read + drop_duplicates + agregasi) vs streaming per chunk.
+# Graf hasil keduanya harus identik (node, edge, bobot, tipe).
+def bench_stream_ingest(sizes, chunk_rows=100_000, dup_fraction=0.1, workdir=".cache-bench"):
+    os.makedirs(workdir, exist_ok=True)
+    rows = []
+    for n in sizes:
+        df = sample_transactions(n)
+        df = pd.concat([df, df.sample(frac=dup_fraction, random_state=0)], ignore_index=True)
+        path = os.path.join(workdir, f"stream_{n}.csv")
+        df.to_csv(path, index=False)
+        del df
+
+        def in_memory():
+            return ArrayGraph.from_edge_frame(prepare_transactions(read_source(path)))
+
+        t_mem, full = timed(in_memory)
+        t_stream, table = timed(stream_edge_table, path, chunk_rows)
+        peak_mem = peak_memory(in_memory)
+        peak_stream = peak_memory(stream_edge_table, path, chunk_rows)
+        streamed = ArrayGraph.from_edge_frame(table.edge_frame())
+
+        assert np.array_equal(full.names, streamed.names)
+        assert np.array_equal(full.src, streamed.src) and np.array_equal(full.dst, streamed.dst)
+        assert np.array_equal(full.edge_type, streamed.edge_type)
+        for w in ('weight_amount', 'weight_trx'):
+            assert np.array_equal(full.weights[w], streamed.weights[w])
+
+        rows.append({'rows': table.rows_read, 'unique_rows': table.rows_kept, 'edges': streamed.n_edges,
+                     'memory_s': round(t_mem, 2), 'memory_peak_mb': peak_mem // 2**20,
+                     'stream_s': round(t_stream, 2), 'stream_peak_mb': peak_stream // 2**20})
+        os.remove(path)
+    return pd.DataFrame(rows)
+
+
+# Filter tab 2 (rentang amount + tipe): mask boolean penuh vs FilterIndex.
+# Graf dari kedua jalur harus identik.
+def bench_filter(sizes, repeat=5):
+    rows = []
+    for n in sizes:
+        df = prepare_transactions(sample_transactions(n))
+        t_build, index = timed(FilterIndex, df)
+        lo, hi = df['amount_tx_idr'].quantile([0.4, 0.6])
+        for types in (['INCOMING'], ['INCOMING', 'OUTGOING']):
+            def mask_filter():
+                return df[(df['amount_tx_idr'] >= lo) & (df['amount_tx_idr'] <= hi) & df['type'].isin(types)]
+
+            t_mask, filtered = timed(mask_filter, repeat=repeat)
+            t_index, _ = timed(index.ranges, lo, hi, types, repeat=repeat)
+            t_graph_mask, expected = timed(lambda: ArrayGraph.from_edge_frame(mask_filter()))
+            t_graph_index, graph = timed(index.graph, lo, hi, types)
+            assert np.array_equal(expected.names, graph.names) and np.array_equal(expected.src, graph.src)
+            assert np.array_equal(expected.weights['weight_amount'], graph.weights['weight_amount'])
+            rows.append({'rows': n, 'types': len(types), 'selected': len(filtered),
+                         'index_build_s': round(t_build, 3),
+                         'mask_s': round(t_mask, 4), 'searchsorted_s': round(t_index, 6),
+                         'graph_mask_s': round(t_graph_mask, 3), 'graph_index_s': round(t_graph_index, 3)})
+    return pd.DataFrame(rows)
+
+
+# Pencarian entitas (scan str.contains vs EntityIndex) dan ego-network k-hop
+# di sekitar node dengan degree tertinggi. Graf kecil divalidasi terhadap
+# networkx.ego_graph (tanpa batas fan-out).
+def bench_ego(sizes, hops=2, fanout=10, nx_limit=100_000, repeat=5):
+    rows = []
+    for n in sizes:
+        df = prepare_transactions(generate_transactions(n))
+        graph = ArrayGraph.from_edge_frame(df)
+        t_build, index = timed(EntityIndex, graph.names)
+        names = pd.Series(graph.names)
+        query = graph.names[graph.n_nodes // 2][2:6].lower()
+        t_scan, expected = timed(lambda: np.flatnonzero(names.str.lower().str.contains(query, regex=False)), repeat=repeat)
+        t_search, found = timed(index.substring, query, len(expected), repeat=repeat)
+        assert np.array_equal(np.sort(found), expected)
+
+        degree = graph.degree()
+        centers = top_k(degree, 3)
+        if n <= nx_limit:
+            import networkx as nx
+            G = graph.to_networkx().to_undirected(as_view=True)
+            for c in centers:
+                ids, _, edge_ids = ego_network(graph, c, hops, fanout=None)
+                assert set(graph.names[ids]) == set(nx.ego_graph(G, graph.names[c], radius=hops))
+        for c in centers:
+            t_ego, (ids, hop, edge_ids) = timed(ego_network, graph, c, hops, fanout, repeat=repeat)
+            rows.append({'rows': n, 'nodes': graph.n_nodes, 'center_degree': int(degree[c]),
+                         'index_build_s': round(t_build, 3), 'scan_s': round(t_scan, 4),
+                         'search_s': round(t_search, 6), 'ego_s': round(t_ego, 4),
+                         'ego_nodes': len(ids), 'ego_edges': len(edge_ids)})
+    return pd.DataFrame(rows)
+
+
+# Layanan query lewat klien HTTP lokal: artefak pipeline dari data sintetis,
+# response dicek terhadap store langsung (CSV metrik, workbook ranking,
+# FilterIndex), lalu latensi request pertama vs request ter-cache.
+def bench_service(rows=20_000, repeat=20, workdir=".cache-bench"):
+    out_dir = os.path.join(workdir, "service")
+    os.makedirs(out_dir, exist_ok=True)
+    src = os.path.join(workdir, f"service_{rows}.parquet")
+    write_transactions(generate_transactions(rows), src)
+    run_pipeline(parse_pipeline_args(["--src", src, "--out-dir", out_dir, "--cache-dir", workdir,
+                                      "--betweenness-k", "64", "--force"]))
+
+    service = QueryService(src, out_dir, workdir)
+    server = start_server(service, port=0)
+    base = "http://%s:%d" % server.server_address
+
+    def get(path):
+        with urllib.request.urlopen(base + path) as response:
+            return response.headers['Content-Type'], response.read()
+
+    result = []
+    try:
+        metrics = pd.read_csv(os.path.join(out_dir, 'df_metric.csv'))
+        expected = metrics.sort_values('amt_pagerank', ascending=False, kind='stable')
+        requests = {
+            'nodes': "/nodes?sort=amt_pagerank&page=2&page_size=50",
+            'rankings': "/rankings?weighting=trx&kind=acquisition&format=arrow",
+            'subgraph': "/subgraph?top_n=100&part=edges&format=arrow",
+        }
+        for name, path in requests.items():
+            t_cold, (_, body) = timed(get, path)
+            t_warm, (_, cached) = timed(get, path, repeat=repeat)
+            assert body == cached
+            if name == 'nodes':
+                page = json.loads(body)
+                assert page['total'] == len(metrics) and page['page'] == 2
+                assert [r['node'] for r in page['rows']] == expected['node'].iloc[50:100].tolist()
+            elif name == 'rankings':
+                frame = pa.ipc.open_stream(body).read_pandas()
+                path_xlsx = os.path.join(out_dir, RANKINGS['trx']['excel'])
+                assert frame.equals(pd.read_excel(path_xlsx, sheet_name=1).set_axis(['Entity', 'Score'], axis=1).iloc[:100])
+            else:
+                frame = pa.ipc.open_stream(body).read_pandas()
+                graph = service.index.graph(-np.inf, np.inf, list(service.index.types))
+                values = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+                edges = graph.subgraph(top_k(values, 100)).edge_frame()
+                assert frame['source'].tolist() == edges['source'].iloc[:100].tolist()
+            result.append({'endpoint': name, 'bytes': len(body),
+                           'first_ms': round(t_cold * 1000, 2), 'cached_ms': round(t_warm * 1000, 3)})
+
+        # Latency yang diukur server sendiri (tanpa overhead HTTP client) per endpoint
+        latency = json.loads(get("/stats")[1])['latency']
+        for row in result:
+            stats = latency['/' + row['endpoint']]
+            row.update(requests=stats['count'], server_p50_ms=stats['p50_ms'], server_p95_ms=stats['p95_ms'])
+    finally:
+        server.shutdown()
+        server.server_close()
+    return pd.DataFrame(result)
+
+
+# Interaksi pertama tab 2 (load data -> index -> render tampilan default) tanpa
+# warm-up vs setelah Warmup mengisi cache di thread latar; steady state = request
+# berikutnya dengan key yang sama.
+def bench_warmup(rows, workdir=".cache-bench"):
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f"warmup_{rows}.parquet")
+    write_transactions(generate_transactions(rows), path)
+    build_cache(path, workdir)
+
+    def first_interaction(cache, state):
+        if 'index' not in state:
+            df = load_transactions(path, workdir)
+            state['index'] = FilterIndex(df.assign(**network_edge_columns(df)))
+            state['range'] = (float(df['amount_tx_idr'].min()), float(df['amount_tx_idr'].max()))
+        index, (lo, hi) = state['index'], state['range']
+        key = filter_key(data=path, amount_range=(lo, hi), types=['INCOMING', 'OUTGOING'])
+        return cache.get_or_render(key, filter_render_path, index, lo, hi, ['INCOMING', 'OUTGOING'])
+
+    result = []
+    cold_cache, cold_state = RenderCache(), {}
+    t_cold, _ = timed(first_interaction, cold_cache, cold_state)
+    t_steady, _ = timed(first_interaction, cold_cache, cold_state, repeat=5)
+    result.append({'mode': 'tanpa warm-up', 'first_s': round(t_cold, 4), 'steady_s': round(t_steady, 6)})
+
+    warm_cache, warm_state = RenderCache(), {}
+    warm = Warmup([[('default_view', lambda: first_interaction(warm_cache, warm_state))]]).start()
+    warm.wait()
+    t_first, _ = timed(first_interaction, warm_cache, warm_state)
+    t_steady, _ = timed(first_interaction, warm_cache, warm_state, repeat=5)
+    result.append({'mode': f"warm-up ({warm.elapsed():.2f} s di latar)", 'first_s': round(t_first, 6),
+                   'steady_s': round(t_steady, 6)})
+    os.remove(path)
+    return pd.DataFrame(result)
+
+
+# Penelusuran aliran dana top-K dari hub dan node acak, kedua mode, tujuan bank
+# eksternal vs satu bank. Kebenaran top-K (terhadap enumerasi DFS semua jalur
+# sederhana) diuji di tests/test_flow_trace.py.
+def bench_flow(sizes, k=5, max_hops=4, n_sources=10, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for n in sizes:
+        df = prepare_transactions(generate_transactions(n))
+        graph = ArrayGraph.from_edge_frame(df)
+        t_build, index = timed(FlowIndex, graph)
+        tx_value = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+        sources = np.concatenate([top_k(tx_value, n_sources), rng.choice(graph.n_nodes, n_sources, replace=False)])
+        for mode in ('bottleneck', 'total'):
+            for target_bank in (None, 'B1'):
+                times, n_paths, n_truncated = [], 0, 0
+                for source in sources:
+                    t, (paths, truncated) = timed(trace_flows, index, int(source), None, target_bank, k,
+                                                  max_hops, 0.0, mode)
+                    times.append(t)
+                    n_paths += len(paths)
+                    n_truncated += truncated
+                rows.append({'rows': n, 'nodes': graph.n_nodes, 'edges': graph.n_edges, 'mode': mode,
+                             'target': target_bank or 'eksternal', 'hops': max_hops,
+                             'index_build_s': round(t_build, 3), 'p50_s': round(float(np.median(times)), 4),
+                             'max_s': round(max(times), 4), 'paths': n_paths, 'truncated': n_truncated})
+    return pd.DataFrame(rows)
+
+
+# --- Suite benchmark end-to-end di atas data sintetis ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Jalur tab 2: filter -> graf -> top-N -> subgraph -> LOD + layout -> HTML
+def filter_render_path(index, lo, hi, types, top_n=200, lod_keep=300):
+    return render_network_html(*build_top_view(index, (lo, hi), types, top_n, lod_keep))
+
+
+# Semua tahap utama per skala data. Betweenness memakai `bc_pivots` source
+# (exact bila node <= bc_pivots) dan closeness dihitung untuk `closeness_targets`
+# node acak agar skala 10M baris tetap selesai.
+def bench_suite(scales, bc_pivots=32, closeness_targets=256, workers=None, seed=0,
+                workdir=".cache-bench"):
+    os.makedirs(workdir, exist_ok=True)
+    rows = []
+
+    # Nilai yang dipakai fn selalu lewat argumen (bukan closure) supaya tidak
+    # ikut tertahan / terhapus oleh `del` di akhir tiap skala
+    def record(n, stage, fn, *args, **kwargs):
+        seconds, result = timed(fn, *args, **kwargs)
+        rows.append({'rows': n, 'stage': stage, 'seconds': round(seconds, 4), 'process_peak_rss_mb': peak_rss_mb()[0]})
+        return result
+
+    for n in scales:
+        raw = generate_transactions(n, seed=seed)
+        path = os.path.join(workdir, f"suite_{n}.parquet")
+        write_transactions(raw, path)
+
+        df = record(n, 'load', lambda p: prepare_transactions(read_source(p)), path)
+        record(n, 'edge_columns', build_edge_columns, raw)
+        graph = record(n, 'graph', ArrayGraph.from_edge_frame, df)
+        record(n, 'degrees', lambda g: [(g.in_degree(w), g.out_degree(w)) for w in (None, 'weight_amount', 'weight_trx')],
+               graph)
+
+        k = None if graph.n_nodes <= bc_pivots else bc_pivots
+        record(n, 'betweenness', betweenness, graph, k=k, seed=seed, workers=workers)
+        targets = np.random.default_rng(seed).choice(graph.n_nodes, min(closeness_targets, graph.n_nodes), replace=False)
+        record(n, 'closeness', closeness, graph, nodes=targets, workers=workers)
+        pr = record(n, 'pagerank', pagerank, graph)
+
+        metrics = pd.DataFrame({'node': graph.names, 'in_deg': graph.in_degree('weight_amount'),
+                                'out_deg': graph.out_degree('weight_amount'), 'pagerank': pr['weight_amount']})
+        for col in ('in_deg', 'out_deg', 'pagerank'):
+            metrics[col] = metrics[col] / (metrics[col].max() or 1)
+        record(n, 'core_candidates', core_candidates, metrics, ['in_deg', 'out_deg', 'pagerank'], k=20, n_samples=200)
+
+        index = record(n, 'filter_index', FilterIndex, df)
+        lo, hi = df['amount_tx_idr'].quantile([0.1, 0.9])
+        record(n, 'filter_render', filter_render_path, index, lo, hi, ['INCOMING', 'OUTGOING'])
+
+        for row in rows:
+            if row['rows'] == n:
+                row.update(nodes=graph.n_nodes, edges=graph.n_edges)
+        os.remove(path)
+        del raw, df, graph, index
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'params': {'scales': list(scales), 'bc_pivots': bc_pivots, 'closeness_targets': closeness_targets,
+                       'workers': workers, 'seed': seed},
+        },
+        'results': rows,
+    }
+
+
+# Bandingkan dua file hasil suite (mis. dua commit): rasio waktu baru / lama
+def compare_suites(old, new):
+    keys = ['rows', 'stage']
+    merged = pd.DataFrame(old['results'])[keys + ['seconds']].merge(
+        pd.DataFrame(new['results'])[keys + ['seconds']], on=keys, suffixes=('_old', '_new'))
+    merged['ratio'] = (merged['seconds_new'] / merged['seconds_old']).round(2)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard transaksi")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_edges = sub.add_parser("edges", help="Arah transaksi: apply vs vektor")
+    p_edges.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    p_cold = sub.add_parser("cold-start", help="read_excel vs cache kolumnar")
+    p_cold.add_argument("--src", default=SOURCE_XLSX)
+
+    p_bc = sub.add_parser("betweenness", help="Skala betweenness per core dan ukuran graf")
+    p_bc.add_argument("--sizes", type=int, nargs="+", default=[2_000, 10_000, 50_000])
+    p_bc.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p_bc.add_argument("--k", type=int, default=None, help="Jumlah pivot (mode aproksimasi)")
+
+    p_core = sub.add_parser("core-candidates", help="core_candidates: loop vs batch")
+    p_core.add_argument("--nodes", type=int, default=5_000)
+    p_core.add_argument("--samples", type=int, nargs="+", default=[200, 1_000, 10_000])
+
+    p_render = sub.add_parser("render", help="Render jaringan: physics browser vs layout server")
+    p_render.add_argument("--sizes", type=int, nargs="+", default=[200, 1_000, 5_000])
+    p_render.add_argument("--lod-keep", type=int, default=300)
+
+    p_cache = sub.add_parser("render-cache", help="Render bersamaan: file temp bersama vs cache LRU")
+    p_cache.add_argument("--sessions", type=int, default=24)
+    p_cache.add_argument("--views", type=int, default=6)
+
+    p_dash = sub.add_parser("dashboard", help="Rerun tab Dashboard: scan penuh vs tabel agregat")
+    p_dash.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    p_stream = sub.add_parser("stream-ingest", help="Ingestion in-memory vs streaming per chunk")
+    p_stream.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p_stream.add_argument("--chunk-rows", type=int, default=100_000)
+
+    p_filter = sub.add_parser("filter", help="Filter amount/tipe: mask penuh vs index searchsorted")
+    p_filter.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+
+    p_ego = sub.add_parser("ego", help="Pencarian entitas dan ego-network k-hop")
+    p_ego.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p_ego.add_argument("--hops", type=int, default=2)
+    p_ego.add_argument("--fanout", type=int, default=10)
+
+    p_flow = sub.add_parser("flow", help="Penelusuran aliran dana top-K (best-first search terbatas)")
+    p_flow.add_argument("--sizes", type=int, nargs="+", default=[5_000, 5_000_000])
+    p_flow.add_argument("--k", type=int, default=5)
+    p_flow.add_argument("--max-hops", type=int, default=4)
+
+    p_mem = sub.add_parser("session-memory", help="RSS untuk N sesi: salinan per sesi vs frame bersama")
+    p_mem.add_argument("--rows", type=int, default=1_000_000)
+    p_mem.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+
+    p_service = sub.add_parser("service", help="Layanan query lokal: validasi response dan latensi cache")
+    p_service.add_argument("--rows", type=int, default=20_000)
+
+    p_warm = sub.add_parser("warmup", help="Interaksi pertama tab 2: tanpa vs dengan warm-up latar")
+    p_warm.add_argument("--rows", type=int, default=1_000_000)
+
+    p_suite = sub.add_parser("suite", help="Suite lengkap di data sintetis, hasil disimpan sebagai JSON")
+    p_suite.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    p_suite.add_argument("--bc-pivots", type=int, default=32)
+    p_suite.add_argument("--closeness-targets", type=int, default=256)
+    p_suite.add_argument("--workers", type=int, default=None)
+    p_suite.add_argument("--seed", type=int, default=0)
+    p_suite.add_argument("--out", default="bench_results.json")
+    p_suite.add_argument("--compare", default=None, metavar="OLD_JSON", help="Bandingkan dengan hasil sebelumnya")
+
+    args = parser.parse_args()
+    if args.command == "edges":
+        print(bench_edge_direction(args.sizes).to_string(index=False))
+    elif args.command == "cold-start":
+        print(bench_cold_start(args.src).to_string(index=False))
+    elif args.command == "betweenness":
+        print(bench_betweenness(args.sizes, args.workers, args.k).to_string(index=False))
+    elif args.command == "core-candidates":
+        print(bench_core_candidates(args.nodes, args.samples).to_string(index=False))
+    elif args.command == "render":
+        print(bench_render(args.sizes, args.lod_keep).to_string(index=False))
+    elif args.command == "render-cache":
+        print(bench_render_cache(args.sessions, args.views).to_string(index=False))
+    elif args.command == "dashboard":
+        print(bench_dashboard(args.sizes).to_string(index=False))
+    elif args.command == "stream-ingest":
+        print(bench_stream_ingest(args.sizes, args.chunk_rows).to_string(index=False))
+    elif args.command == "filter":
+        print(bench_filter(args.sizes).to_string(index=False))
+    elif args.command == "ego":
+        print(bench_ego(args.sizes, args.hops, args.fanout).to_string(index=False))
+    elif args.command == "flow":
+        print(bench_flow(args.sizes, args.k, args.max_hops).to_string(index=False))
+    elif args.command == "session-memory":
+        print(bench_session_memory(args.rows, args.sessions).to_string(index=False))
+    elif args.command == "service":
+        print(bench_service(args.rows).to_string(index=False))
+    elif args.command == "warmup":
+        print(bench_warmup(args.rows).to_string(index=False))
+    elif args.command == "suite":
+        suite = bench_suite(args.scales, args.bc_pivots, args.closeness_targets, args.workers, args.seed)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+        print(pd.DataFrame(suite['results']).to_string(index=False))
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                print(compare_suites(json.load(f), suite).to_string(index=False))
@@ -0,0 +1,338 @@
+import math
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+
+import numpy as np
+import pandas as pd
+from networkx.exception import PowerIterationFailedConvergence
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+# Kunci bobot: None = unweighted, selain itu nama kolom bobot di ArrayGraph
+WEIGHTINGS = (None, 'weight_amount', 'weight_trx')
+
+
+# Adjacency keluar dalam bentuk list Python per node (cepat untuk loop Brandes).
+# Unweighted: [v, ...]; weighted: [(v, jarak), ...]
+def adjacency_lists(graph, weight=None):
+    splits = graph.out_indptr[1:-1]
+    targets = np.split(graph.out_indices, splits)
+    if weight is None:
+        return [t.tolist() for t in targets]
+    dist = np.split(graph.weights[weight][graph.out_edge], splits)
+    return [list(zip(t.tolist(), d.tolist())) for t, d in zip(targets, dist)]
+
+
+# --- Shortest path satu sumber (mengikuti networkx agar hasil identik) ---
+
+def _sssp_bfs(adj, s):
+    S = []
+    P = {s: []}
+    sigma = {s: 1.0}
+    D = {s: 0}
+    Q = deque([s])
+    while Q:
+        v = Q.popleft()
+        S.append(v)
+        Dv = D[v]
+        sigmav = sigma[v]
+        for w in adj[v]:
+            if w not in D:
+                Q.append(w)
+                D[w] = Dv + 1
+                sigma[w] = 0.0
+                P[w] = []
+            if D[w] == Dv + 1:
+                sigma[w] += sigmav
+                P[w].append(v)
+    return S, P, sigma
+
+
+def _sssp_dijkstra(adj, s):
+    S = []
+    P = {s: []}
+    sigma = {s: 1.0}
+    D = {}
+    seen = {s: 0}
+    c = count()
+    Q = [(0, next(c), s, s)]
+    while Q:
+        dist, _, pred, v = heappop(Q)
+        if v in D:
+            continue
+        sigma[v] += sigma[pred]
+        S.append(v)
+        D[v] = dist
+        for w, cost in adj[v]:
+            vw_dist = dist + cost
+            if w not in D and (w not in seen or vw_dist < seen[w]):
+                seen[w] = vw_dist
+                heappush(Q, (vw_dist, next(c), v, w))
+                sigma[w] = 0.0
+                P[w] = [v]
+            elif vw_dist == seen[w]:
+                sigma[w] += sigma[v]
+                P[w].append(v)
+    return S, P, sigma
+
+
+def _accumulate(bc, S, P, sigma, s):
+    delta = dict.fromkeys(S, 0.0)
+    while S:
+        w = S.pop()
+        coeff = (1 + delta[w]) / sigma[w]
+        for v in P[w]:
+            delta[v] += sigma[v] * coeff
+        if w != s:
+            bc[w] += delta[w]
+
+
+# --- Worker pool: adjacency dikirim sekali per proses lewat initializer ---
+
+# State per thread: stage pipeline yang berjalan paralel di thread (mis.
+# betweenness dan closeness) tidak saling menimpa adjacency di jalur serial
+_WORKER = threading.local()
+
+
+def _init_worker(adjs, n_nodes):
+    _WORKER.adjs = adjs
+    _WORKER.n_nodes = n_nodes
+
+
+# Jumlah dependency parsial untuk sekumpulan source, semua pembobotan sekaligus
+def _betweenness_chunk(sources):
+    n = _WORKER.n_nodes
+    partial = {}
+    for weight, adj in _WORKER.adjs.items():
+        sssp = _sssp_bfs if weight is None else _sssp_dijkstra
+        bc = [0.0] * n
+        for s in sources:
+            S, P, sigma = sssp(adj, s)
+            _accumulate(bc, S, P, sigma, s)
+        partial[weight] = np.asarray(bc)
+    return partial
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# Jalankan fungsi chunk untuk semua source, paralel bila workers > 1,
+# lalu jumlahkan hasil parsial per pembobotan
+def run_sharded(chunk_fn, adjs, n_nodes, sources, workers=None, chunk_size=None,
+                initializer=_init_worker, initargs=()):
+    workers = workers or os.cpu_count() or 1
+    sources = list(sources)
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(sources) / (workers * 4)))
+
+    total = {weight: np.zeros(n_nodes) for weight in adjs}
+    if workers == 1 or len(sources) <= chunk_size:
+        initializer(adjs, n_nodes, *initargs)
+        partials = map(chunk_fn, _chunks(sources, chunk_size))
+        for partial in partials:
+            for weight, values in partial.items():
+                total[weight] += values
+        return total
+
+    # spawn: aman dipanggil dari thread (mis. stage paralel di pipeline)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=initializer,
+                             initargs=(adjs, n_nodes, *initargs)) as pool:
+        for partial in pool.map(chunk_fn, _chunks(sources, chunk_size)):
+            for weight, values in partial.items():
+                total[weight] += values
+    return total
+
+
+# Jumlah pivot agar galat tiap node <= epsilon dengan peluang 1 - delta
+# (Hoeffding + union bound atas semua node)
+def pivots_for_error(n_nodes, epsilon, delta=0.1):
+    return min(n_nodes, math.ceil(math.log(2 * n_nodes / delta) / (2 * epsilon ** 2)))
+
+
+# Betweenness centrality (Brandes) untuk beberapa pembobotan dalam satu proses.
+# Seperti networkx, bobot edge dipakai sebagai jarak. Mode aproksimasi memakai
+# k pivot acak (atau k dari epsilon/delta) dan diskalakan n/k.
+# sources: hitung hanya kontribusi dari source tertentu (untuk update inkremental).
+def betweenness(graph, weights=WEIGHTINGS, normalized=True, k=None, epsilon=None,
+                delta=0.1, seed=None, workers=None, chunk_size=None, sources=None):
+    n = graph.n_nodes
+    if sources is not None:
+        k = None
+    elif k is None and epsilon is not None:
+        k = pivots_for_error(n, epsilon, delta)
+    if k is not None and k >= n:
+        k = None
+
+    if sources is not None:
+        sources = np.asarray(sources).tolist()
+    elif k is None:
+        sources = range(n)
+    else:
+        rng = np.random.default_rng(seed)
+        sources = rng.choice(n, size=k, replace=False).tolist()
+
+    adjs = {weight: adjacency_lists(graph, weight) for weight in weights}
+    bc = run_sharded(_betweenness_chunk, adjs, n, sources, workers, chunk_size)
+
+    scale = 1.0
+    if normalized and n > 2:
+        scale = 1 / ((n - 1) * (n - 2))
+    if k is not None:
+        scale *= n / k
+    return {weight: values * scale for weight, values in bc.items()}
+
+
+# --- Closeness: Dijkstra/BFS batch dari banyak source di scipy (tanpa lambda Python) ---
+
+# Jarak = 1 / bobot (bobot 0 dianggap jarak 1), sama seperti notebook
+def inverse_weight_distance(values):
+    dist = np.ones_like(values, dtype=np.float64)
+    nonzero = values != 0
+    dist[nonzero] = 1.0 / values[nonzero]
+    return dist
+
+
+# Matriks jarak pada graf terbalik: closeness networkx di DiGraph memakai
+# jarak masuk (dari semua node menuju node tsb)
+def reversed_distance_matrix(graph, weight=None):
+    n = graph.n_nodes
+    if weight is None:
+        data = np.ones(graph.n_edges)
+    else:
+        data = inverse_weight_distance(graph.weights[weight])
+    return csr_matrix((data, (graph.dst, graph.src)), shape=(n, n))
+
+
+def _closeness_chunk(sources):
+    n = _WORKER.n_nodes
+    wf_improved = getattr(_WORKER, 'wf_improved', True)
+    sources = np.asarray(sources)
+    partial = {}
+    for weight, matrix in _WORKER.adjs.items():
+        dist = dijkstra(matrix, directed=True, indices=sources, unweighted=weight is None)
+        reached = np.isfinite(dist)
+        n_reached = reached.sum(axis=1) - 1
+        totsp = np.where(reached, dist, 0.0).sum(axis=1)
+
+        values = np.zeros(len(sources))
+        ok = (totsp > 0) & (n > 1)
+        values[ok] = n_reached[ok] / totsp[ok]
+        if wf_improved and n > 1:
+            values *= n_reached / (n - 1)
+
+        out = np.zeros(n)
+        out[sources] = values
+        partial[weight] = out
+    return partial
+
+
+def _init_closeness_worker(adjs, n_nodes, wf_improved):
+    _init_worker(adjs, n_nodes)
+    _WORKER.wf_improved = wf_improved
+
+
+# Closeness centrality (varian Wasserman-Faust seperti networkx bila
+# wf_improved=True). Matriks jarak dibangun sekali per pembobotan, lalu source
+# diproses per batch agar memori matriks jarak tetap terbatas.
+# nodes: hitung hanya untuk node tertentu (node lain bernilai 0).
+def closeness(graph, weights=WEIGHTINGS, wf_improved=True, workers=None,
+              chunk_size=None, max_batch_cells=4_000_000, nodes=None):
+    n = graph.n_nodes
+    if n == 0:
+        return {weight: np.zeros(0) for weight in weights}
+
+    nodes = range(n) if nodes is None else np.asarray(nodes).tolist()
+    adjs = {weight: reversed_distance_matrix(graph, weight) for weight in weights}
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(math.ceil(len(nodes) / (workers * 4)), max_batch_cells // n))
+
+    return run_sharded(_closeness_chunk, adjs, n, nodes, workers, chunk_size,
+                       initializer=_init_closeness_worker, initargs=(wf_improved,))
+
+
+# --- PageRank: satu pola sparse untuk semua pembobotan ---
+
+# Bobot edge per pembobotan (kolom) dan peluang transisi src -> dst
+def _transition_block(graph, weights):
+    n = graph.n_nodes
+    W = np.column_stack([
+        np.ones(graph.n_edges) if weight is None else graph.weights[weight]
+        for weight in weights
+    ])
+    out_sum = np.zeros((n, len(weights)))
+    np.add.at(out_sum, graph.src, W)
+    dangling = out_sum == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P = np.where(dangling[graph.src], 0.0, W / out_sum[graph.src])
+    return P, dangling
+
+
+# Vektor awal: hasil run sebelumnya (Series per nama node) disejajarkan ke
+# node graf sekarang; node baru diberi 1/N, lalu dinormalisasi
+def _start_vector(graph, previous):
+    n = graph.n_nodes
+    if previous is None:
+        return np.full(n, 1.0 / n)
+    if isinstance(previous, pd.Series):
+        x = previous.reindex(graph.names).to_numpy(dtype=np.float64)
+        x = np.where(np.isnan(x), 1.0 / n, x)
+    else:
+        x = np.asarray(previous, dtype=np.float64)
+    return x / x.sum()
+
+
+# PageRank untuk beberapa pembobotan sekaligus. Tiap iterasi memakai satu
+# perkalian sparse x dense: matriks insiden edge->target (pola bersama) dikali
+# kontribusi edge berukuran (E x jumlah_pembobotan). Penanganan dangling node,
+# toleransi dan kriteria konvergensi sama dengan nx.pagerank.
+# nstart: {weight: Series/array} dari run sebelumnya untuk warm-start.
+# return_iterations=True: kembalikan juga jumlah iterasi per pembobotan.
+def pagerank(graph, weights=WEIGHTINGS, alpha=0.85, tol=1.0e-6, max_iter=100,
+             nstart=None, return_iterations=False):
+    n = graph.n_nodes
+    weights = list(weights)
+    if n == 0:
+        scores = {weight: np.zeros(0) for weight in weights}
+        return (scores, {weight: 0 for weight in weights}) if return_iterations else scores
+
+    incidence = csr_matrix(
+        (np.ones(graph.n_edges), (graph.dst, np.arange(graph.n_edges))),
+        shape=(n, graph.n_edges),
+    )
+    P, dangling = _transition_block(graph, weights)
+    p = np.full(n, 1.0 / n)
+
+    nstart = nstart or {}
+    x = np.column_stack([_start_vector(graph, nstart.get(weight)) for weight in weights])
+    active = np.ones(len(weights), dtype=bool)
+    iterations = np.zeros(len(weights), dtype=int)
+
+    for _ in range(max_iter):
+        cols = np.flatnonzero(active)
+        xlast = x[:, cols]
+        spread = incidence @ (xlast[graph.src] * P[:, cols])
+        dangling_mass = (xlast * dangling[:, cols]).sum(axis=0)
+        x_new = alpha * (spread + np.outer(p, dangling_mass)) + (1 - alpha) * p[:, None]
+
+        x[:, cols] = x_new
+        iterations[cols] += 1
+        err = np.abs(x_new - xlast).sum(axis=0)
+        active[cols[err < n * tol]] = False
+        if not active.any():
+            break
+    else:
+        raise PowerIterationFailedConvergence(max_iter)
+
+    scores = {weight: x[:, i] for i, weight in enumerate(weights)}
+    if return_iterations:
+        return scores, dict(zip(weights, iterations.tolist()))
+    return scores
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from graph_core import top_k
+
+B1_PATTERN = r'\(B1\)'
+BANK_PATTERN = r'\((B\d+)\)'
+
+
+# Kode bank (kategori) dari nama entity "NAMA (B14)", di-parse sekali saat load
+def parse_bank(entities):
+    return entities.str.extract(BANK_PATTERN)[0].astype('category')
+
+
+# Tabel agregat kecil untuk tab Dashboard, dihitung sekali saat data dimuat.
+# Kartu KPI dan grafik hanya membaca tabel ini sehingga rerun tidak lagi
+# melakukan scan regex / copy penuh atas data transaksi.
+def build_dashboard_cube(df, nodes_df=None, edges_df=None, k=10):
+    cube = {}
+
+    # Top-K transaksi tertinggi + label grafik; amount kosong (NaN) di urutan
+    # terakhir seperti sort_values(ascending=False)
+    top_ids = top_k(df['amount_tx_idr'].to_numpy(dtype=np.float64), k)
+    top = df.iloc[top_ids][['debitor_name', 'sender_recipient_name', 'amount_tx_idr']].copy()
+    top['label'] = top['debitor_name'].astype(str) + " → " + top['sender_recipient_name'].astype(str)
+    cube['top_transactions'] = top.reset_index(drop=True)
+
+    # Ringkasan per tipe transaksi
+    cube['type_summary'] = df.groupby('type', observed=True).agg(
+        Count=('type', 'count'),
+        Total_Amount=('amount_tx_idr', 'sum')
+    ).reset_index().rename(columns={'type': 'Type'})
+
+    if nodes_df is None or edges_df is None:
+        return cube
+
+    is_b1 = nodes_df['entity'].str.contains(B1_PATTERN, na=False)
+    cube['n_maybank_nodes'] = int(is_b1.sum())
+    cube['n_external_entities'] = int((~is_b1).sum())
+    cube['n_connections'] = len(edges_df)
+
+    # Cube (bank pengirim, pengirim B1?, penerima B1?, tipe) -> jumlah & nominal
+    flows = pd.DataFrame({
+        'bank': parse_bank(edges_df['source']),
+        'source_b1': edges_df['source'].str.contains(B1_PATTERN, na=False),
+        'target_b1': edges_df['target'].str.contains(B1_PATTERN, na=False),
+        'type': edges_df['type'].astype('category'),
+        'amount_tx_idr': edges_df['amount_tx_idr'],
+    })
+    flows = flows.groupby(['bank', 'source_b1', 'target_b1', 'type'], observed=True, dropna=False).agg(
+        Count=('amount_tx_idr', 'size'),
+        Total_Amount=('amount_tx_idr', 'sum')
+    ).reset_index()
+    cube['flows'] = flows
+
+    cube['incoming_amount'] = flows.loc[(flows['type'] == 'INCOMING') & flows['target_b1'], 'Total_Amount'].sum()
+    cube['outgoing_amount'] = flows.loc[(flows['type'] == 'OUTGOING') & flows['source_b1'], 'Total_Amount'].sum()
+
+    # Bank partner (selain Maybank) diurutkan berdasarkan jumlah transaksi
+    partners = flows.groupby('bank', observed=True).agg(
+        Count=('Count', 'sum'),
+        Total_Amount=('Total_Amount', 'sum')
+    ).reset_index().rename(columns={'bank': 'Bank'})
+    partners['Bank'] = partners['Bank'].astype(str)
+    partners = partners[partners['Bank'] != 'B1']
+    cube['bank_partners'] = partners.sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
+    return cube
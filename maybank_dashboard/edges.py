@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+
+# Gabungkan nama + kode bank jadi key node, misal "NAMA (B1)". Nilai kosong
+# ditulis "nan" seperti f-string di load_data lama (pandas 3 mempertahankan
+# NaN pada astype(str)).
+def entity_key(names, banks):
+    return names.astype(str).fillna("nan") + " (" + banks.astype(str).fillna("nan") + ")"
+
+
+# Key node versi notebook/pipeline metrik, misal "NAMA|B1". Nilai kosong ditulis
+# "nan" sehingga entitas tanpa bank tetap terpisah per nama. Ini berbeda dari
+# notebook: penjumlahan Series di sana menghasilkan NaN untuk baris tsb.
+def pipe_key(names, banks):
+    return names.astype(str).fillna("nan").str.strip() + "|" + banks.astype(str).fillna("nan")
+
+
+# Arah transaksi secara vektor (tanpa apply per baris):
+# INCOMING  -> lawan transaksi mengirim ke debitor
+# OUTGOING  -> debitor mengirim ke lawan transaksi
+# tipe lain -> source/target None (dashboard, tanpa membedakan huruf besar/kecil)
+# notebook=True mengikuti graf metrik notebook: hanya tipe persis 'INCOMING'
+# yang masuk, semua tipe lain diperlakukan sebagai OUTGOING
+def build_edge_columns(df, key=entity_key, notebook=False):
+    if notebook:
+        incoming = (df['type'].astype(str) == 'INCOMING').to_numpy()
+        outgoing = ~incoming
+    else:
+        tipe = df['type'].astype(str).str.upper()
+        incoming = (tipe == 'INCOMING').to_numpy()
+        outgoing = (tipe == 'OUTGOING').to_numpy()
+
+    debitor = key(df['debitor_name'], df['debitor_bank']).to_numpy(dtype=object)
+    lawan = key(df['sender_recipient_name'], df['sender_recipient_bank']).to_numpy(dtype=object)
+
+    source = np.where(incoming, lawan, np.where(outgoing, debitor, None))
+    target = np.where(incoming, debitor, np.where(outgoing, lawan, None))
+    return pd.DataFrame({'source': source, 'target': target}, index=df.index)
+
+
+# Tambahkan kolom source/target ke salinan df
+def add_edge_columns(df, key=entity_key):
+    return df.assign(**build_edge_columns(df, key))
+
+
+# Arah edge tab Network Analysis seperti dashboard lama: selain INCOMING (tanpa
+# membedakan huruf besar/kecil) semua tipe dianggap OUTGOING. Kolom source/target
+# df dipakai ulang; hanya baris tipe lain yang key-nya dihitung.
+def network_edge_columns(df, key=entity_key):
+    other = df['source'].isna().to_numpy()
+    source = df['source'].to_numpy(dtype=object).copy()
+    target = df['target'].to_numpy(dtype=object).copy()
+    if other.any():
+        rows = df[other]
+        source[other] = key(rows['debitor_name'], rows['debitor_bank']).to_numpy(dtype=object)
+        target[other] = key(rows['sender_recipient_name'], rows['sender_recipient_bank']).to_numpy(dtype=object)
+    return pd.DataFrame({'source': source, 'target': target}, index=df.index)
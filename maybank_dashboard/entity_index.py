@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from graph_core import _ranges
+
+DIRECTIONS = ('out', 'in', 'both')
+
+
+# Index nama entitas ("NAMA (BANK)") untuk pencarian di tab Network Analysis,
+# dibangun sekali saat load. Prefix: searchsorted pada nama lowercase terurut.
+# Substring: str.find pada satu blob teks berisi semua nama (pencarian di C),
+# posisi hit dipetakan ke node lewat offset awal tiap nama.
+class EntityIndex:
+    def __init__(self, names):
+        self.names = np.asarray(names, dtype=object)
+        lower = [str(name).lower() for name in self.names]
+        keys = np.array(lower, dtype=object)
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+        self._blob = "\n".join(lower) + "\n"
+        lengths = np.fromiter(map(len, lower), dtype=np.int64, count=len(lower)) + 1
+        self._starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    # Id node yang namanya diawali `query` (urut alfabet)
+    def prefix(self, query, limit=50):
+        query = query.strip().lower()
+        if not query:
+            return np.zeros(0, dtype=np.int64)
+        start = np.searchsorted(self.sorted_keys, query, 'left')
+        stop = np.searchsorted(self.sorted_keys, query + "\U0010ffff", 'left')
+        return self.order[start:min(stop, start + limit)]
+
+    # Id node yang namanya memuat `query` (urut id node)
+    def substring(self, query, limit=50):
+        query = query.strip().lower()
+        if not query or "\n" in query:
+            return np.zeros(0, dtype=np.int64)
+        hits = []
+        pos = self._blob.find(query)
+        while pos >= 0 and len(hits) < limit:
+            node = int(np.searchsorted(self._starts, pos, 'right')) - 1
+            hits.append(node)
+            # Lanjut dari awal nama berikutnya agar satu nama tidak muncul dua kali
+            pos = self._blob.find(query, self._starts[node + 1] if node + 1 < len(self._starts) else len(self._blob))
+        return np.asarray(hits, dtype=np.int64)
+
+    # Prefix lebih dulu, lalu substring sisanya
+    def search(self, query, limit=50):
+        ids = self.prefix(query, limit)
+        if len(ids) < limit:
+            more = self.substring(query, limit + len(ids))
+            ids = np.concatenate([ids, more[~np.isin(more, ids)]])[:limit]
+        return ids
+
+    def lookup(self, name):
+        pos = np.searchsorted(self.sorted_keys, str(name).lower(), 'left')
+        while pos < len(self.sorted_keys) and self.sorted_keys[pos] == str(name).lower():
+            if self.names[self.order[pos]] == name:
+                return int(self.order[pos])
+            pos += 1
+        return -1
+
+
+# Edge bertetangga dari sekumpulan node (frontier) pada arah tertentu:
+# (pemilik, tetangga, id edge). Hanya membaca CSR/CSC, tanpa scan seluruh edge.
+def _incident(graph, frontier, direction):
+    parts = []
+    if direction in ('out', 'both'):
+        parts.append((graph.out_indptr, graph.out_indices, graph.out_edge))
+    if direction in ('in', 'both'):
+        parts.append((graph.in_indptr, graph.in_indices, graph.in_edge))
+    owners, neighbors, edges = [], [], []
+    for indptr, indices, edge in parts:
+        starts, ends = indptr[frontier], indptr[frontier + 1]
+        positions = _ranges(starts, ends)
+        owners.append(np.repeat(frontier, ends - starts))
+        neighbors.append(indices[positions].astype(np.int64))
+        edges.append(edge[positions])
+    return np.concatenate(owners), np.concatenate(neighbors), np.concatenate(edges)
+
+
+# Ego-network k-hop dari `center`. Per hop, setiap node frontier hanya
+# melebarkan ke `fanout` tetangga baru dengan bobot edge terbesar (fanout bisa
+# satu angka atau list per hop; None = tanpa batas). Biaya sebanding dengan
+# jumlah edge di sekitar ego, bukan ukuran graf.
+# Hasil: id node (center dulu, lalu per hop), jarak hop tiap node, dan id edge
+# di antara node terpilih.
+def ego_network(graph, center, hops=2, fanout=10, direction='both', weight='weight_amount'):
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction harus salah satu dari {DIRECTIONS}")
+    caps = list(fanout) if isinstance(fanout, (list, tuple)) else [fanout] * hops
+    values = graph.weights[weight]
+
+    nodes = [np.array([center], dtype=np.int64)]
+    visited = nodes[0]
+    for hop in range(hops):
+        frontier = nodes[-1]
+        if len(frontier) == 0:
+            break
+        owner, neighbor, edge = _incident(graph, frontier, direction)
+        new = ~np.isin(neighbor, visited)
+        owner, neighbor, edge = owner[new], neighbor[new], edge[new]
+
+        # Urut per pemilik, bobot terbesar dulu; pasangan (pemilik, tetangga)
+        # yang muncul di dua arah hanya dihitung sekali
+        order = np.lexsort((-values[edge], owner))
+        owner, neighbor = owner[order], neighbor[order]
+        _, first = np.unique(owner * graph.n_nodes + neighbor, return_index=True)
+        first.sort()
+        owner, neighbor = owner[first], neighbor[first]
+
+        cap = caps[hop] if hop < len(caps) else caps[-1]
+        if cap is not None and len(owner):
+            group_start = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+            rank = np.arange(len(owner)) - np.repeat(group_start, np.diff(np.r_[group_start, len(owner)]))
+            neighbor = neighbor[rank < cap]
+
+        # Urutan kemunculan pertama dipertahankan (tetangga terkuat lebih dulu)
+        _, first = np.unique(neighbor, return_index=True)
+        frontier = neighbor[np.sort(first)]
+        nodes.append(frontier)
+        visited = np.concatenate([visited, frontier])
+
+    hop = np.repeat(np.arange(len(nodes)), [len(level) for level in nodes])
+    return visited, hop, induced_edges(graph, visited)
+
+
+# Id edge yang kedua ujungnya ada di `nodes` (lewat CSR node tsb)
+def induced_edges(graph, nodes):
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts, ends = graph.out_indptr[nodes], graph.out_indptr[nodes + 1]
+    positions = _ranges(starts, ends)
+    keep = np.isin(graph.out_indices[positions], nodes)
+    return np.sort(graph.out_edge[positions[keep]])
+
+
+# Frame node & edge siap render (format sama dengan view top-N)
+def ego_frames(graph, node_ids, hop, edge_ids, tx_value, degree):
+    nodes = pd.DataFrame({
+        'node': graph.names[node_ids],
+        'tx_value': tx_value[node_ids],
+        'degree': degree[node_ids],
+        'hop': hop,
+    })
+    edges = pd.DataFrame({
+        'source': graph.names[graph.src[edge_ids]],
+        'target': graph.names[graph.dst[edge_ids]],
+        'weight_amount': graph.weights['weight_amount'][edge_ids],
+        'weight_trx': graph.weights['weight_trx'][edge_ids],
+        'type': graph.edge_type[edge_ids],
+    })
+    return nodes, edges
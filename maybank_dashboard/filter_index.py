@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from graph_core import ArrayGraph
+
+
+# Index filter tab Network Analysis, dibangun sekali saat load: baris diurutkan
+# per partisi tipe transaksi lalu per amount. Query rentang amount + tipe menjadi
+# dua searchsorted per tipe dan menghasilkan slice per tipe tanpa scan penuh.
+class FilterIndex:
+    def __init__(self, df, source='source', target='target', amount='amount_tx_idr', trx='trx', type_col='type'):
+        valid = np.flatnonzero((df[source].notna() & df[target].notna()).to_numpy())
+        codes, self.names = pd.factorize(
+            np.column_stack([df[source].to_numpy(dtype=object)[valid], df[target].to_numpy(dtype=object)[valid]]).ravel()
+        )
+        codes = codes.reshape(-1, 2)
+        type_codes, self.types = pd.factorize(df[type_col].to_numpy(dtype=object)[valid])
+        amounts = df[amount].to_numpy(dtype=np.float64)[valid]
+
+        order = np.lexsort((amounts, type_codes))
+        self.row = valid[order]
+        self.src = codes[order, 0]
+        self.dst = codes[order, 1]
+        self.amount = amounts[order]
+        self.trx = df[trx].to_numpy(dtype=np.float64)[self.row]
+        self.type = df[type_col].to_numpy(dtype=object)[self.row]
+        self.offsets = np.searchsorted(type_codes[order], np.arange(len(self.types) + 1))
+
+    # Slice [start, stop) pada array terurut untuk tiap tipe yang dipilih
+    def ranges(self, lo, hi, types):
+        result = []
+        for t in pd.Index(self.types).get_indexer(list(types)):
+            if t < 0:
+                continue
+            start, stop = self.offsets[t], self.offsets[t + 1]
+            block = self.amount[start:stop]
+            first = start + np.searchsorted(block, lo, 'left')
+            # lo > hi: slice kosong, bukan rentang terbalik
+            result.append((first, max(first, start + np.searchsorted(block, hi, 'right'))))
+        return result
+
+    # Satu tipe: slice (view) tanpa salinan. Beberapa tipe: slice-slice digabung
+    # dengan np.concatenate, yaitu salinan O(m) per kolom (m = baris yang lolos).
+    # Salinan ini kecil dibanding pengurutan ulang menurut posisi baris asli
+    # (O(m log m) plus salinan terurut) yang tetap dibutuhkan rows() dan
+    # from_coded_rows, karena tiap slice terurut per amount, bukan per baris.
+    def _take(self, values, ranges):
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            return values[start:stop]
+        return np.concatenate([values[start:stop] for start, stop in ranges] or [values[:0]])
+
+    # Posisi baris asli (urut) yang lolos filter; selalu array baru (np.sort)
+    def rows(self, lo, hi, types):
+        return np.sort(self._take(self.row, self.ranges(lo, hi, types)))
+
+    def count(self, lo, hi, types):
+        return sum(stop - start for start, stop in self.ranges(lo, hi, types))
+
+    # Graf dari baris yang lolos filter; identik dengan
+    # ArrayGraph.from_edge_frame(df[mask amount & tipe])
+    def graph(self, lo, hi, types):
+        ranges = self.ranges(lo, hi, types)
+        return ArrayGraph.from_coded_rows(
+            self.names,
+            self._take(self.src, ranges), self._take(self.dst, ranges),
+            self._take(self.amount, ranges), self._take(self.trx, ranges),
+            self._take(self.type, ranges), self._take(self.row, ranges),
+        )
@@ -0,0 +1,190 @@
+import heapq
+from itertools import count
+
+import numpy as np
+import pandas as pd
+
+from network_view import bank_code
+
+MODES = ('bottleneck', 'total')
+CHUNK = 32
+
+
+# Adjacency keluar (CSR) dengan nominal per edge dan kode bank per node,
+# dibangun sekali per graf
+class FlowIndex:
+    def __init__(self, graph, weight='weight_amount'):
+        self.graph = graph
+        self.indptr = graph.out_indptr
+        self.dst = graph.out_indices.astype(np.int64)
+        self.edge = graph.out_edge
+        self.amount = graph.weights[weight][graph.out_edge]
+        self.bank_codes, self.banks = pd.factorize(bank_code(graph.names).fillna(''))
+        self._starts = self.indptr[:-1][np.diff(self.indptr) > 0]
+        self._has_out = np.diff(self.indptr) > 0
+
+    def targets(self, source, target=None, target_bank=None):
+        if target is not None:
+            mask = np.zeros(self.graph.n_nodes, dtype=bool)
+            mask[target] = True
+            return mask
+        if target_bank is not None:
+            return self.bank_codes == self.banks.get_indexer([target_bank])[0]
+        return self.bank_codes != self.bank_codes[source]
+
+    # Potensi per node: skor terbaik lanjutan dari node tsb ke tujuan dalam
+    # <= r hop (walk, jadi batas atas untuk jalur sederhana); -inf = tidak
+    # terjangkau. Satu pass vektor (reduceat per node) per hop.
+    def potentials(self, is_target, max_hops, min_amount, bottleneck):
+        identity = np.inf if bottleneck else 0.0
+        amount = np.where(self.amount >= min_amount, self.amount, -np.inf)
+        level = np.where(is_target, identity, -np.inf)
+        levels = [level]
+        for _ in range(max_hops - 1):
+            reach = level[self.dst]
+            cand = np.minimum(amount, reach) if bottleneck else amount + reach
+            best = np.full(len(level), -np.inf)
+            if len(cand):
+                best[self._has_out] = np.maximum.reduceat(cand, self._starts)
+            level = np.where(is_target, identity, np.maximum(level, best))
+            levels.append(level)
+        return levels
+
+
+# Top-K jalur aliran dana dari `source` (id node) dengan best-first search
+# terbatas di atas FlowIndex.
+# - mode='bottleneck': skor = nominal edge terkecil di jalur (dana maksimum
+#   yang bisa mengalir utuh); mode='total': skor = jumlah nominal edge.
+# - Tujuan: node `target`, atau node di bank `target_bank`, atau bila keduanya
+#   kosong setiap node di bank selain bank `source`. Jalur berhenti di tujuan
+#   pertama yang dicapai dan tidak melewati node yang sama dua kali.
+# - Edge dengan nominal < min_amount dipangkas; panjang jalur <= max_hops.
+# Prioritas antrian = skor jalur digabung potensi node berikutnya (batas atas
+# semua jalur lanjutan), sehingga jalur selesai keluar dari antrian urut skor
+# dan cabang yang tidak bisa mencapai tujuan tidak pernah dibuka. Tetangga
+# setiap node diurutkan menurut batas atas dan dikeluarkan satu per satu,
+# sehingga hub hanya diperluas sejauh yang dibutuhkan. Bila jumlah edge yang
+# diperiksa (adjacency yang dibaca + kandidat yang dikeluarkan) melebihi
+# max_scanned, pencarian berhenti: jalur selesai yang sudah ditemukan
+# dikembalikan urut skor dan hasil ditandai truncated (bisa belum optimal).
+def trace_flows(index, source, target=None, target_bank=None, k=5, max_hops=4, min_amount=0.0,
+                mode='bottleneck', max_scanned=20_000_000):
+    if mode not in MODES:
+        raise ValueError(f"mode harus salah satu dari {MODES}")
+    bottleneck = mode == 'bottleneck'
+    # Source sendiri bukan tujuan: walk yang kembali ke source akan membuat
+    # potensi tidak bisa dicapai jalur sederhana
+    is_target = index.targets(source, target, target_bank)
+    is_target[source] = False
+    levels = index.potentials(is_target, max_hops, min_amount, bottleneck) if max_hops > 0 else []
+
+    def combine(a, b):
+        return np.minimum(a, b) if bottleneck else a + b
+
+    # Jalur disimpan sebagai pohon: (parent, node, edge, skor, hop)
+    paths = [(-1, source, -1, np.inf if bottleneck else 0.0, 0)]
+    # Kandidat edge per (node, hop): nilai lanjutan terbaik lewat edge tsb
+    # (nominal digabung potensi tujuan edge) urut menurun. Urutan ini tidak
+    # bergantung skor jalur (min dan + monoton), jadi dipakai bersama semua
+    # jalur yang melewati node yang sama pada hop yang sama; batas jalur =
+    # combine(skor, nilai). Urutan dibuat per potongan CHUNK teratas:
+    # [nilai terurut, posisi CSR terurut, sisa nilai, sisa posisi].
+    candidates = {}
+    tie = count()
+    heap = []
+    scanned = 0
+
+    def candidate(node, hops, i):
+        nonlocal scanned
+        entry = candidates.get((node, hops))
+        if entry is None:
+            start, stop = index.indptr[node], index.indptr[node + 1]
+            scanned += stop - start
+            amount = index.amount[start:stop]
+            values = combine(amount, levels[max_hops - hops - 1][index.dst[start:stop]])
+            ok = np.flatnonzero((amount >= min_amount) & (values > -np.inf))
+            entry = candidates[(node, hops)] = [[], [], values[ok], start + ok]
+        values, positions, rest_values, rest_positions = entry
+        if i == len(values) and len(rest_values):
+            if len(rest_values) > CHUNK:
+                top = np.argpartition(-rest_values, CHUNK - 1)
+                take, rest = top[:CHUNK], top[CHUNK:]
+            else:
+                take, rest = np.arange(len(rest_values)), np.zeros(0, dtype=np.int64)
+            take = take[np.argsort(-rest_values[take], kind='stable')]
+            values += rest_values[take].tolist()
+            positions += rest_positions[take].tolist()
+            entry[2], entry[3] = rest_values[rest], rest_positions[rest]
+        if i < len(values):
+            return values[i], positions[i]
+        return None
+
+    def push_candidate(p, i):
+        _, node, _, score, hops = paths[p]
+        found = candidate(node, hops, i)
+        if found is not None:
+            heapq.heappush(heap, (-float(combine(score, found[0])), next(tie), p, i))
+
+    def on_path(p, v):
+        while p >= 0:
+            if paths[p][1] == v:
+                return True
+            p = paths[p][0]
+        return False
+
+    if max_hops > 0:
+        push_candidate(0, 0)
+
+    found = []
+    while heap and len(found) < k and scanned <= max_scanned:
+        _, _, p, i = heapq.heappop(heap)
+        if i < 0:
+            # Jalur selesai: prioritasnya adalah skor sebenarnya
+            found.append(p)
+            continue
+        scanned += 1
+        push_candidate(p, i + 1)
+
+        _, node, _, score, hops = paths[p]
+        e = candidates[(node, hops)][1][i]
+        v = int(index.dst[e])
+        if on_path(p, v):
+            continue
+        child_score = float(combine(score, index.amount[e]))
+        paths.append((p, v, int(index.edge[e]), child_score, hops + 1))
+        child = len(paths) - 1
+        if is_target[v]:
+            heapq.heappush(heap, (-child_score, next(tie), child, -1))
+        elif hops + 1 < max_hops:
+            push_candidate(child, 0)
+
+    truncated = len(found) < k and scanned > max_scanned
+    if truncated:
+        done = sorted((entry for entry in heap if entry[3] < 0))
+        found += [entry[2] for entry in done[:k - len(found)]]
+
+    result = []
+    for p in found:
+        score, hops = paths[p][3], paths[p][4]
+        nodes, edges = [], []
+        while p >= 0:
+            parent, node, edge, _, _ = paths[p]
+            nodes.append(node)
+            if edge >= 0:
+                edges.append(edge)
+            p = parent
+        result.append({'nodes': nodes[::-1], 'edges': edges[::-1], 'score': score, 'hops': hops})
+    return result, truncated
+
+
+# Node & edge gabungan semua jalur; hop = posisi terdekat node dari source
+def path_subgraph(paths):
+    hop = {}
+    edges = set()
+    for path in paths:
+        for position, node in enumerate(path['nodes']):
+            hop[node] = min(hop.get(node, position), position)
+        edges.update(path['edges'])
+    node_ids = np.fromiter(hop.keys(), dtype=np.int64, count=len(hop))
+    hops = np.fromiter(hop.values(), dtype=np.int64, count=len(hop))
+    return node_ids, hops, np.array(sorted(edges), dtype=np.int64)
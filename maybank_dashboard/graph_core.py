@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+WEIGHTS = ('weight_amount', 'weight_trx')
+
+
+# Graf berarah berbasis array: node = id int32, edge sudah diagregasi per
+# pasangan (source, target) dan disimpan dalam format CSR (keluar) & CSC (masuk)
+class ArrayGraph:
+    def __init__(self, names, src, dst, weight_amount, weight_trx, edge_type):
+        self.names = np.asarray(names, dtype=object)
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.weights = {
+            'weight_amount': np.asarray(weight_amount, dtype=np.float64),
+            'weight_trx': np.asarray(weight_trx, dtype=np.float64),
+        }
+        self.edge_type = np.asarray(edge_type, dtype=object)
+        self._index = None
+
+        n = self.n_nodes
+        # CSR: edge diurutkan berdasarkan source
+        out_order = np.lexsort((self.dst, self.src))
+        self.out_edge = out_order.astype(np.int64)
+        self.out_indices = self.dst[out_order]
+        self.out_indptr = _indptr(self.src, n)
+        # CSC: edge diurutkan berdasarkan target
+        in_order = np.lexsort((self.src, self.dst))
+        self.in_edge = in_order.astype(np.int64)
+        self.in_indices = self.src[in_order]
+        self.in_indptr = _indptr(self.dst, n)
+
+    @property
+    def n_nodes(self):
+        return len(self.names)
+
+    @property
+    def n_edges(self):
+        return len(self.src)
+
+    # Lookup nama -> id (dibangun sekali saat pertama dipakai)
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.Index(self.names)
+        return self._index
+
+    def node_ids(self, names):
+        ids = self.index.get_indexer(list(names))
+        return ids[ids >= 0].astype(np.int32)
+
+    # Bangun graf dari frame edge mentah (satu baris per transaksi)
+    @classmethod
+    def from_edge_frame(cls, df, source='source', target='target',
+                        amount='amount_tx_idr', trx='trx', type_col='type'):
+        df = df[df[source].notna() & df[target].notna()]
+        src_names = df[source].to_numpy(dtype=object)
+        dst_names = df[target].to_numpy(dtype=object)
+
+        # Urutan node mengikuti kemunculan pertama (sama seperti networkx)
+        codes, names = pd.factorize(np.column_stack([src_names, dst_names]).ravel())
+        codes = codes.reshape(-1, 2).astype(np.int64)
+
+        return cls._aggregate(names, codes[:, 0], codes[:, 1], df[amount].to_numpy(dtype=np.float64),
+                              df[trx].to_numpy(dtype=np.float64), df[type_col].to_numpy(dtype=object))
+
+    # Bangun graf dari baris transaksi yang node-nya sudah berupa kode ke `names`
+    # (mis. hasil FilterIndex). Baris diurutkan kembali menurut posisi aslinya
+    # (`row`) sehingga hasilnya identik dengan from_edge_frame pada frame tersaring.
+    @classmethod
+    def from_coded_rows(cls, names, src, dst, amount, trx, row_type, row):
+        order = np.argsort(row, kind='stable')
+        codes, used = pd.factorize(np.column_stack([src[order], dst[order]]).ravel())
+        codes = codes.reshape(-1, 2).astype(np.int64)
+        return cls._aggregate(np.asarray(names, dtype=object)[used], codes[:, 0], codes[:, 1],
+                              np.asarray(amount, dtype=np.float64)[order], np.asarray(trx, dtype=np.float64)[order],
+                              np.asarray(row_type, dtype=object)[order])
+
+    # Agregasi baris (urut kronologis) per pasangan (source, target)
+    @classmethod
+    def _aggregate(cls, names, src, dst, amount, trx, row_type):
+        n = len(names)
+        key = src * n + dst
+        keys, inverse = np.unique(key, return_inverse=True)
+        inverse = inverse.ravel()
+        n_edges = len(keys)
+
+        weight_amount = np.bincount(inverse, weights=amount, minlength=n_edges)
+        weight_trx = np.bincount(inverse, weights=trx, minlength=n_edges)
+
+        # Tipe edge diambil dari transaksi terakhir pada pasangan tsb
+        last_row = np.full(n_edges, -1, dtype=np.int64)
+        np.maximum.at(last_row, inverse, np.arange(len(inverse)))
+        edge_type = row_type[last_row]
+
+        return cls(names, keys // n, keys % n, weight_amount, weight_trx, edge_type)
+
+    def _weight(self, weight):
+        if weight is None:
+            return None
+        return self.weights[weight]
+
+    def out_neighbors(self, node):
+        return self.out_indices[self.out_indptr[node]:self.out_indptr[node + 1]]
+
+    def in_neighbors(self, node):
+        return self.in_indices[self.in_indptr[node]:self.in_indptr[node + 1]]
+
+    # Semua node yang terjangkau dari `seeds` (termasuk seeds), BFS multi-source
+    # per level. direction='out' mengikuti arah edge, 'in' kebalikannya.
+    def reachable(self, seeds, direction='out', max_hops=None):
+        indptr, indices = (self.out_indptr, self.out_indices) if direction == 'out' else (self.in_indptr, self.in_indices)
+        visited = np.zeros(self.n_nodes, dtype=bool)
+        frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+        visited[frontier] = True
+        hops = 0
+        while len(frontier) and (max_hops is None or hops < max_hops):
+            neighbors = indices[_ranges(indptr[frontier], indptr[frontier + 1])]
+            frontier = np.unique(neighbors[~visited[neighbors]])
+            visited[frontier] = True
+            hops += 1
+        return np.flatnonzero(visited)
+
+    def out_degree(self, weight=None):
+        return np.bincount(self.src, weights=self._weight(weight), minlength=self.n_nodes)
+
+    def in_degree(self, weight=None):
+        return np.bincount(self.dst, weights=self._weight(weight), minlength=self.n_nodes)
+
+    def degree(self, weight=None):
+        return self.in_degree(weight) + self.out_degree(weight)
+
+    # Subgraf terinduksi; id node di-relabel mengikuti urutan `nodes`
+    def subgraph(self, nodes):
+        nodes = np.asarray(nodes, dtype=np.int64)
+        relabel = np.full(self.n_nodes, -1, dtype=np.int64)
+        relabel[nodes] = np.arange(len(nodes))
+        keep = (relabel[self.src] >= 0) & (relabel[self.dst] >= 0)
+        return ArrayGraph(
+            self.names[nodes], relabel[self.src[keep]], relabel[self.dst[keep]],
+            self.weights['weight_amount'][keep], self.weights['weight_trx'][keep],
+            self.edge_type[keep],
+        )
+
+    def edge_frame(self):
+        return pd.DataFrame({
+            'source': self.names[self.src],
+            'target': self.names[self.dst],
+            'weight_amount': self.weights['weight_amount'],
+            'weight_trx': self.weights['weight_trx'],
+            'type': self.edge_type,
+        })
+
+    # Konversi ke networkx hanya saat dibutuhkan (render / validasi)
+    def to_networkx(self):
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self.names)
+        G.add_edges_from(
+            (u, v, {'weight_amount': a, 'weight_trx': t, 'type': ty})
+            for u, v, a, t, ty in zip(
+                self.names[self.src], self.names[self.dst],
+                self.weights['weight_amount'].tolist(), self.weights['weight_trx'].tolist(),
+                self.edge_type,
+            )
+        )
+        return G
+
+
+def _indptr(ids, n):
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=n), out=indptr[1:])
+    return indptr
+
+
+# Gabungan indeks [start, end) untuk banyak rentang sekaligus (tanpa loop Python)
+def _ranges(starts, ends):
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+# Indeks k nilai terbesar, urut menurun; nilai sama diurutkan id terkecil dulu
+# (hasil sama dengan argsort stabil, tetapi hanya seleksi parsial O(n)).
+# NaN diperlakukan sebagai -inf sehingga berada paling akhir, seperti
+# sort_values(ascending=False) pada pandas.
+def top_k(values, k):
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        values = np.where(np.isnan(values), -np.inf, values)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k >= len(values):
+        return np.argsort(-values, kind='stable')
+    kth = np.partition(values, len(values) - k)[len(values) - k]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.lexsort((selected, -values[selected]))]
@@ -0,0 +1,235 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from centrality import WEIGHTINGS, betweenness, closeness, pagerank
+from edges import build_edge_columns, pipe_key
+from graph_core import ArrayGraph
+from ingest import (CACHE_DIR, SOURCE_XLSX, _replace_atomic, _write_meta, file_sha256, load_transactions,
+                    prepare_transactions, read_source)
+from pipeline import METRIC_COLUMNS, PREFIX, RANKINGS, compute_rankings, write_metrics, write_report
+
+log = logging.getLogger("incremental")
+
+STATE_VERSION = 1
+STATE_DIR = os.path.join(CACHE_DIR, "state")
+
+# Betweenness disimpan sebagai jumlah dependency mentah (belum dinormalisasi)
+# supaya kontribusi per source bisa dikurangi/ditambah saat update
+RAW_BETWEENNESS = {w: f'{PREFIX[w]}_betweenness_raw' for w in WEIGHTINGS}
+
+
+def _state_paths(state_dir):
+    return (os.path.join(state_dir, "edges.feather"),
+            os.path.join(state_dir, "metrics.feather"),
+            os.path.join(state_dir, "state.json"))
+
+
+# State: edge teragregasi, vektor metrik terakhir, dan metadata batch. Tiap file
+# ditulis ke file sementara lalu di-rename, metadata terakhir: proses yang mati di
+# tengah jalan tidak meninggalkan file setengah tertulis.
+def save_state(state_dir, graph, metrics, meta):
+    os.makedirs(state_dir, exist_ok=True)
+    edges_path, metrics_path, meta_path = _state_paths(state_dir)
+    edges = graph.edge_frame()
+    _replace_atomic(edges_path, lambda path: feather.write_feather(edges, path))
+    _replace_atomic(metrics_path, lambda path: feather.write_feather(metrics, path))
+    _write_meta(meta_path, meta)
+
+
+def load_state(state_dir):
+    edges_path, metrics_path, meta_path = _state_paths(state_dir)
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get('version') != STATE_VERSION:
+        raise ValueError(f"Versi state {meta.get('version')} tidak didukung, jalankan 'init' ulang")
+    graph = ArrayGraph.from_edge_frame(pd.read_feather(edges_path), amount='weight_amount', trx='weight_trx')
+    return graph, pd.read_feather(metrics_path), meta
+
+
+def _metric_graph(df):
+    return ArrayGraph.from_edge_frame(df.assign(**build_edge_columns(df, key=pipe_key, notebook=True)))
+
+
+def full_metrics(graph, workers=None):
+    columns = {'node': graph.names}
+    raw_bc = betweenness(graph, normalized=False, workers=workers)
+    cc = closeness(graph, workers=workers)
+    pr = pagerank(graph)
+    for w in WEIGHTINGS:
+        p = PREFIX[w]
+        columns[f'{p}_in_deg'] = graph.in_degree(w)
+        columns[f'{p}_out_deg'] = graph.out_degree(w)
+        columns[RAW_BETWEENNESS[w]] = raw_bc[w]
+        columns[f'{p}_closeness'] = cc[w]
+        columns[f'{p}_pagerank'] = pr[w]
+    return pd.DataFrame(columns)
+
+
+# Frame metrik dalam format pipeline (betweenness ternormalisasi seperti networkx)
+def to_metric_frame(metrics):
+    n = len(metrics)
+    scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    df_metric = metrics.copy()
+    for w in WEIGHTINGS:
+        df_metric[f'{PREFIX[w]}_betweenness'] = metrics[RAW_BETWEENNESS[w]] * scale
+    return df_metric[['node'] + METRIC_COLUMNS]
+
+
+def init_state(src=SOURCE_XLSX, state_dir=STATE_DIR, workers=None):
+    graph = _metric_graph(load_transactions(src))
+    metrics = full_metrics(graph, workers)
+    meta = {
+        'version': STATE_VERSION,
+        'batches': [file_sha256(src)],
+        'betweenness': {'mode': 'exact'},
+        'updated_at': time.time(),
+    }
+    save_state(state_dir, graph, metrics, meta)
+    return graph, metrics, meta
+
+
+def _timed(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    log.info("step=%s seconds=%.3f", label, time.perf_counter() - start)
+    return result
+
+
+# Update metrik dengan satu batch transaksi baru (diasumsikan tidak tumpang tindih
+# dengan batch sebelumnya).
+# - degree      : lama + kontribusi edge batch, O(edge baru)
+# - pagerank    : warm-start dari vektor sebelumnya
+# - closeness   : dihitung ulang hanya untuk node yang terjangkau dari edge yang
+#                 berubah; node lain cukup diskalakan ulang (faktor WF n-1)
+# - betweenness : kontribusi source yang bisa menjangkau edge berubah dikurangi
+#                 (graf lama) lalu ditambah (graf baru). Jika source terdampak
+#                 > max_affected * n, hitung ulang penuh, atau bila stale_epsilon
+#                 diisi pakai estimasi sampling dengan galat ~epsilon dan ditandai.
+def apply_batch(state, batch_df, workers=None, max_affected=0.5, stale_epsilon=None, seed=None):
+    old_graph, old_metrics, meta = state
+    batch = _metric_graph(prepare_transactions(batch_df))
+    combined = pd.concat([old_graph.edge_frame(), batch.edge_frame()], ignore_index=True)
+    graph = ArrayGraph.from_edge_frame(combined, amount='weight_amount', trx='weight_trx')
+    n0, n1 = old_graph.n_nodes, graph.n_nodes
+
+    old = old_metrics.set_index('node').reindex(graph.names)
+    old_ids = graph.index.get_indexer(old_graph.names)
+    batch_ids = graph.index.get_indexer(batch.names)
+    b_src, b_dst = batch_ids[batch.src], batch_ids[batch.dst]
+    old_keys = old_ids[old_graph.src].astype(np.int64) * n1 + old_ids[old_graph.dst]
+    is_new_edge = ~np.isin(b_src.astype(np.int64) * n1 + b_dst, old_keys)
+    new_nodes = np.flatnonzero(old.iloc[:, 0].isna().to_numpy())
+
+    columns = {'node': graph.names}
+    for w in WEIGHTINGS:
+        p = PREFIX[w]
+        if w is None:
+            add_in = np.bincount(b_dst[is_new_edge], minlength=n1)
+            add_out = np.bincount(b_src[is_new_edge], minlength=n1)
+        else:
+            add_in = np.bincount(b_dst, weights=batch.weights[w], minlength=n1)
+            add_out = np.bincount(b_src, weights=batch.weights[w], minlength=n1)
+        columns[f'{p}_in_deg'] = old[f'{p}_in_deg'].fillna(0).to_numpy() + add_in
+        columns[f'{p}_out_deg'] = old[f'{p}_out_deg'].fillna(0).to_numpy() + add_out
+
+    nstart = {w: old_metrics.set_index('node')[f'{PREFIX[w]}_pagerank'] for w in WEIGHTINGS}
+    pr = _timed("pagerank", pagerank, graph, nstart=nstart)
+
+    affected_targets = graph.reachable(np.concatenate([b_dst, new_nodes]), 'out')
+    cc = _timed("closeness", closeness, graph, nodes=affected_targets, workers=workers)
+    wf_scale = (n0 - 1) / (n1 - 1) if n0 > 1 and n1 > 1 else 0.0
+
+    affected_sources = graph.reachable(b_src, 'in')
+    bc_meta = dict(meta.get('betweenness', {'mode': 'exact'}))
+    if len(affected_sources) <= max_affected * n1:
+        to_old = old_graph.index.get_indexer(graph.names[affected_sources])
+        before = _timed("betweenness_old", betweenness, old_graph, normalized=False,
+                        sources=to_old[to_old >= 0], workers=workers)
+        after = _timed("betweenness_new", betweenness, graph, normalized=False,
+                       sources=affected_sources, workers=workers)
+        raw_bc = {}
+        for w in WEIGHTINGS:
+            raw = old[RAW_BETWEENNESS[w]].fillna(0).to_numpy(copy=True)
+            raw[old_ids] -= before[w]
+            raw_bc[w] = np.maximum(raw + after[w], 0.0)
+    elif stale_epsilon is not None:
+        raw_bc = _timed("betweenness_sampled", betweenness, graph, normalized=False,
+                        epsilon=stale_epsilon, seed=seed, workers=workers)
+        bc_meta = {'mode': 'approximate', 'epsilon': stale_epsilon}
+    else:
+        raw_bc = _timed("betweenness_full", betweenness, graph, normalized=False, workers=workers)
+        bc_meta = {'mode': 'exact'}
+
+    for w in WEIGHTINGS:
+        p = PREFIX[w]
+        columns[RAW_BETWEENNESS[w]] = raw_bc[w]
+        values = old[f'{p}_closeness'].fillna(0).to_numpy(copy=True) * wf_scale
+        values[affected_targets] = cc[w][affected_targets]
+        columns[f'{p}_closeness'] = values
+        columns[f'{p}_pagerank'] = pr[w]
+
+    meta = dict(meta, betweenness=bc_meta, updated_at=time.time(), last_batch={
+        'new_edges': int(is_new_edge.sum()),
+        'changed_edges': int(batch.n_edges),
+        'new_nodes': int(len(new_nodes)),
+        'closeness_recomputed': int(len(affected_targets)),
+        'betweenness_sources': int(len(affected_sources)),
+    })
+    log.info("batch %s", meta['last_batch'])
+    return graph, pd.DataFrame(columns), meta
+
+
+def write_outputs(graph, metrics, out_dir, k=20, n_samples=200, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    df_metric2 = write_metrics(to_metric_frame(metrics), out_dir)
+    for name in RANKINGS:
+        write_report(graph, compute_rankings(df_metric2, name, k, n_samples, seed), name, out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update metrik inkremental per batch transaksi")
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-reports", action="store_true", help="Hanya perbarui state, tanpa artefak")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_init = sub.add_parser("init", help="Hitung penuh dari file sumber dan simpan state")
+    p_init.add_argument("--src", default=SOURCE_XLSX)
+
+    p_apply = sub.add_parser("apply", help="Terapkan batch transaksi baru ke state")
+    p_apply.add_argument("batch", nargs="+")
+    p_apply.add_argument("--max-affected", type=float, default=0.5,
+                         help="Batas fraksi source terdampak untuk update betweenness exact")
+    p_apply.add_argument("--stale-epsilon", type=float, default=None,
+                         help="Galat estimasi betweenness bila update exact terlalu mahal")
+    p_apply.add_argument("--seed", type=int, default=None)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    if args.command == "init":
+        graph, metrics, meta = init_state(args.src, args.state_dir, args.workers)
+    else:
+        state = load_state(args.state_dir)
+        for path in args.batch:
+            digest = file_sha256(path)
+            if digest in state[2]['batches']:
+                log.warning("batch %s sudah pernah diterapkan, dilewati", path)
+                continue
+            graph, metrics, meta = apply_batch(state, read_source(path), args.workers,
+                                               args.max_affected, args.stale_epsilon, args.seed)
+            meta['batches'] = meta['batches'] + [digest]
+            save_state(args.state_dir, graph, metrics, meta)
+            state = (graph, metrics, meta)
+        graph, metrics, meta = state
+
+    if not args.no_reports:
+        write_outputs(graph, metrics, args.out_dir)
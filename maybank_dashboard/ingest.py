@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from edges import add_edge_columns, build_edge_columns, entity_key
+
+SOURCE_XLSX = "UNAIR - GRAPH NEW.xlsx"
+CACHE_DIR = ".cache"
+CACHE_VERSION = 3
+# Hash file sumber juga disimpan di metadata skema Feather, sehingga frame dan
+# versinya selalu berasal dari file cache yang sama
+SHA256_KEY = b'source_sha256'
+
+# Kolom berulang disimpan sebagai kategori agar hemat memori: nama entitas dan
+# key node (source/target) juga berulang di banyak transaksi. Di cache Feather
+# kategori menjadi dictionary array sehingga kode integer-nya ikut di-memory-map.
+CATEGORICAL_COLUMNS = ['type', 'debitor_bank', 'sender_recipient_bank',
+                       'debitor_name', 'sender_recipient_name', 'source', 'target']
+
+
+def cache_paths(src, cache_dir=CACHE_DIR):
+    base = os.path.splitext(os.path.basename(src))[0]
+    data_path = os.path.join(cache_dir, f"{base}.feather")
+    return data_path, data_path + ".meta.json"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Tulis ke file sementara unik di folder tujuan lalu os.replace, sehingga proses
+# lain (dashboard, pipeline, warm-up) yang menulis bersamaan tidak saling menimpa
+# file setengah jadi dan pembaca selalu melihat file utuh
+def _replace_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    _replace_atomic(meta_path, write)
+
+
+# Cache masih valid jika versi sama dan file sumber belum berubah.
+# mtime + ukuran dicek dulu; hash isi hanya dihitung kalau mtime berubah.
+def is_cache_fresh(src, cache_dir=CACHE_DIR):
+    data_path, meta_path = cache_paths(src, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get('version') != CACHE_VERSION or not os.path.exists(data_path):
+        return False
+
+    stat = os.stat(src)
+    if meta['mtime'] == stat.st_mtime and meta['size'] == stat.st_size:
+        return True
+    if meta['sha256'] != file_sha256(src):
+        return False
+
+    # Isi sama (mis. file hanya di-copy ulang): perbarui mtime saja
+    meta.update(mtime=stat.st_mtime, size=stat.st_size)
+    _write_meta(meta_path, meta)
+    return True
+
+
+# Hash isi file sumber; pakai hash di metadata cache bila cache masih valid
+def source_sha256(src, cache_dir=CACHE_DIR):
+    if is_cache_fresh(src, cache_dir):
+        return _read_meta(cache_paths(src, cache_dir)[1])['sha256']
+    return file_sha256(src)
+
+
+# Baca file transaksi mentah sesuai ekstensinya (xlsx/csv/parquet)
+def read_source(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return pd.read_csv(path)
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+
+# Data transaksi bersih: dedup, kolom kategori, dan source/target sudah dihitung.
+# trx (integer) diperkecil ke tipe terkecil yang muat; amount tetap float64
+# agar jumlah nominal IDR sama persis dengan notebook.
+def prepare_transactions(df):
+    df = add_edge_columns(df.drop_duplicates())
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    if pd.api.types.is_integer_dtype(df['trx']):
+        df['trx'] = pd.to_numeric(df['trx'], downcast='integer')
+    return df.reset_index(drop=True)
+
+
+# Konversi workbook sekali ke file Feather (Arrow IPC) tanpa kompresi
+# supaya bisa di-memory-map saat dibaca. Stat dan hash diambil sebelum sumber
+# dibaca: bila sumber berubah di tengah jalan, cek berikutnya membangun ulang.
+def build_cache(src=SOURCE_XLSX, cache_dir=CACHE_DIR):
+    stat = os.stat(src)
+    sha256 = file_sha256(src)
+    df = prepare_transactions(read_source(src))
+
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**table.schema.metadata, SHA256_KEY: sha256.encode()})
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = cache_paths(src, cache_dir)
+    _replace_atomic(data_path, lambda path: feather.write_feather(table, path, compression='uncompressed'))
+
+    _write_meta(meta_path, {
+        'version': CACHE_VERSION,
+        'source': os.path.basename(src),
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha256': sha256,
+        'rows': len(df),
+    })
+    return data_path
+
+
+def read_cache(data_path):
+    return read_versioned_cache(data_path)[0]
+
+
+# Frame + hash sumber dari satu pembacaan file cache
+def read_versioned_cache(data_path):
+    table = feather.read_table(data_path, memory_map=True)
+    return table.to_pandas(split_blocks=True), table.schema.metadata[SHA256_KEY].decode()
+
+
+# Entry point untuk dashboard: bangun cache bila perlu, lalu baca dari cache
+def load_transactions(src=SOURCE_XLSX, cache_dir=CACHE_DIR, force=False):
+    return load_versioned_transactions(src, cache_dir, force)[0]
+
+
+# Frame transaksi beserta hash isi sumber yang menghasilkannya, untuk key cache
+# turunan frame tsb. Hash dibaca dari file Feather yang sama dengan frame (bukan
+# dari metadata JSON atau file sumber), sehingga rebuild oleh proses lain di
+# antara cek dan baca tidak membuat frame dan versi berbeda.
+def load_versioned_transactions(src=SOURCE_XLSX, cache_dir=CACHE_DIR, force=False):
+    data_path, _ = cache_paths(src, cache_dir)
+    if force or not is_cache_fresh(src, cache_dir):
+        build_cache(src, cache_dir)
+    return read_versioned_cache(data_path)
+
+
+# --- Ingestion streaming (file lebih besar dari memori) ---
+
+# Baca file transaksi per potongan baris. CSV lewat chunksize, Parquet per
+# batch row group; xlsx tidak bisa di-stream sehingga dibaca utuh lalu dipotong.
+def iter_source_chunks(path, chunk_rows=1_000_000):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif ext == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        df = read_source(path)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+# Fingerprint 64-bit per baris mentah. Kolom numerik dinormalisasi ke float64 dan
+# lainnya ke string supaya potongan CSV dengan dtype hasil inferensi berbeda
+# tetap menghasilkan hash yang sama untuk baris yang sama.
+def row_fingerprints(df):
+    canonical = pd.DataFrame({
+        col: df[col].astype(np.float64) if pd.api.types.is_numeric_dtype(df[col]) else df[col].astype(str)
+        for col in df.columns
+    })
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+# Himpunan fingerprint yang sudah terlihat: daftar array terurut yang digabung
+# bertingkat (seperti LSM) sehingga total biaya merge O(n log n)
+class FingerprintSet:
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, values):
+        found = np.zeros(len(values), dtype=bool)
+        for run in self.runs:
+            pos = np.minimum(np.searchsorted(run, values), len(run) - 1)
+            found |= run[pos] == values
+        return found
+
+    def add(self, values):
+        run = np.unique(values)
+        while self.runs and len(self.runs[-1]) <= len(run):
+            run = np.union1d(self.runs.pop(), run)
+        if len(run):
+            self.runs.append(run)
+
+    def to_array(self):
+        return np.unique(np.concatenate(self.runs)) if self.runs else np.array([], dtype=np.uint64)
+
+
+# Tabel edge teragregasi yang dibangun per potongan: baris duplikat dibuang lewat
+# fingerprint, lalu tiap potongan langsung dilipat ke (source, target) -> jumlah
+# amount_tx_idr, jumlah trx, tipe transaksi terakhir. Memori sebanding dengan
+# jumlah edge unik (+8 byte per baris unik untuk fingerprint), bukan jumlah baris.
+# Penjumlahan dilakukan berurutan per baris (np.add.at) sehingga hasilnya identik
+# dengan ArrayGraph.from_edge_frame(prepare_transactions(df)).
+# Lookup node/edge memakai dict yang terus tumbuh (key -> id) dan kolom edge
+# disimpan di array berkapasitas ganda, sehingga biaya per potongan sebanding
+# dengan ukuran potongan, bukan dengan jumlah edge yang sudah terkumpul.
+class StreamingEdgeTable:
+    def __init__(self, key=entity_key, seen=None):
+        self.key = key
+        self.seen = seen if seen is not None else FingerprintSet()
+        self.node_ids = {}
+        self.node_names = []
+        self.edge_ids = {}
+        self.src = np.empty(0, dtype=np.int64)
+        self.dst = np.empty(0, dtype=np.int64)
+        self.amount = np.empty(0, dtype=np.float64)
+        self.trx = np.empty(0, dtype=np.float64)
+        self.type = np.empty(0, dtype=object)
+        self.rows_read = 0
+        self.rows_kept = 0
+
+    @property
+    def n_edges(self):
+        return len(self.edge_ids)
+
+    # Id untuk setiap nilai; nilai baru diberi id berikutnya sesuai urutan
+    # kemunculan pertama. Hanya nilai unik di potongan yang dicari di dict.
+    @staticmethod
+    def _lookup(ids, values):
+        codes, uniques = pd.factorize(values)
+        unique_ids = np.fromiter((ids.setdefault(u, len(ids)) for u in uniques.tolist()),
+                                 dtype=np.int64, count=len(uniques))
+        return unique_ids[codes], uniques, unique_ids
+
+    # Perbesar kolom edge (kapasitas x2) bila belum muat
+    def _reserve(self, size):
+        capacity = len(self.src)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        for name in ('src', 'dst', 'amount', 'trx', 'type'):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else np.empty(capacity, dtype=object)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def add_chunk(self, chunk):
+        self.rows_read += len(chunk)
+
+        # Dedup: buang baris kembar di dalam potongan dan yang sudah pernah terlihat
+        fp = row_fingerprints(chunk)
+        _, first = np.unique(fp, return_index=True)
+        keep = np.zeros(len(fp), dtype=bool)
+        keep[first] = True
+        keep &= ~self.seen.contains(fp)
+        self.seen.add(fp[keep])
+        chunk = chunk[keep]
+        self.rows_kept += len(chunk)
+
+        edges = build_edge_columns(chunk, key=self.key)
+        valid = (edges['source'].notna() & edges['target'].notna()).to_numpy()
+        if not valid.any():
+            return
+        chunk, edges = chunk[valid], edges[valid]
+
+        # Node baru ditambahkan sesuai urutan kemunculan pertama (src, dst bergantian)
+        names = np.column_stack([edges['source'].to_numpy(dtype=object), edges['target'].to_numpy(dtype=object)]).ravel()
+        n_nodes = len(self.node_names)
+        codes, uniques, unique_ids = self._lookup(self.node_ids, names)
+        self.node_names.extend(uniques[unique_ids >= n_nodes].tolist())
+        codes = codes.reshape(-1, 2)
+
+        # Edge baru juga mengikuti urutan kemunculan pertama
+        keys = (codes[:, 0] << 32) | codes[:, 1]
+        n_edges = self.n_edges
+        ids, new_keys, key_ids = self._lookup(self.edge_ids, keys)
+        new = key_ids >= n_edges
+        if new.any():
+            self._reserve(self.n_edges)
+            self.src[key_ids[new]] = new_keys[new] >> 32
+            self.dst[key_ids[new]] = new_keys[new] & 0xFFFFFFFF
+
+        np.add.at(self.amount, ids, chunk['amount_tx_idr'].to_numpy(dtype=np.float64))
+        np.add.at(self.trx, ids, chunk['trx'].to_numpy(dtype=np.float64))
+        last_ids, last_rev = np.unique(ids[::-1], return_index=True)
+        self.type[last_ids] = chunk['type'].to_numpy(dtype=object)[len(ids) - 1 - last_rev]
+
+    def edge_frame(self):
+        names = np.array(self.node_names, dtype=object)
+        n = self.n_edges
+        return pd.DataFrame({
+            'source': names[self.src[:n]],
+            'target': names[self.dst[:n]],
+            'amount_tx_idr': self.amount[:n],
+            'trx': self.trx[:n],
+            'type': self.type[:n],
+        })
+
+
+def stream_edge_table(path, chunk_rows=1_000_000, key=entity_key):
+    table = StreamingEdgeTable(key)
+    for chunk in iter_source_chunks(path, chunk_rows):
+        table.add_chunk(chunk)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi workbook transaksi ke cache kolumnar")
+    parser.add_argument("--src", default=SOURCE_XLSX)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="Bangun ulang walau cache masih valid")
+    parser.add_argument("--stream-edges", default=None, metavar="OUT",
+                        help="Stream file sumber per chunk dan tulis tabel edge teragregasi (Feather) ke OUT")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.stream_edges:
+        table = stream_edge_table(args.src, args.chunk_rows)
+        feather.write_feather(table.edge_frame(), args.stream_edges)
+        print(f"{table.rows_read:,} baris dibaca, {table.rows_kept:,} unik, "
+              f"{table.n_edges:,} edge -> {args.stream_edges}")
+    elif args.force or not is_cache_fresh(args.src, args.cache_dir):
+        path = build_cache(args.src, args.cache_dir)
+        print(f"Cache dibuat: {path}")
+    else:
+        print(f"Cache masih valid: {cache_paths(args.src, args.cache_dir)[0]}")
@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+from ingest import CACHE_DIR, _replace_atomic
+
+log = logging.getLogger("louvain")
+
+COMMUNITY_DIR = os.path.join(CACHE_DIR, "communities")
+# Naikkan bila algoritma berubah agar partisi lama di cache tidak dipakai
+LOUVAIN_VERSION = 1
+
+
+# Hash isi graf (node, edge, bobot) untuk key cache partisi
+def graph_hash(graph):
+    h = hashlib.sha256()
+    h.update("\0".join(map(str, graph.names)).encode("utf-8"))
+    for array in (graph.src, graph.dst, graph.weights['weight_amount'], graph.weights['weight_trx']):
+        h.update(np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()
+
+
+# Edge tak berarah (a <= b) dengan bobot w_ab + w_ba; self-loop tetap disimpan
+def undirected_edges(graph, weight='weight_amount'):
+    n = graph.n_nodes
+    w = np.ones(graph.n_edges) if weight is None else graph.weights[weight]
+    a = np.minimum(graph.src, graph.dst).astype(np.int64)
+    b = np.maximum(graph.src, graph.dst).astype(np.int64)
+    keys, inverse = np.unique(a * n + b, return_inverse=True)
+    return keys // n, keys % n, np.bincount(inverse.ravel(), weights=w, minlength=len(keys))
+
+
+# Modularity partisi pada edge tak berarah (self-loop dihitung dua kali di degree)
+def modularity(n, u, v, w, membership, resolution=1.0):
+    degree = np.bincount(u, w, minlength=n) + np.bincount(v, w, minlength=n)
+    m2 = degree.sum()
+    if m2 == 0:
+        return 0.0
+    internal = w[membership[u] == membership[v]].sum() * 2
+    tot = np.bincount(membership, degree)
+    return internal / m2 - resolution * np.sum((tot / m2) ** 2)
+
+
+# Satu level Louvain dengan update modularity berbasis array: setiap iterasi
+# menghitung bobot node->komunitas tetangga untuk semua node sekaligus
+# (np.unique + bincount), lalu node yang untung berpindah bersamaan. Bila batch
+# menurunkan modularity, batch diperkecil acak (peluang pindah mulai lagi dari 1
+# di setiap iterasi); bila tetap gagal, semua kandidat dipindah berurutan dari
+# keuntungan terbesar dalam iterasi yang sama, dengan gain yang diperbarui
+# setelah tiap perpindahan. Level selesai hanya bila tidak ada perpindahan yang
+# menaikkan modularity, sehingga modularity tidak pernah turun. Bila max_iter
+# tercapai lebih dulu, hal itu dicatat di log.
+def _one_level(n, u, v, w, resolution, rng, max_iter=200):
+    loop = u == v
+    src = np.concatenate([u[~loop], v[~loop]])
+    dst = np.concatenate([v[~loop], u[~loop]])
+    wt = np.concatenate([w[~loop], w[~loop]])
+    degree = np.bincount(u, w, minlength=n) + np.bincount(v, w, minlength=n)
+    m2 = degree.sum()
+
+    membership = np.arange(n)
+    if m2 == 0 or len(src) == 0:
+        return membership
+    q = modularity(n, u, v, w, membership, resolution)
+
+    def try_moves(nodes, comms):
+        trial = membership.copy()
+        trial[nodes] = comms
+        return trial, modularity(n, u, v, w, trial, resolution)
+
+    # Adjacency per node (CSR) untuk perpindahan berurutan
+    order = np.argsort(src, kind='stable')
+    nbr, nbr_w = dst[order], wt[order]
+    indptr = np.r_[0, np.cumsum(np.bincount(src, minlength=n))]
+
+    # Pindahkan node satu per satu ke komunitas tetangga terbaiknya saat itu.
+    # tot diperbarui (delta) setelah tiap perpindahan dan bobot node->komunitas
+    # dihitung dari keanggotaan terkini, jadi setiap perpindahan yang diterima
+    # menaikkan modularity.
+    def sequential_moves(nodes):
+        trial = membership.copy()
+        tot = np.bincount(trial, degree, minlength=n)
+        moved = False
+        for i in nodes.tolist():
+            comms, inverse = np.unique(trial[nbr[indptr[i]:indptr[i + 1]]], return_inverse=True)
+            k_ic = np.bincount(inverse.ravel(), weights=nbr_w[indptr[i]:indptr[i + 1]])
+            own, d = trial[i], degree[i]
+            gain = k_ic - resolution * d * (tot[comms] - np.where(comms == own, d, 0.0)) / m2
+            stay = k_ic[comms == own].sum() - resolution * d * (tot[own] - d) / m2
+            best = np.argmax(gain)
+            if comms[best] != own and gain[best] - stay > 1e-12 * m2:
+                tot[own] -= d
+                tot[comms[best]] += d
+                trial[i] = comms[best]
+                moved = True
+        if not moved:
+            return None
+        q_trial = modularity(n, u, v, w, trial, resolution)
+        return (trial, q_trial) if q_trial > q else None
+
+    for _ in range(max_iter):
+        # Bobot setiap node ke setiap komunitas tetangganya
+        keys, inverse = np.unique(src * n + membership[dst], return_inverse=True)
+        k_ic = np.bincount(inverse.ravel(), weights=wt)
+        node, comm = keys // n, keys % n
+
+        tot = np.bincount(membership, degree, minlength=n)
+        own = comm == membership[node]
+        tot_c = tot[comm] - np.where(own, degree[node], 0.0)
+        gain = k_ic - resolution * degree[node] * tot_c / m2
+
+        # Keuntungan tetap di komunitas sendiri (0 bila tidak ada tetangga di sana)
+        stay = -resolution * degree * (tot[membership] - degree) / m2
+        stay[node[own]] = gain[own]
+
+        # Komunitas terbaik per node: gain terbesar, seri -> label terkecil
+        # (keys sudah terurut per node lalu komunitas)
+        starts = np.flatnonzero(np.r_[True, node[1:] != node[:-1]])
+        best = np.maximum.reduceat(gain, starts)
+        hit = np.flatnonzero(gain == np.repeat(best, np.diff(np.r_[starts, len(gain)])))
+        first = hit[np.r_[True, node[hit][1:] != node[hit][:-1]]]
+        best_node, best_comm, best_gain = node[first], comm[first], gain[first]
+        improvement = best_gain - stay[best_node]
+        better = (improvement > 1e-12 * m2) & (best_comm != membership[best_node])
+        if not better.any():
+            break
+
+        # Kandidat urut keuntungan terbesar lebih dulu. Node yang dipindah
+        # bersamaan tidak boleh bertetangga dengan kandidat lain yang lebih untung
+        # bila komunitas asal/tujuan keduanya beririsan; dengan begitu bobot
+        # node->komunitas yang dipakai menghitung gain tidak berubah oleh
+        # perpindahan tetangganya.
+        candidates = np.flatnonzero(better)
+        candidates = candidates[np.argsort(-improvement[candidates], kind='stable')]
+        priority = np.full(n, -np.inf)
+        priority[best_node[candidates]] = improvement[candidates] + rng.random(len(candidates)) * 1e-9 * m2
+        target = membership.copy()
+        target[best_node[candidates]] = best_comm[candidates]
+        clash = ((membership[src] == membership[dst]) | (membership[src] == target[dst])
+                 | (target[src] == membership[dst]) | (target[src] == target[dst]))
+        rival = np.full(n, -np.inf)
+        np.maximum.at(rival, src[clash], priority[dst[clash]])
+        independent = candidates[priority[best_node[candidates]] > rival[best_node[candidates]]]
+
+        accepted = None
+        move_prob = 1.0
+        while move_prob * len(independent) >= 2:
+            moving = independent[rng.random(len(independent)) < move_prob]
+            trial, q_trial = try_moves(best_node[moving], best_comm[moving])
+            if q_trial > q:
+                accepted = trial, q_trial
+                break
+            move_prob /= 2
+        if accepted is None:
+            accepted = sequential_moves(best_node[candidates])
+        if accepted is None:
+            break
+        membership, q = accepted
+    else:
+        log.warning("Louvain mencapai max_iter=%d, level mungkin belum konvergen (n=%d, modularity=%.6f)",
+                    max_iter, n, q)
+    return membership
+
+
+# Deteksi komunitas Louvain pada graf tak berarah berbobot. Hasil: id komunitas
+# per node, diurutkan dari komunitas terbesar (0) ke terkecil.
+def louvain(graph, weight='weight_amount', resolution=1.0, seed=0, max_levels=20):
+    rng = np.random.default_rng(seed)
+    n = graph.n_nodes
+    u, v, w = undirected_edges(graph, weight)
+    membership = np.arange(n)
+
+    level_n = n
+    for _ in range(max_levels):
+        level = _one_level(level_n, u, v, w, resolution, rng)
+        labels, level = np.unique(level, return_inverse=True)
+        level = level.ravel()
+        membership = level[membership]
+        if len(labels) == level_n:
+            break
+
+        # Agregasi: komunitas menjadi node, edge internal menjadi self-loop
+        a, b = level[u], level[v]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        level_n = len(labels)
+        keys, inverse = np.unique(lo * level_n + hi, return_inverse=True)
+        u, v = keys // level_n, keys % level_n
+        w = np.bincount(inverse.ravel(), weights=w, minlength=len(keys))
+
+    # Relabel berdasarkan ukuran komunitas (terbesar = 0), seri -> node pertama
+    sizes = np.bincount(membership)
+    first_node = np.full(len(sizes), n, dtype=np.int64)
+    np.minimum.at(first_node, membership, np.arange(n))
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.lexsort((first_node, -sizes))] = np.arange(len(sizes))
+    return rank[membership]
+
+
+def _cache_path(key, weight, resolution, seed, cache_dir):
+    name = f"{key[:16]}-{weight or 'unweighted'}-r{resolution:g}-s{seed}-v{LOUVAIN_VERSION}.npy"
+    return os.path.join(cache_dir, name)
+
+
+# Partisi dengan cache di disk per hash graf + parameter; graf yang sama tidak
+# pernah dihitung ulang (juga setelah server restart)
+def detect_communities(graph, weight='weight_amount', resolution=1.0, seed=0, cache_dir=COMMUNITY_DIR):
+    path = _cache_path(graph_hash(graph), weight, resolution, seed, cache_dir)
+    if os.path.exists(path):
+        return np.load(path)
+    membership = louvain(graph, weight, resolution, seed)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, membership)
+    _replace_atomic(path, write)
+    return membership
@@ -1,11 +1,33 @@
+import functools
+import json
+import os
+import time
+import uuid
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import networkx as nx
 import plotly.express as px
-from pyvis.network import Network
 import streamlit.components.v1 as components
-import os
-import tempfile
+
+import profiling
+from artifacts import ARTIFACTS
+from louvain import detect_communities
+from dashboard_cube import build_dashboard_cube
+from edges import network_edge_columns
+from entity_index import EntityIndex, ego_frames, ego_network
+from filter_index import FilterIndex
+from flow_trace import FlowIndex, path_subgraph, trace_flows
+from graph_core import ArrayGraph
+from ingest import SOURCE_XLSX, load_versioned_transactions
+from network_view import build_top_view, compute_layout, render_network_html, view_args
+from render_cache import NETWORK_HTML_CACHE, filter_key
+from warmup import Warmup
+
+# Copy-on-write: frame bersama (cache_resource) tidak ikut berubah oleh slice
+# atau kolom turunan di view mana pun (pandas >= 3 selalu CoW)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 # Konfigurasi halaman dengan tema yang lebih profesional
 st.set_page_config(
@@ -14,6 +36,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Instrumentasi (env MAYBANK_PROFILE=1 atau ?profile=1): waktu per tahap dan
+# counter per rerun, ditampilkan di sidebar dan ditulis ke log JSON lines
+profile_enabled = profiling.is_enabled(st.query_params)
+profile_session = st.session_state.setdefault('profile_session', uuid.uuid4().hex[:12])
+profile_run = profiling.start_run("rerun", profile_enabled, profile_session)
+
 # CSS untuk styling dashboard seperti Power BI/Tableau
 st.markdown("""
 <style>
@@ -216,56 +244,301 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Tabs untuk navigasi seperti di Power BI/Tableau
-tabs = st.tabs(["📊 Dashboard", "🔍 Network Analysis",])
-
-# Load Data
-@st.cache_data
+# Load Data (cache_resource: satu salinan dibagi semua view/sesi, tanpa copy per rerun).
+# Kolom numerik di-memory-map dari cache Feather, kolom teks berupa kategori.
+# Hash sumber diambil sekali dari metadata cache yang baru dibaca dan dipakai
+# key cache HTML, sehingga key selalu sesuai frame yang dimuat.
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("UNAIR - GRAPH NEW.xlsx").drop_duplicates()
-    def get_transaction_direction(row):
-        if row['type'].upper() == 'INCOMING':
-            return pd.Series({
-                'source': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})",
-                'target': f"{row['debitor_name']} ({row['debitor_bank']})"
-            })
-        elif row['type'].upper() == 'OUTGOING':
-            return pd.Series({
-                'source': f"{row['debitor_name']} ({row['debitor_bank']})",
-                'target': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})"
-            })
-        return pd.Series({'source': None, 'target': None})
-
-    df[['source', 'target']] = df.apply(get_transaction_direction, axis=1)
+    profiling.annotate(cache_hit=False)
+    df, data_version = load_versioned_transactions(SOURCE_XLSX)
     graph_df = df[['source', 'target', 'amount_tx_idr', 'trx', 'type']]
     try:
         nodes_df = pd.read_csv("nodes.csv")
         edges_df = pd.read_csv("edges.csv")
     except:
         nodes_df, edges_df = None, None
-    return df, graph_df, nodes_df, edges_df
+    return df, graph_df, nodes_df, edges_df, data_version
+
+# Agregat tab Dashboard (KPI, top transaksi, tipe, bank partner), dihitung sekali
+@st.cache_resource
+def load_dashboard_cube(_df, _nodes_df, _edges_df):
+    profiling.annotate(cache_hit=False)
+    return build_dashboard_cube(_df, _nodes_df, _edges_df)
+
+# Index filter amount/tipe untuk tab Network Analysis, dibangun sekali. Tipe
+# selain INCOMING/OUTGOING ikut tampil sebagai OUTGOING seperti tab lama.
+@st.cache_resource
+def load_filter_index(_df):
+    profiling.annotate(cache_hit=False)
+    return FilterIndex(_df.assign(**network_edge_columns(_df)))
+
+# Partisi komunitas (Louvain) atas graf penuh per pembobotan. Dihitung sekali
+# (dan di-cache di disk per hash graf); saat render cukup lookup nama -> komunitas.
+COMMUNITY_WEIGHTS = {"Nominal": 'weight_amount', "Frekuensi": 'weight_trx'}
+
+# Graf penuh (CSR/CSC) untuk komunitas dan query ego-network, dibangun sekali
+@st.cache_resource(show_spinner=False)
+def load_graph():
+    return ArrayGraph.from_edge_frame(load_data()[0])
+
+@st.cache_resource(show_spinner="Menghitung komunitas...")
+def load_communities(weight):
+    graph = load_graph()
+    membership = detect_communities(graph, weight)
+    return graph.index, membership, np.bincount(membership)
+
+# Index nama entitas + nilai/degree per node graf penuh untuk pencarian dan ego-network
+@st.cache_resource(show_spinner="Membangun index entitas...")
+def load_entity_index():
+    graph = load_graph()
+    tx_value = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+    return graph, EntityIndex(graph.names), tx_value, graph.degree()
+
+# Adjacency keluar bernominal + kode bank per node untuk penelusuran aliran dana
+@st.cache_resource(show_spinner="Membangun index aliran dana...")
+def load_flow_index():
+    return FlowIndex(load_graph())
+
+# Artefak pipeline per jenis visualisasi (HTML jaringan, workbook ranking)
+VIS_FILES = {
+    "Berdasarkan Nominal": "nominal.html",
+    "Berdasarkan Frekuensi": "frekuensi.html",
+    "Tanpa Pembobotan": "struktur_unweighted.html"
+}
+EXCEL_FILES = {
+    "Berdasarkan Nominal": "berdasarkan_nominal.xlsx",
+    "Berdasarkan Frekuensi": "berdasarkan_frekuensi.xlsx",
+    "Tanpa Pembobotan": "tanpa_pembobotan.xlsx"
+}
+
+# Graf top-N untuk tab Network Analysis, di-memo per kombinasi filter (argumen
+# dinormalisasi lewat view_args; jumlah entri dibatasi) agar slider yang kembali
+# ke nilai lama tidak menghitung ulang
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_network_view(_index, amount_range, selected_types, top_n, lod_keep=None,
+                       community_weight=None, communities=(), collapse_communities=False):
+    profiling.annotate(cache_hit=False)
+
+    # Komunitas tiap node: lookup ke partisi graf penuh
+    membership_of = None
+    if community_weight is not None:
+        full_index, full_membership, _ = load_communities(community_weight)
+        membership_of = lambda names: full_membership[full_index.get_indexer(names)]
+    return build_top_view(_index, amount_range, selected_types, top_n, lod_keep, membership_of,
+                          communities, collapse_communities)
+
+# HTML jaringan untuk satu state filter (tanpa fokus entitas); string kosong =
+# tidak ada data. Dipakai tab Network Analysis dan warm-up.
+def render_filtered_view(_index, amount_range, selected_types, top_n, lod_keep=None,
+                         community_weight=None, communities=(), collapse_communities=False):
+    with profiling.span('build_network_view', cache_hit=True):
+        view = build_network_view(_index, *view_args(amount_range, selected_types, top_n, lod_keep,
+                                                     community_weight, communities, collapse_communities))
+    if view is None:
+        return ""
+    with profiling.span('render_network_html', nodes=len(view[0]), edges=len(view[1])):
+        return render_network_html(*view)
+
+# Key cache HTML per state filter tab Network Analysis
+def network_view_key(amount_range, selected_types, top_n, lod_keep=None, community_mode="Tidak ada",
+                     community_weight=None, communities=(), ego=None):
+    return filter_key(
+        data=load_data()[4],
+        ego=ego,
+        amount_range=amount_range,
+        types=selected_types,
+        top_n=top_n,
+        lod_keep=lod_keep,
+        community_mode=community_mode,
+        community_weight=community_weight,
+        communities=list(communities),
+    )
+
+# --- Warm-up cache ---
+# Thread latar (sekali per proses) mengisi cache bersama: data, index, cube,
+# artefak pipeline, lalu HTML tampilan default tab Network Analysis dan preset
+# filter populer. Streamlit tidak menjalankan script saat server start: warm-up
+# dimulai oleh run script sesi pertama (start_warmup di cache_resource). Sesi
+# yang datang sebelum data inti siap menunggu paling lama MAYBANK_WARMUP_TIMEOUT
+# detik. Preset dibaca dari file JSON (list of dict dengan key opsional
+# amount_range, types, top_n, lod_keep); MAYBANK_WARMUP=0 mematikan warm-up.
+WARMUP_PRESETS_FILE = os.environ.get("MAYBANK_WARMUP_PRESETS", "warmup_presets.json")
+WARMUP_TIMEOUT = float(os.environ.get("MAYBANK_WARMUP_TIMEOUT", "300"))
+DEFAULT_WARMUP_PRESETS = [{}, {'types': ["INCOMING"]}, {'types': ["OUTGOING"]}, {'top_n': 100}, {'top_n': 500}]
+DEFAULT_TOP_N, DEFAULT_LOD_KEEP = 200, 300
+WARMUP_ESSENTIAL = ['data', 'dashboard_cube', 'filter_index']
+
+def load_warmup_presets():
+    if not os.path.exists(WARMUP_PRESETS_FILE):
+        return DEFAULT_WARMUP_PRESETS
+    with open(WARMUP_PRESETS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# Preset -> HTML di NETWORK_HTML_CACHE dengan key yang sama seperti state UI
+def warm_network_preset(preset):
+    df, _, _, _, _ = load_data()
+    amount_range = tuple(preset.get('amount_range', (float(df['amount_tx_idr'].min()), float(df['amount_tx_idr'].max()))))
+    selected_types = preset.get('types', df['type'].unique().tolist())
+    top_n = preset.get('top_n', DEFAULT_TOP_N)
+    lod_keep = preset.get('lod_keep', DEFAULT_LOD_KEEP)
+    NETWORK_HTML_CACHE.get_or_render(network_view_key(amount_range, selected_types, top_n, lod_keep),
+                                     render_filtered_view, load_filter_index(df), amount_range,
+                                     selected_types, top_n, lod_keep)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    def cube_task():
+        df, _, nodes_df, edges_df, _ = load_data()
+        load_dashboard_cube(df, nodes_df, edges_df)
+
+    presets = load_warmup_presets()
+    stages = [
+        [('data', load_data)],
+        [('dashboard_cube', cube_task), ('filter_index', lambda: load_filter_index(load_data()[0])),
+         ('artifacts', lambda: ARTIFACTS.preload(VIS_FILES.values(), EXCEL_FILES.values()))],
+        [(f"preset_{i}", functools.partial(warm_network_preset, preset)) for i, preset in enumerate(presets)]
+        + [('entity_index', load_entity_index)],
+    ]
+    return Warmup(stages).start()
+
+warmup = start_warmup() if os.environ.get("MAYBANK_WARMUP", "1") != "0" else None
+
+# Selama data inti belum siap tampilkan progres (bukan halaman kosong yang menunggu).
+# Loader yang macet tidak boleh menahan halaman selamanya: setelah batas waktu
+# sesi berhenti dengan pesan (memanggil loader langsung akan menunggu lock cache
+# yang sama).
+if warmup is not None and not warmup.done(WARMUP_ESSENTIAL):
+    warmup_progress = st.progress(0.0, text="Menyiapkan data...")
+    deadline = time.perf_counter() + WARMUP_TIMEOUT
+    while not warmup.wait(WARMUP_ESSENTIAL, timeout=0.25):
+        if time.perf_counter() > deadline:
+            warmup_progress.empty()
+            st.error(f"⚠️ Data belum siap setelah {WARMUP_TIMEOUT:.0f} detik "
+                     f"(masih berjalan: {', '.join(warmup.running()) or '-'}). Muat ulang halaman untuk mencoba lagi.")
+            st.stop()
+        warmup_progress.progress(warmup.progress(), text=f"Menyiapkan data: {', '.join(warmup.running())}")
+    warmup_progress.empty()
+
+with profiling.span('load_data', cache_hit=True) as stage:
+    df, graph_df, nodes_df, edges_df, _ = load_data()
+    stage['rows'] = len(df)
+
+with profiling.span('dashboard_cube', cache_hit=True):
+    cube = load_dashboard_cube(df, nodes_df, edges_df)
+
+with profiling.span('filter_index', cache_hit=True):
+    filter_index = load_filter_index(df)
+
+# Semua artefak dimuat sekali ke memori; pindah pilihan visualisasi tidak membaca disk
+with profiling.span('artifacts_preload') as stage:
+    loads_before = ARTIFACTS.loads
+    ARTIFACTS.preload(VIS_FILES.values(), EXCEL_FILES.values())
+    stage['files_loaded'] = ARTIFACTS.loads - loads_before
+
+# Tabs untuk navigasi seperti di Power BI/Tableau
+tabs = st.tabs(["📊 Dashboard", "🔍 Network Analysis",])
 
-df, graph_df, nodes_df, edges_df = load_data()
+debug_timing = st.sidebar.checkbox("⏱️ Debug: waktu per view", value=False)
+
+# Status warm-up di sidebar, diperbarui tiap detik selama warm-up masih berjalan
+if warmup is not None and not warmup.done():
+    @st.fragment(run_every=1.0)
+    def warmup_status():
+        if warmup.done():
+            st.caption(f"✅ Warm-up cache selesai ({warmup.elapsed():.1f} detik)")
+        else:
+            st.progress(warmup.progress(), text=f"Warm-up cache: {', '.join(warmup.running()) or '...'}")
+        if debug_timing:
+            st.dataframe(pd.DataFrame(warmup.summary()), use_container_width=True)
+
+    with st.sidebar:
+        warmup_status()
+
+# Setiap tab dijalankan sebagai fragment: interaksi di satu tab hanya menjalankan
+# ulang tab tersebut, bukan seluruh script. Waktu eksekusi per view dicatat di
+# session_state dan ditampilkan bila mode debug aktif.
+def view_fragment(name):
+    def decorate(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def run():
+            # Rerun fragment saja (tanpa rerun penuh) dicatat sebagai run tersendiri
+            standalone = profiling.current_run() is None
+            start = time.perf_counter()
+            with profiling.run_or_span(name, profile_enabled, profile_session) as fragment_run:
+                fn()
+            elapsed = time.perf_counter() - start
+
+            timings = st.session_state.setdefault('view_timings', {})
+            runs = timings.get(name, {}).get('Jumlah run', 0) + 1
+            timings[name] = {'Detik terakhir': round(elapsed, 3), 'Jumlah run': runs}
+            if debug_timing:
+                with st.expander("⏱️ Debug: waktu per view", expanded=True):
+                    st.dataframe(pd.DataFrame.from_dict(timings, orient='index'), use_container_width=True)
+                    if standalone and fragment_run is not None:
+                        st.dataframe(pd.DataFrame(profiling.breakdown(fragment_run)), use_container_width=True)
+        return run
+    return decorate
+
+# Ego-network k-hop di sekitar satu entitas pada graf penuh: query lewat
+# adjacency array (milidetik), hanya node di sekitar ego yang di-layout dan dirender
+EGO_DIRECTIONS = {"Masuk & keluar": 'both', "Keluar": 'out', "Masuk": 'in'}
+
+def build_ego_view(entity, hops, fanout, direction, community_weight=None):
+    graph, entities, _, _ = load_entity_index()
+    center = entities.lookup(entity)
+    if center < 0:
+        return None
+
+    with profiling.span('ego_query') as stage:
+        ids, hop, edge_ids = ego_network(graph, center, hops, fanout, direction)
+        stage.update(nodes=len(ids), edges=len(edge_ids))
+    return build_focus_view(ids, hop, edge_ids, community_weight)
+
+# Subgraf kecil hasil query fokus (ego-network / jalur aliran dana) siap render
+def build_focus_view(ids, hop, edge_ids, community_weight=None):
+    graph, _, tx_value, degree = load_entity_index()
+    nodes, edges = ego_frames(graph, ids, hop, edge_ids, tx_value, degree)
+    if community_weight is not None:
+        _, membership, _ = load_communities(community_weight)
+        nodes['community'] = membership[ids]
+
+    with profiling.span('layout', nodes=len(nodes), edges=len(edges)):
+        nodes = compute_layout(nodes.assign(members=1), edges)
+    return nodes, edges, max(degree[ids].max(), 1)
+
+# Penelusuran aliran dana: top-K jalur dari satu entitas ke entitas / bank
+# tujuan (best-first search terbatas di atas adjacency array), di-memo per
+# parameter agar render HTML dan tabel jalur memakai hasil yang sama
+FLOW_MODES = {"Bottleneck terbesar": 'bottleneck', "Total nominal terbesar": 'total'}
+FLOW_EXTERNAL = "Bank lain (eksternal)"
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def trace_entity_flows(entity, target_entity, target_bank, k, max_hops, min_amount, mode):
+    _, entities, _, _ = load_entity_index()
+    source = entities.lookup(entity)
+    target = None if target_entity is None else entities.lookup(target_entity)
+    if source < 0 or (target is not None and target < 0):
+        return [], False
+    with profiling.span('flow_query') as stage:
+        paths, truncated = trace_flows(load_flow_index(), source, target, target_bank, k, max_hops,
+                                       min_amount, mode)
+        stage.update(paths=len(paths), truncated=truncated)
+    return paths, truncated
 
 # Tab Dashboard
-with tabs[0]:
+@view_fragment("Dashboard")
+def render_dashboard_tab():
     st.markdown("<h3 style='color: #FFFFFF;'>📊 Network Overview</h3>", unsafe_allow_html=True)
     
         # --- Metrik Ringkasan Maybank ---
     if edges_df is not None and nodes_df is not None:
-        total_maybank_nodes = nodes_df[nodes_df['entity'].str.contains(r'\(B1\)', na=False)].shape[0]
-        total_external_entities = nodes_df[~nodes_df['entity'].str.contains(r'\(B1\)', na=False)].shape[0]
-        total_connections = edges_df.shape[0]
-
-        incoming_amount = edges_df[
-            (edges_df['type'] == 'INCOMING') &
-            (edges_df['target'].str.contains(r'\(B1\)', na=False))
-        ]['amount_tx_idr'].sum()
-
-        outgoing_amount = edges_df[
-            (edges_df['type'] == 'OUTGOING') &
-            (edges_df['source'].str.contains(r'\(B1\)', na=False))
-        ]['amount_tx_idr'].sum()
+        total_maybank_nodes = cube['n_maybank_nodes']
+        total_external_entities = cube['n_external_entities']
+        total_connections = cube['n_connections']
+        incoming_amount = cube['incoming_amount']
+        outgoing_amount = cube['outgoing_amount']
         
         total_volume = incoming_amount + outgoing_amount
 
@@ -327,15 +600,6 @@ with tabs[0]:
     else:
         st.warning("Data belum tersedia. Pastikan file 'nodes.csv' dan 'edges.csv' ada.")
 
-    # Total uang masuk dan keluar
-    incoming_amount = edges_df[edges_df['type'] == 'INCOMING']['amount_tx_idr'].sum()
-    outgoing_amount = edges_df[edges_df['type'] == 'OUTGOING']['amount_tx_idr'].sum()
-    
-    # Identifikasi top bank partners
-    bank_partners = edges_df['source'].str.extract(r'\((B\d+)\)')[0].value_counts().reset_index()
-    bank_partners.columns = ['Bank', 'Count']
-    bank_partners = bank_partners[bank_partners['Bank'] != 'B1']  # Exclude Maybank
-    
 
 
     # --- Visualisasi: Bar & Pie & Top Bank Partners ---
@@ -344,8 +608,7 @@ with tabs[0]:
 
     with col5:
         st.markdown("#### Top 5 Transaksi Tertinggi")
-        top5_df = df.sort_values(by="amount_tx_idr", ascending=False).head(5)
-        top5_df["label"] = top5_df.apply(lambda row: f"{row['debitor_name']} → {row['sender_recipient_name']}", axis=1)
+        top5_df = cube['top_transactions'].head(5)
 
         fig = px.bar(
             top5_df,
@@ -394,10 +657,7 @@ with tabs[0]:
     # --- Distribusi Tipe Transaksi ---
     with col6:
         st.markdown("#### Distribusi Tipe Transaksi")
-        type_summary = df.groupby('type').agg(
-            Count=('type', 'count'),
-            Total_Amount=('amount_tx_idr', 'sum')
-        ).reset_index().rename(columns={'type': 'Type'})
+        type_summary = cube['type_summary']
 
         fig = px.pie(
             type_summary,
@@ -431,20 +691,7 @@ with tabs[0]:
 
     with col7:
         st.markdown("#### Top Bank Partners")
-
-        partner_stats = edges_df.copy()
-        partner_stats['Bank'] = partner_stats['source'].str.extract(r'\((B\d+)\)')[0]
-
-        bank_partners = (
-            partner_stats.groupby('Bank')
-            .agg(
-                Count=('Bank', 'size'),
-                Total_Amount=('amount_tx_idr', 'sum')
-            )
-            .reset_index()
-        )
-        bank_partners = bank_partners[bank_partners['Bank'] != 'B1']
-        top_banks = bank_partners.sort_values('Count', ascending=False).head(10)
+        top_banks = cube['bank_partners'].head(10)
 
         fig = px.bar(
             top_banks,
@@ -488,55 +735,44 @@ with tabs[0]:
     st.markdown("<h3 style='color: #FFFFFF; margin-top: 30px;'>🌐 Network Graph</h3>", unsafe_allow_html=True)
     vis_option = st.radio("Pilih Jenis Visualisasi:", ["Berdasarkan Nominal", "Berdasarkan Frekuensi", "Tanpa Pembobotan"], horizontal=True)
 
-    vis_file = {
-        "Berdasarkan Nominal": "nominal.html",
-        "Berdasarkan Frekuensi": "frekuensi.html",
-        "Tanpa Pembobotan": "struktur_unweighted.html"
-    }.get(vis_option, "")
+    vis_file = VIS_FILES.get(vis_option, "")
 
     try:
-        with open(vis_file, "r", encoding="utf-8") as f:
-            html_content = f.read()
+        with profiling.span('artifact_html', file=vis_file) as stage:
+            loads_before = ARTIFACTS.loads
+            html_content = ARTIFACTS.html(vis_file)
+            stage['cache_hit'] = ARTIFACTS.loads == loads_before
         components.html(html_content, height=650, scrolling=True)
-    except Exception as e:
+    except Exception:
         st.error(f"Visualisasi tidak ditemukan. Pastikan file `{vis_file}` ada di direktori.")
 
     # Tabel setelah network graph
     st.markdown(f"<h3 style='color: #FFFFFF; margin-top: 30px;'>📄 Top Retensi & Akuisisi {vis_option}</h3>", unsafe_allow_html=True)
 
-    # Mapping visualisasi ke file dan sheet
-    excel_data = {
-        "Berdasarkan Nominal": "berdasarkan_nominal.xlsx",
-        "Berdasarkan Frekuensi": "berdasarkan_frekuensi.xlsx",
-        "Tanpa Pembobotan": "tanpa_pembobotan.xlsx"
-    }
-
-    selected_excel = excel_data.get(vis_option, "")
+    selected_excel = EXCEL_FILES.get(vis_option, "")
     if selected_excel:
         try:
-            xl = pd.ExcelFile(selected_excel)
+            page_size = st.selectbox("Baris per halaman", [10, 25, 50, 100], index=0)
 
             col1, col2 = st.columns(2)
 
-            with col1:
-                st.markdown("#### 🏆 Top Retensi")
-                top_retensi = xl.parse(xl.sheet_names[0]).head(10)
-                top_retensi.columns = ['Entity', 'Score']
-                st.dataframe(top_retensi, use_container_width=True)
-
-            with col2:
-                st.markdown("#### 📈 Top Akuisisi")
-                top_akuisisi = xl.parse(xl.sheet_names[1]).head(10)
-                top_akuisisi.columns = ['Entity', 'Score']
-                st.dataframe(top_akuisisi, use_container_width=True)
+            # Ranking ditampilkan per halaman dari artefak di memori
+            for col, sheet, title in [(col1, 0, "#### 🏆 Top Retensi"), (col2, 1, "#### 📈 Top Akuisisi")]:
+                with col:
+                    st.markdown(title)
+                    with profiling.span('artifact_rankings', file=selected_excel, sheet=sheet) as stage:
+                        loads_before = ARTIFACTS.loads
+                        _, n_pages = ARTIFACTS.rankings_page(selected_excel, sheet, 1, page_size)
+                        page = st.number_input("Halaman", 1, n_pages, 1, key=f"rank_page_{sheet}")
+                        ranking, _ = ARTIFACTS.rankings_page(selected_excel, sheet, page, page_size)
+                        stage['cache_hit'] = ARTIFACTS.loads == loads_before
+                    st.dataframe(ranking, use_container_width=True)
 
         except Exception as e:
             st.error(f"Gagal memuat data dari file: {e}")
     
     # Penjelasan & Insight Berdasarkan Pilihan
     if vis_option == "Berdasarkan Nominal":
-        ret_mets = ['amt_in_deg', 'amt_betweenness', 'amt_pagerank']
-        aqs_mets = ['amt_out_deg', 'amt_closeness']
         st.markdown("### ℹ️ Deskripsi: Berdasarkan Nominal")
         st.markdown("""
         - **Retensi Metrics**: Mengukur *seberapa besar nilai uang (amount)* yang masuk ke node Maybank melalui:
@@ -554,8 +790,6 @@ with tabs[0]:
         """)
 
     elif vis_option == "Berdasarkan Frekuensi":
-        ret_mets = ['trx_in_deg', 'trx_betweenness', 'trx_pagerank']
-        aqs_mets = ['trx_out_deg','trx_closeness']
         st.markdown("### ℹ️ Deskripsi: Berdasarkan Frekuensi Transaksi")
         st.markdown("""
         - **Retensi Metrics**: Mengukur *seberapa sering transaksi masuk* ke Maybank:
@@ -573,8 +807,6 @@ with tabs[0]:
         """)
 
     elif vis_option == "Tanpa Pembobotan":
-        ret_mets = ['unw_in_deg', 'unw_betweenness', 'unw_pagerank']
-        aqs_mets = ['unw_out_deg','unw_closeness']
         st.markdown("### ℹ️ Deskripsi: Tanpa Pembobotan (Struktur Jaringan Saja)")
         st.markdown("""
         - **Retensi Metrics**: Mengukur *struktur posisi node* tanpa memperhitungkan nilai atau frekuensi:
@@ -593,13 +825,15 @@ with tabs[0]:
 
 
 # Tab 2 - Network & Filters
-with tabs[1]:
+@view_fragment("Network Analysis")
+def render_network_tab():
     st.markdown("### 🔍 Network Analysis")
 
     with st.expander("🎛️ Filter & Visualization Settings", expanded=True):
         # Jumlah maksimum top node disesuaikan dengan jumlah unik node
-        all_nodes = pd.unique(df[['debitor_name', 'sender_recipient_name']].values.ravel('K'))
-        top_n = st.slider("Jumlah Node Teratas", 5, len(all_nodes), 200)
+        # (dihitung dari kategori, tanpa materialisasi kolom nama setiap rerun)
+        n_names = len(df['debitor_name'].cat.categories.union(df['sender_recipient_name'].cat.categories))
+        top_n = st.slider("Jumlah Node Teratas", 5, n_names, DEFAULT_TOP_N)
 
         min_amount = float(df['amount_tx_idr'].min())
         max_amount = float(df['amount_tx_idr'].max())
@@ -608,68 +842,129 @@ with tabs[1]:
         transaction_types = df['type'].unique().tolist()
         selected_types = st.multiselect("Tipe Transaksi", transaction_types, default=transaction_types)
 
-    # Apply filters
-    filtered_df = df[
-        (df['amount_tx_idr'] >= amount_range[0]) &
-        (df['amount_tx_idr'] <= amount_range[1]) &
-        (df['type'].isin(selected_types))
-    ]
+        # Level of detail untuk jaringan besar
+        lod_enabled = st.checkbox("Ringkas node bernilai kecil per bank", value=True)
+        lod_keep = st.slider("Jumlah node individual maksimum", 50, 1000, DEFAULT_LOD_KEEP, disabled=not lod_enabled)
+
+        # Komunitas: warnai, filter, atau gabung menjadi super-node
+        community_mode = st.selectbox("Komunitas", ["Tidak ada", "Warnai per komunitas", "Gabung komunitas jadi super-node"])
+        community_weight, selected_communities = None, []
+        if community_mode != "Tidak ada":
+            community_weight = COMMUNITY_WEIGHTS[st.radio("Bobot komunitas", list(COMMUNITY_WEIGHTS), horizontal=True)]
+            _, _, community_sizes = load_communities(community_weight)
+            options = list(range(min(len(community_sizes), 50)))
+            selected_communities = st.multiselect(
+                "Filter komunitas (kosong = semua)", options,
+                format_func=lambda c: f"Komunitas {c} ({community_sizes[c]:,} node)",
+            )
 
-    # Source-target column logic
-    if not filtered_df.empty:
-        filtered_df[['source', 'target']] = filtered_df.apply(
-            lambda row: pd.Series({
-                'source': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})",
-                'target': f"{row['debitor_name']} ({row['debitor_bank']})"
-            }) if row['type'].upper() == 'INCOMING' else pd.Series({
-                'source': f"{row['debitor_name']} ({row['debitor_bank']})",
-                'target': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})"
-            }),
-            axis=1
-        )
+        # Fokus ke satu entitas: pencarian nama lalu ego-network k-hop
+        focus_entity, focus_mode = None, None
+        query = st.text_input("Cari entitas (nama atau kode bank)", "")
+        if query:
+            graph, entities, tx_value, _ = load_entity_index()
+            found = entities.search(query, limit=50)
+            found = found[np.argsort(-tx_value[found], kind='stable')]
+            if len(found) == 0:
+                st.caption("Entitas tidak ditemukan.")
+            else:
+                focus_entity = st.selectbox(f"Entitas ({len(found)} hasil teratas)", graph.names[found].tolist())
+                focus_mode = st.radio("Mode fokus", ["Ego-network", "Telusuri aliran dana"], horizontal=True)
+                if focus_mode == "Ego-network":
+                    ego_hops = st.slider("Jumlah hop", 1, 4, 2)
+                    ego_fanout = st.slider("Maks. tetangga per node per hop (nominal terbesar)", 1, 100, 10)
+                    ego_direction = EGO_DIRECTIONS[st.radio("Arah", list(EGO_DIRECTIONS), horizontal=True)]
+                else:
+                    banks = sorted(bank for bank in load_flow_index().banks if bank)
+                    flow_bank = st.selectbox("Bank tujuan", [FLOW_EXTERNAL] + banks)
+                    flow_bank = None if flow_bank == FLOW_EXTERNAL else flow_bank
+                    flow_target = None
+                    target_query = st.text_input("Entitas tujuan (opsional, menggantikan bank tujuan)", "")
+                    if target_query:
+                        targets = entities.search(target_query, limit=50)
+                        targets = targets[np.argsort(-tx_value[targets], kind='stable')]
+                        if len(targets) == 0:
+                            st.caption("Entitas tujuan tidak ditemukan.")
+                        else:
+                            flow_target = st.selectbox("Entitas tujuan", graph.names[targets].tolist())
+                    flow_k = st.slider("Jumlah jalur (K)", 1, 20, 5)
+                    flow_hops = st.slider("Maks. hop", 1, 6, 4)
+                    flow_min = st.number_input("Nominal minimum per edge (IDR)", min_value=0.0, value=0.0,
+                                               step=1_000_000.0, format="%.0f")
+                    flow_mode = FLOW_MODES[st.radio("Urutkan jalur", list(FLOW_MODES), horizontal=True)]
+                st.caption("Mode fokus memakai graf penuh; filter nominal, tipe, dan top-N tidak berlaku.")
+
+    flow_paths = []
+    if focus_mode == "Telusuri aliran dana":
+        flow_state = (focus_entity, flow_target, flow_bank, flow_k, flow_hops, flow_min, flow_mode)
+        flow_paths, flow_truncated = trace_entity_flows(*flow_state)
+        if not flow_paths:
+            st.warning("⚠️ Tidak ada jalur aliran dana yang sesuai dengan parameter yang dipilih.")
+            return
+
+    # Render HTML di memori, dibagi antar sesi lewat cache LRU per state filter
+    # (string kosong = tidak ada data untuk filter tersebut)
+    def render_view():
+        profiling.annotate(cache_hit=False)
+        if focus_entity is not None:
+            if flow_paths:
+                view = build_focus_view(*path_subgraph(flow_paths), community_weight)
+            else:
+                view = build_ego_view(focus_entity, ego_hops, ego_fanout, ego_direction, community_weight)
+            if view is None:
+                return ""
+            with profiling.span('render_network_html', nodes=len(view[0]), edges=len(view[1])):
+                return render_network_html(*view)
+        return render_filtered_view(filter_index, amount_range, selected_types, top_n,
+                                    lod_keep if lod_enabled else None, community_weight, selected_communities,
+                                    community_mode == "Gabung komunitas jadi super-node")
+
+    if focus_entity is None:
+        ego_state = None
+    elif flow_paths:
+        ego_state = ('flow',) + flow_state
     else:
+        ego_state = (focus_entity, ego_hops, ego_fanout, ego_direction)
+    view_key = network_view_key(amount_range, selected_types, top_n, lod_keep if lod_enabled else None,
+                                community_mode, community_weight, selected_communities, ego_state)
+    with profiling.span('network_html', cache_hit=True) as stage:
+        html = NETWORK_HTML_CACHE.get_or_render(view_key, render_view)
+        stage['bytes'] = len(html)
+    if not html:
         st.warning("⚠️ Tidak ada data yang sesuai dengan filter yang dipilih.")
-        st.stop()
-
-    filtered_graph_df = filtered_df[['source', 'target', 'amount_tx_idr', 'trx', 'type']]
-    G = nx.from_pandas_edgelist(filtered_graph_df, 'source', 'target',
-                                edge_attr=['amount_tx_idr', 'trx', 'type'],
-                                create_using=nx.DiGraph())
-
-    # Hitung nilai transaksi per node
-    node_tx_values = {
-        node: sum(d['amount_tx_idr'] for _, _, d in G.in_edges(node, data=True)) +
-              sum(d['amount_tx_idr'] for _, _, d in G.out_edges(node, data=True))
-        for node in G.nodes()
-    }
-
-    # Ambil top-N node
-    top_nodes = sorted(node_tx_values.items(), key=lambda x: x[1], reverse=True)[:top_n]
-    top_node_names = [n for n, _ in top_nodes]
-    top_subgraph = G.subgraph(top_node_names)
+        return
+
+    # Visualisasi Network (posisi sudah dihitung, physics browser dimatikan)
+    components.html(html, height=600)
+
+    if flow_paths:
+        if flow_truncated:
+            st.warning("⚠️ Batas pencarian tercapai: jalur di bawah adalah yang terbaik yang ditemukan, "
+                       "belum tentu top-K. Naikkan nominal minimum atau kurangi maks. hop.")
+        names = load_graph().names
+        st.dataframe(pd.DataFrame({
+            'Jalur': [" → ".join(names[path['nodes']]) for path in flow_paths],
+            'Hop': [path['hops'] for path in flow_paths],
+            'Bottleneck (IDR)' if flow_mode == 'bottleneck' else 'Total nominal (IDR)':
+                [path['score'] for path in flow_paths],
+        }), use_container_width=True)
+
+    stats = NETWORK_HTML_CACHE.stats()
+    st.caption(
+        f"Cache render: {stats['hits']} hit, {stats['misses']} miss, {stats['waits']} menunggu, "
+        f"{stats['entries']} entri ({stats['bytes'] / 1024 / 1024:.1f} MB)"
+    )
 
-    # Visualisasi Network
-    net = Network(height="600px", width="100%", directed=True, notebook=False, bgcolor="#ffffff", font_color="#252525")
 
-    max_tx_value = max([v for _, v in top_nodes]) if top_nodes else 1
-
-    # Hitung degree (jumlah hubungan) per node
-    node_degrees = dict(G.degree())
-    max_degree = max(node_degrees.values()) if node_degrees else 1
+with tabs[0]:
+    render_dashboard_tab()
 
-    for node in top_node_names:
-        degree = node_degrees.get(node, 0)
-        size = 15 + (degree / max_degree * 100)  # skala proporsional berdasarkan degree
-        color = "#FFC700" if "(B1)" in node else "#547792"
-        net.add_node(node, label=node, size=size, title=node, color=color, borderWidth=2)
-        
-    for source, target, attr in top_subgraph.edges(data=True):
-        width = 2  # Tetap
-        title = f"Amount: {attr.get('amount_tx_idr', 0):,.2f} IDR\nType: {attr.get('type', 'N/A')}"
-        net.add_edge(source, target, width=width, title=title, color="#0078D4", arrows={"to": {"enabled": True, "scaleFactor": 1.5}})
-
-    net.toggle_physics(True)
-    path = os.path.join(tempfile.gettempdir(), "network_graph.html")
-    net.save_graph(path)
-    with open(path, "r", encoding="utf-8") as f:
-        components.html(f.read(), height=600)
+with tabs[1]:
+    render_network_tab()
+
+# Tutup run profiling: tulis log JSON lines dan tampilkan rincian di sidebar
+profiling.finish_run(profile_run)
+if profile_run is not None:
+    with st.sidebar.expander(f"🧪 Profiling rerun ({profile_run.seconds:.3f} detik)", expanded=False):
+        st.dataframe(pd.DataFrame(profiling.breakdown(profile_run)), use_container_width=True)
+        st.caption(f"Log: {os.environ.get(profiling.LOG_ENV_VAR, profiling.DEFAULT_LOG)}")
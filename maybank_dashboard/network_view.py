@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, diags
+from scipy.sparse.linalg import ArpackNoConvergence, eigsh
+
+import profiling
+from graph_core import top_k
+
+B1_COLOR = "#FFC700"
+OTHER_COLOR = "#547792"
+EDGE_COLOR = "#0078D4"
+GROUP_COLOR = "#B0B0B0"
+COMMUNITY_COLORS = [
+    "#1F77B4", "#FF7F0E", "#2CA02C", "#D62728", "#9467BD", "#8C564B", "#E377C2", "#7F7F7F",
+    "#BCBD22", "#17BECF", "#393B79", "#637939", "#8C6D31", "#843C39", "#7B4173", "#3182BD",
+]
+
+
+# Kode bank dari key node "NAMA (B14)" -> "B14"
+def bank_code(names):
+    return pd.Series(names, dtype=object).str.extract(r'\(([^()]*)\)$')[0]
+
+
+# --- Level of detail ---
+
+# Bila node lebih banyak dari `keep`, node bernilai kecil (di luar `keep` teratas)
+# digabung menjadi satu node agregat per bank, edge-nya ikut diagregasi
+def collapse_by_bank(nodes, edges, keep):
+    nodes = nodes.assign(members=1)
+    if keep is None or len(nodes) <= keep:
+        return nodes, edges
+
+    nodes = nodes.sort_values('tx_value', ascending=False, kind='stable')
+    kept, rest = nodes.iloc[:keep], nodes.iloc[keep:]
+    group = "Lainnya (" + bank_code(rest['node'].to_numpy()).fillna('?').to_numpy() + ")"
+    if 'community' in rest:
+        rest = rest.assign(community=-1)  # grup bank bisa berisi banyak komunitas
+    return _merge_nodes(kept, rest, group, edges)
+
+
+# Setiap komunitas menjadi satu super-node "Komunitas N"
+def collapse_by_community(nodes, edges):
+    nodes = nodes.assign(members=1)
+    group = ("Komunitas " + nodes['community'].astype(str)).to_numpy()
+    return _merge_nodes(nodes.iloc[:0], nodes, group, edges)
+
+
+# Gabungkan node `rest` menurut label `group` (nilai dijumlah) dan agregasi edge-nya
+def _merge_nodes(kept, rest, group, edges):
+    agg = {'tx_value': ('tx_value', 'sum'), 'degree': ('degree', 'sum'), 'members': ('members', 'sum')}
+    if 'community' in rest:
+        agg['community'] = ('community', 'first')
+    grouped = (
+        rest.assign(node=group)
+        .groupby('node', sort=False)
+        .agg(**agg)
+        .reset_index()
+    )
+
+    mapping = pd.Series(group, index=rest['node'].to_numpy())
+    edges = edges.assign(
+        source=edges['source'].map(mapping).fillna(edges['source']),
+        target=edges['target'].map(mapping).fillna(edges['target']),
+    )
+    edges = (
+        edges[edges['source'] != edges['target']]
+        .groupby(['source', 'target'], sort=False)
+        .agg(weight_amount=('weight_amount', 'sum'), weight_trx=('weight_trx', 'sum'), type=('type', 'last'))
+        .reset_index()
+    )
+    return pd.concat([kept, grouped], ignore_index=True), edges
+
+
+# --- Layout di server ---
+
+def _symmetric_adjacency(n, src, dst):
+    A = coo_matrix((np.ones(len(src)), (src, dst)), shape=(n, n)).tocsr()
+    A = A + A.T
+    A.data[:] = 1.0
+    return A
+
+
+# Spectral layout: 2 eigenvector non-trivial dari adjacency ternormalisasi
+def spectral_layout(n, src, dst, seed=0):
+    rng = np.random.default_rng(seed)
+    if n < 4 or len(src) == 0:
+        return rng.uniform(-1, 1, (n, 2))
+    A = _symmetric_adjacency(n, src, dst)
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    inv_sqrt = diags(1.0 / np.sqrt(np.maximum(degree, 1)))
+    try:
+        _, vectors = eigsh(inv_sqrt @ A @ inv_sqrt, k=3, which='LA', v0=rng.uniform(size=n))
+        pos = vectors[:, :2] * inv_sqrt.diagonal()[:, None]
+    except ArpackNoConvergence:
+        pos = rng.uniform(-1, 1, (n, 2))
+    # node terisolasi / komponen kecil mudah bertumpuk: beri jitter kecil
+    pos = pos / (np.abs(pos).max() or 1.0)
+    return pos + rng.normal(scale=0.02, size=pos.shape)
+
+
+# Fruchterman-Reingold vektor (seperti networkx), repulsi dihitung per blok
+# baris agar memori O(block * n); atraksi lewat array edge
+def force_layout(n, src, dst, pos=None, iterations=50, seed=0, block=512):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, (n, 2)) if pos is None else np.array(pos, dtype=np.float64)
+    if n < 2:
+        return pos
+    k = np.sqrt(1.0 / n)
+    t = max(np.ptp(pos[:, 0]), np.ptp(pos[:, 1])) * 0.1 or 0.1
+    dt = t / (iterations + 1)
+
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+        x, y = pos[:, 0], pos[:, 1]
+        for start in range(0, n, block):
+            dx = x[start:start + block, None] - x[None, :]
+            dy = y[start:start + block, None] - y[None, :]
+            force = k * k / np.maximum(dx * dx + dy * dy, 1e-4)
+            disp[start:start + block, 0] = (dx * force).sum(axis=1)
+            disp[start:start + block, 1] = (dy * force).sum(axis=1)
+
+        delta = pos[src] - pos[dst]
+        dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 0.01)
+        pull = delta * (dist / k)[:, None]
+        np.subtract.at(disp, src, pull)
+        np.add.at(disp, dst, pull)
+
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 0.01)
+        pos += disp * (t / length)[:, None]
+        t -= dt
+    return pos
+
+
+# Posisi node (kolom x, y dalam piksel) untuk graf yang ditampilkan.
+# Graf kecil: spectral + force-directed; graf besar: spectral + sedikit iterasi.
+def compute_layout(nodes, edges, seed=0, scale=None):
+    n = len(nodes)
+    index = pd.Index(nodes['node'])
+    src = index.get_indexer(edges['source'])
+    dst = index.get_indexer(edges['target'])
+    ok = (src >= 0) & (dst >= 0)
+    src, dst = src[ok], dst[ok]
+
+    pos = spectral_layout(n, src, dst, seed)
+    pos = force_layout(n, src, dst, pos, iterations=50 if n <= 1000 else 10, seed=seed)
+    pos -= pos.mean(axis=0)
+    pos /= np.abs(pos).max() or 1.0
+    scale = scale or 60 * np.sqrt(max(n, 1))
+    return nodes.assign(x=pos[:, 0] * scale, y=pos[:, 1] * scale)
+
+
+# --- View top-N tab Network Analysis ---
+
+# Argumen memo view per state filter: daftar tipe/komunitas diurutkan dan angka
+# dinormalisasi sehingga state yang sama (mis. urutan multiselect berbeda)
+# memakai entri memo yang sama
+def view_args(amount_range, selected_types, top_n, lod_keep=None, community_weight=None, communities=(),
+              collapse_communities=False):
+    return ((float(amount_range[0]), float(amount_range[1])), tuple(sorted(selected_types)), int(top_n),
+            None if lod_keep is None else int(lod_keep), community_weight,
+            tuple(sorted(int(c) for c in communities)), bool(collapse_communities))
+
+
+# Graf top-N (nilai transaksi masuk + keluar) dari FilterIndex untuk satu state
+# filter, siap render: (nodes dengan x/y, edges, degree maksimum) atau None bila
+# tidak ada data. `membership_of(names)` memberi komunitas tiap node (graf penuh);
+# bila `communities` diisi hanya node di komunitas tsb yang dipilih.
+def build_top_view(index, amount_range, selected_types, top_n, lod_keep=None, membership_of=None,
+                   communities=(), collapse_communities=False):
+    with profiling.span('filter_graph') as stage:
+        G = index.graph(amount_range[0], amount_range[1], selected_types)
+        stage.update(rows=index.count(amount_range[0], amount_range[1], selected_types),
+                     nodes=G.n_nodes, edges=G.n_edges)
+    if G.n_nodes == 0:
+        return None
+
+    membership = None
+    if membership_of is not None:
+        with profiling.span('community_lookup', nodes=G.n_nodes):
+            membership = membership_of(G.names)
+
+    with profiling.span('node_tx_values', nodes=G.n_nodes):
+        node_tx_values = G.in_degree('weight_amount') + G.out_degree('weight_amount')
+
+        # Seleksi parsial top-N (hanya dari komunitas terpilih bila ada)
+        candidates = np.arange(G.n_nodes)
+        if membership is not None and communities:
+            candidates = np.flatnonzero(np.isin(membership, communities))
+            if len(candidates) == 0:
+                return None
+        top_ids = candidates[top_k(node_tx_values[candidates], top_n)]
+
+        node_degrees = G.degree()
+        top_nodes = pd.DataFrame({
+            'node': G.names[top_ids],
+            'tx_value': node_tx_values[top_ids],
+            'degree': node_degrees[top_ids],
+        })
+        if membership is not None:
+            top_nodes['community'] = membership[top_ids]
+
+    with profiling.span('subgraph') as stage:
+        top_edges = G.subgraph(top_ids).edge_frame()
+        stage.update(nodes=len(top_nodes), edges=len(top_edges))
+
+    # Level of detail: node kecil digabung per bank, lalu posisi dihitung di server
+    with profiling.span('layout') as stage:
+        if collapse_communities and membership is not None:
+            top_nodes, top_edges = collapse_by_community(top_nodes, top_edges)
+        else:
+            top_nodes, top_edges = collapse_by_bank(top_nodes, top_edges, lod_keep)
+        top_nodes = compute_layout(top_nodes, top_edges)
+        stage.update(nodes=len(top_nodes), edges=len(top_edges))
+    return top_nodes, top_edges, max(node_degrees.max(), 1)
+
+
+# --- Render HTML pyvis ---
+
+# HTML jaringan dalam memori. Dengan posisi (x, y) physics dimatikan sehingga
+# browser tidak perlu menjalankan simulasi.
+def render_network_html(nodes, edges, max_degree, height="600px", physics=None):
+    from pyvis.network import Network
+
+    has_layout = 'x' in nodes
+    physics = not has_layout if physics is None else physics
+    net = Network(height=height, width="100%", directed=True, notebook=False, bgcolor="#ffffff", font_color="#252525")
+
+    members = nodes['members'] if 'members' in nodes else pd.Series(1, index=nodes.index)
+    communities = nodes['community'] if 'community' in nodes else pd.Series(None, index=nodes.index)
+    hops = nodes['hop'] if 'hop' in nodes else pd.Series(None, index=nodes.index)
+    for i, (node, degree, count, community, hop) in enumerate(zip(nodes['node'], nodes['degree'], members, communities, hops)):
+        size = 15 + (min(degree, max_degree) / max_degree * 100)  # skala proporsional berdasarkan degree
+        color = B1_COLOR if "(B1)" in node else OTHER_COLOR
+        title = node if count == 1 else f"{node}: {count:,} node digabung"
+        if community is not None and not pd.isna(community):
+            # Warna isi = komunitas, border tetap menandai nasabah B1
+            fill = COMMUNITY_COLORS[int(community) % len(COMMUNITY_COLORS)] if community >= 0 else GROUP_COLOR
+            color = {'background': fill, 'border': color}
+            title += f"\nKomunitas {int(community)}" if community >= 0 else ""
+        border_width = 2
+        if hop is not None and not pd.isna(hop):
+            # Ego-network: jarak hop dari entitas fokus, entitas fokus diberi border tebal
+            title += f"\nHop {int(hop)}"
+            border_width = 6 if hop == 0 else 2
+        options = {}
+        if has_layout:
+            options = {'x': float(nodes['x'].iat[i]), 'y': float(nodes['y'].iat[i]), 'physics': physics}
+        net.add_node(node, label=node, size=float(size), title=title, color=color, borderWidth=border_width, **options)
+
+    for edge in edges.itertuples(index=False):
+        title = f"Amount: {edge.weight_amount:,.2f} IDR\nType: {edge.type}"
+        net.add_edge(edge.source, edge.target, width=2, title=title, color=EDGE_COLOR,
+                     arrows={"to": {"enabled": True, "scaleFactor": 1.5}})
+
+    net.toggle_physics(physics)
+    if not physics:
+        net.options.edges.smooth.enabled = False
+    return net.generate_html()
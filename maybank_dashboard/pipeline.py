@@ -0,0 +1,420 @@
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from centrality import WEIGHTINGS, betweenness, closeness, pagerank
+from louvain import detect_communities
+from edges import build_edge_columns, pipe_key
+from graph_core import ArrayGraph
+from ingest import CACHE_DIR, SOURCE_XLSX, _replace_atomic, load_transactions, source_sha256
+from sensitivity import core_candidates
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = logging.getLogger("pipeline")
+
+PIPELINE_VERSION = 1
+
+# Prefix kolom metrik per pembobotan
+PREFIX = {None: 'unw', 'weight_amount': 'amt', 'weight_trx': 'trx'}
+
+METRIC_COLUMNS = [
+    'unw_in_deg', 'unw_out_deg', 'unw_betweenness', 'unw_closeness', 'unw_pagerank',
+    'trx_in_deg', 'trx_out_deg', 'trx_betweenness', 'trx_closeness', 'trx_pagerank',
+    'amt_in_deg', 'amt_out_deg', 'amt_betweenness', 'amt_closeness', 'amt_pagerank',
+]
+
+# Metrik retensi/akuisisi, threshold, dan file artefak per pembobotan (sesuai notebook)
+RANKINGS = {
+    'amt': {
+        'weight': 'weight_amount',
+        'ret_mets': ['amt_in_deg', 'amt_betweenness', 'amt_pagerank'],
+        'aqs_mets': ['amt_out_deg', 'amt_closeness'],
+        'ret_thresh': 0.8, 'aq_thresh': 0.7,
+        'excel': 'berdasarkan_nominal.xlsx', 'html': 'nominal.html',
+    },
+    'trx': {
+        'weight': 'weight_trx',
+        'ret_mets': ['trx_in_deg', 'trx_betweenness', 'trx_pagerank'],
+        'aqs_mets': ['trx_out_deg', 'trx_closeness'],
+        'ret_thresh': 0.8, 'aq_thresh': 0.7,
+        'excel': 'berdasarkan_frekuensi.xlsx', 'html': 'frekuensi.html',
+    },
+    'unw': {
+        'weight': None,
+        'ret_mets': ['unw_in_deg', 'unw_betweenness', 'unw_pagerank'],
+        'aqs_mets': ['unw_out_deg', 'unw_closeness'],
+        'ret_thresh': 0.7, 'aq_thresh': 0.7,
+        'excel': 'tanpa_pembobotan.xlsx', 'html': 'struktur_unweighted.html',
+    },
+}
+
+
+# --- Stage ---
+
+def stage_ingest(ctx):
+    return load_transactions(ctx.src, ctx.cache_dir)
+
+
+# Graf metrik memakai key "NAMA|BANK" dan arah transaksi seperti notebook
+def stage_graph(ctx, df):
+    return ArrayGraph.from_edge_frame(df.assign(**build_edge_columns(df, key=pipe_key, notebook=True)))
+
+
+def stage_degrees(ctx, graph):
+    out = {}
+    for weight in WEIGHTINGS:
+        out[f'{PREFIX[weight]}_in_deg'] = graph.in_degree(weight)
+        out[f'{PREFIX[weight]}_out_deg'] = graph.out_degree(weight)
+    return out
+
+
+def stage_betweenness(ctx, graph):
+    bc = betweenness(graph, k=ctx.betweenness_k, seed=ctx.seed, workers=ctx.workers)
+    return {f'{PREFIX[w]}_betweenness': v for w, v in bc.items()}
+
+
+def stage_closeness(ctx, graph):
+    cc = closeness(graph, workers=ctx.workers)
+    return {f'{PREFIX[w]}_closeness': v for w, v in cc.items()}
+
+
+def stage_pagerank(ctx, graph):
+    pr = pagerank(graph)
+    return {f'{PREFIX[w]}_pagerank': v for w, v in pr.items()}
+
+
+def normalize_metrics(df_metric):
+    from sklearn.preprocessing import MinMaxScaler
+
+    df_metric2 = df_metric.copy()
+    df_metric2[METRIC_COLUMNS] = MinMaxScaler().fit_transform(df_metric[METRIC_COLUMNS])
+    return df_metric2
+
+
+def write_metric_tables(df_metric, df_metric2, out_dir):
+    paths = [os.path.join(out_dir, 'df_metric.csv'), os.path.join(out_dir, 'df_metric2.csv')]
+    df_metric.to_csv(paths[0], index=False)
+    df_metric2.to_csv(paths[1], index=False)
+    return paths
+
+
+# Simpan metrik mentah & ternormalisasi, kembalikan versi ternormalisasi
+def write_metrics(df_metric, out_dir):
+    df_metric2 = normalize_metrics(df_metric)
+    write_metric_tables(df_metric, df_metric2, out_dir)
+    return df_metric2
+
+
+# Gabungkan 15 metrik per node
+def stage_metrics(ctx, graph, *parts):
+    columns = {'node': graph.names}
+    for part in parts:
+        columns.update(part)
+    return pd.DataFrame(columns)[['node'] + METRIC_COLUMNS]
+
+
+def stage_normalized(ctx, df_metric):
+    return normalize_metrics(df_metric)
+
+
+# df_metric.csv / df_metric2.csv ditulis di stage tanpa cache (seperti tables)
+# agar tetap terbentuk walau stage metrik diambil dari cache
+def stage_metric_tables(ctx, df_metric, df_metric2):
+    return write_metric_tables(df_metric, df_metric2, ctx.out_dir)
+
+
+# Subset B1 (retensi) dan non-B1 (akuisisi); calon akuisisi yang user-nya
+# sudah punya akun di B1 dibuang
+def split_candidates(df_metric2):
+    parts = df_metric2['node'].str.split('|')
+    bank = parts.str[1]
+    user_id = parts.str[0]
+
+    df_ret = df_metric2[bank == 'B1'].copy()
+    df_aq = df_metric2[bank != 'B1'].copy()
+    user_id_b1 = user_id[bank == 'B1'].unique()
+    df_aq['user_id'] = user_id[bank != 'B1']
+    return df_ret, df_aq[~df_aq['user_id'].isin(user_id_b1)].copy()
+
+
+def compute_rankings(df_metric2, name, k=20, n_samples=200, seed=0):
+    cfg = RANKINGS[name]
+    df_ret, df_aq = split_candidates(df_metric2)
+    core_ret = core_candidates(df_ret, cfg['ret_mets'], k=k, n_samples=n_samples,
+                               seed=seed, thresh=cfg['ret_thresh'])
+    core_aq = core_candidates(df_aq, cfg['aqs_mets'], k=k, n_samples=n_samples,
+                              seed=seed, thresh=cfg['aq_thresh'])
+    return core_ret, core_aq
+
+
+def make_stage_rankings(name):
+    def stage_rankings(ctx, df_metric2):
+        return compute_rankings(df_metric2, name, ctx.k, ctx.n_samples, ctx.seed)
+
+    return stage_rankings
+
+
+def write_rankings(path, core_ret, core_aq):
+    with pd.ExcelWriter(path) as writer:
+        core_ret.rename('frequency').to_excel(writer, sheet_name='Core Retention')
+        core_aq.rename('frequency').to_excel(writer, sheet_name='Core Acquisition')
+
+
+# Visualisasi core candidates + tetangga langsungnya (format artefak notebook)
+def render_core_network(graph, core_ret, core_aq, weight, path):
+    from pyvis.network import Network
+
+    freq = pd.concat([core_ret, core_aq])
+    core_ids = graph.node_ids(freq.index)
+    edge_ids = np.flatnonzero(np.isin(graph.src, core_ids) | np.isin(graph.dst, core_ids))
+    node_ids = pd.unique(np.concatenate([core_ids, graph.src[edge_ids], graph.dst[edge_ids]]))
+
+    net = Network(height="750px", width="100%", directed=True)
+    for node_id in node_ids:
+        name = graph.names[node_id]
+        size = 20 + 50 * float(freq.get(name, 0.0))
+        color = "#FFC700" if name.endswith("|B1") else "#547792"
+        net.add_node(name, label=name, color=color, size=size, font={'color': '#000000'})
+
+    amount = graph.weights['weight_amount']
+    trx = graph.weights['weight_trx']
+    value = graph.weights[weight or 'weight_amount']
+    for e in edge_ids:
+        net.add_edge(graph.names[graph.src[e]], graph.names[graph.dst[e]],
+                     value=float(value[e]), arrows='to',
+                     title=f"Amount: {amount[e]:,.0f}\nCount: {trx[e]:,.0f}")
+
+    # generate_html + tulis sendiri: save_graph menyalin folder lib/ ke cwd
+    # dan tidak aman dijalankan paralel
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(net.generate_html())
+
+
+# Tulis workbook ranking + HTML jaringan untuk satu pembobotan
+def write_report(graph, rankings, name, out_dir):
+    cfg = RANKINGS[name]
+    excel_path = os.path.join(out_dir, cfg['excel'])
+    html_path = os.path.join(out_dir, cfg['html'])
+    write_rankings(excel_path, *rankings)
+    render_core_network(graph, *rankings, cfg['weight'], html_path)
+    return [excel_path, html_path]
+
+
+def make_stage_report(name):
+    def stage_report(ctx, graph, rankings):
+        return write_report(graph, rankings, name, ctx.out_dir)
+
+    return stage_report
+
+
+# nodes.csv / edges.csv untuk kartu metrik di tab Dashboard (key "NAMA (BANK)")
+def stage_tables(ctx, df):
+    graph = ArrayGraph.from_edge_frame(df)
+    edges = graph.edge_frame().rename(columns={'weight_amount': 'amount_tx_idr', 'weight_trx': 'trx'})
+    nodes = pd.DataFrame({
+        'entity': graph.names,
+        'in_amount': graph.in_degree('weight_amount'),
+        'out_amount': graph.out_degree('weight_amount'),
+    })
+    nodes_path = os.path.join(ctx.out_dir, 'nodes.csv')
+    edges_path = os.path.join(ctx.out_dir, 'edges.csv')
+    nodes.to_csv(nodes_path, index=False)
+    edges.to_csv(edges_path, index=False)
+    return [nodes_path, edges_path]
+
+
+# Partisi Louvain per pembobotan (amount & trx) atas graf teragregasi
+def stage_communities(ctx, graph):
+    cache_dir = os.path.join(ctx.cache_dir, 'communities')
+    return {f'{PREFIX[w]}_community': detect_communities(graph, w, seed=ctx.seed, cache_dir=cache_dir)
+            for w in ('weight_amount', 'weight_trx')}
+
+
+def stage_community_table(ctx, graph, communities):
+    path = os.path.join(ctx.out_dir, 'communities.csv')
+    pd.DataFrame({'node': graph.names, **communities}).to_csv(path, index=False)
+    return path
+
+
+# name -> (dependencies, fungsi, parameter yang ikut di-hash, simpan ke cache?)
+def build_stages():
+    stages = {
+        'ingest': ((), stage_ingest, (), False),
+        'graph': (('ingest',), stage_graph, (), True),
+        'degrees': (('graph',), stage_degrees, (), True),
+        'betweenness': (('graph',), stage_betweenness, ('betweenness_k', 'seed'), True),
+        'closeness': (('graph',), stage_closeness, (), True),
+        'pagerank': (('graph',), stage_pagerank, (), True),
+        'metrics': (('graph', 'degrees', 'betweenness', 'closeness', 'pagerank'), stage_metrics, (), True),
+        'normalized': (('metrics',), stage_normalized, (), True),
+        'metric_tables': (('metrics', 'normalized'), stage_metric_tables, (), False),
+        'tables': (('ingest',), stage_tables, (), False),
+        'communities': (('graph',), stage_communities, ('seed',), True),
+        'community_table': (('graph', 'communities'), stage_community_table, (), False),
+    }
+    for name in RANKINGS:
+        stages[f'rankings_{name}'] = (('normalized',), make_stage_rankings(name), ('k', 'n_samples', 'seed'), True)
+        stages[f'report_{name}'] = (('graph', f'rankings_{name}'), make_stage_report(name), (), False)
+    return stages
+
+
+# --- Runner ---
+
+# Hash konten tiap stage: versi + parameter + hash dependency; akar = hash file sumber
+def stage_keys(stages, ctx):
+    keys = {}
+    for name, (deps, _, params, _) in stages.items():
+        payload = {
+            'stage': name,
+            'version': PIPELINE_VERSION,
+            'params': {p: getattr(ctx, p) for p in params},
+            'deps': [keys[d] for d in deps],
+        }
+        if name == 'ingest':
+            payload['source'] = source_sha256(ctx.src, ctx.cache_dir)
+        keys[name] = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return keys
+
+
+def _cache_path(ctx, name, key):
+    return os.path.join(ctx.cache_dir, 'pipeline', f"{name}-{key[:16]}.pkl")
+
+
+def _load_cached(ctx, name, key, any_key=False):
+    path = _cache_path(ctx, name, key)
+    if not os.path.exists(path) and any_key:
+        candidates = glob.glob(os.path.join(ctx.cache_dir, 'pipeline', f"{name}-*.pkl"))
+        path = max(candidates, key=os.path.getmtime) if candidates else path
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _save_cached(ctx, name, key, value):
+    path = _cache_path(ctx, name, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    _replace_atomic(path, write)
+
+
+# Peak RSS proses (dan child process pool) dalam MB, None bila tidak tersedia.
+# ru_maxrss adalah puncak sepanjang umur proses, bukan puncak per stage: stage
+# setelah stage terberat melaporkan angka yang sama. Stage juga berjalan paralel
+# di thread yang sama-sama memakai memori proses, sehingga puncak per stage tidak
+# bisa dipisahkan; nilai ini dilaporkan sebagai puncak proses saat stage selesai.
+def peak_rss_mb():
+    if resource is None:
+        return None, None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return round(own, 1), round(children, 1)
+
+
+def _run_stage(ctx, stages, keys, results, name):
+    deps, fn, _, cacheable = stages[name]
+    key = keys[name]
+    start = time.perf_counter()
+
+    value, status = None, 'run'
+    if name in ctx.skip:
+        value, status = _load_cached(ctx, name, key, any_key=True), 'skipped'
+        if value is None and cacheable:
+            raise RuntimeError(f"Stage '{name}' di-skip tetapi belum ada cache")
+    elif cacheable and not ctx.force:
+        value = _load_cached(ctx, name, key)
+        status = 'cached' if value is not None else 'run'
+
+    if status == 'run':
+        value = fn(ctx, *[results[d] for d in deps])
+        if cacheable:
+            _save_cached(ctx, name, key, value)
+
+    own, children = peak_rss_mb()
+    record = {
+        'stage': name, 'status': status, 'key': key[:16],
+        'seconds': round(time.perf_counter() - start, 3),
+        'process_peak_rss_mb': own, 'children_process_peak_rss_mb': children,
+    }
+    log.info("stage=%s status=%s seconds=%.3f process_peak_rss_mb=%s children_process_peak_rss_mb=%s",
+             name, status, record['seconds'], own, children)
+    return value, record
+
+
+# Jalankan DAG: stage yang dependency-nya sudah selesai dijalankan paralel
+def run_pipeline(ctx):
+    os.makedirs(ctx.out_dir, exist_ok=True)
+    stages = build_stages()
+    unknown = set(ctx.skip) - set(stages)
+    if unknown:
+        raise ValueError(f"Stage tidak dikenal: {sorted(unknown)}")
+    # Stage tanpa cache yang di-skip tidak punya hasil: hanya boleh bila semua
+    # stage yang memakainya ikut di-skip
+    for name in ctx.skip:
+        users = sorted(n for n, (deps, *_) in stages.items() if name in deps and n not in ctx.skip)
+        if not stages[name][3] and users:
+            raise ValueError(f"Stage '{name}' tidak di-cache sehingga tidak bisa di-skip "
+                             f"selama stage {users} tetap dijalankan")
+
+    keys = stage_keys(stages, ctx)
+    results, records = {}, []
+    pending = dict(stages)
+    running = {}
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=ctx.parallel) as pool:
+        while pending or running:
+            for name in [n for n, (deps, *_) in pending.items() if all(d in results for d in deps)]:
+                running[pool.submit(_run_stage, ctx, stages, keys, results, name)] = name
+                del pending[name]
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], record = future.result()
+                records.append(record)
+
+    summary = {
+        'source': ctx.src,
+        'total_seconds': round(time.perf_counter() - started, 3),
+        'stages': records,
+    }
+    with open(os.path.join(ctx.out_dir, 'pipeline_run.json'), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return results, summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline metrik & artefak dashboard (pengganti notebook)")
+    parser.add_argument("--src", default=SOURCE_XLSX)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses untuk betweenness/closeness")
+    parser.add_argument("--parallel", type=int, default=4, help="Jumlah stage yang boleh jalan bersamaan")
+    parser.add_argument("--skip", nargs="*", default=[], help="Stage yang tidak dijalankan (pakai cache terakhir)")
+    parser.add_argument("--force", action="store_true", help="Abaikan cache stage")
+    parser.add_argument("--betweenness-k", type=int, default=None, help="Jumlah pivot betweenness (aproksimasi)")
+    parser.add_argument("--k", type=int, default=20, help="Top-k pada core_candidates")
+    parser.add_argument("--n-samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    run_pipeline(parse_args())
@@ -0,0 +1,132 @@
+import contextvars
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+ENV_VAR = "MAYBANK_PROFILE"
+LOG_ENV_VAR = "MAYBANK_PROFILE_LOG"
+DEFAULT_LOG = os.path.join(".cache", "profile.jsonl")
+
+_current = contextvars.ContextVar("profile_run", default=None)
+
+
+# Profiling aktif lewat env var MAYBANK_PROFILE=1 atau query param ?profile=1
+def is_enabled(query_params=None):
+    flag = os.environ.get(ENV_VAR, "")
+    if query_params is not None:
+        flag = query_params.get("profile", flag)
+    return str(flag).lower() in ("1", "true", "yes", "on")
+
+
+# Satu rerun (atau rerun fragment): daftar span bertingkat + counter per span
+class Run:
+    def __init__(self, name, session=None):
+        self.name = name
+        self.session = session
+        self.id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.spans = []
+        self._stack = []
+        self._start = time.perf_counter()
+        self.seconds = None
+
+    def open(self, name, counters):
+        span = {'name': name, 'depth': len(self._stack), 'seconds': None, **counters}
+        self.spans.append(span)
+        self._stack.append(span)
+        return span
+
+    def close(self, span, seconds):
+        span['seconds'] = round(seconds, 6)
+        self._stack.remove(span)
+
+    def finish(self):
+        self.seconds = round(time.perf_counter() - self._start, 6)
+        return self
+
+    def to_record(self):
+        return {
+            'ts': self.started_at,
+            'run': self.name,
+            'run_id': self.id,
+            'session': self.session,
+            'seconds': self.seconds,
+            'spans': self.spans,
+        }
+
+
+def current_run():
+    return _current.get()
+
+
+def start_run(name, enabled=True, session=None):
+    run = Run(name, session) if enabled else None
+    _current.set(run)
+    return run
+
+
+# Tutup run lalu tambahkan satu baris JSON ke file log
+def finish_run(run, log_path=None):
+    _current.set(None)
+    if run is None:
+        return None
+    run.finish()
+    log_path = log_path or os.environ.get(LOG_ENV_VAR, DEFAULT_LOG)
+    directory = os.path.dirname(log_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run.to_record(), default=str) + "\n")
+    return run
+
+
+# Catat waktu sebuah tahap. Counter (rows, nodes, edges, cache_hit, ...) bisa
+# diberikan di awal atau diisi lewat dict yang di-yield / annotate().
+# Tanpa run aktif, span tidak melakukan apa pun.
+@contextmanager
+def span(name, **counters):
+    run = _current.get()
+    if run is None:
+        yield dict(counters)
+        return
+    record = run.open(name, counters)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        run.close(record, time.perf_counter() - start)
+
+
+# Isi counter pada span terdalam yang sedang terbuka
+def annotate(**counters):
+    run = _current.get()
+    if run is not None and run._stack:
+        run._stack[-1].update(counters)
+
+
+# Span bila sudah ada run aktif (mis. fragment di dalam rerun penuh), atau run
+# baru yang ditulis ke log bila berdiri sendiri (rerun fragment saja)
+@contextmanager
+def run_or_span(name, enabled=True, session=None):
+    if _current.get() is not None:
+        with span(name):
+            yield _current.get()
+        return
+    run = start_run(name, enabled, session)
+    try:
+        yield run
+    finally:
+        finish_run(run)
+
+
+# Ringkasan per span untuk panel debug (list of dict)
+def breakdown(run):
+    if run is None:
+        return []
+    return [
+        {'tahap': "  " * s['depth'] + s['name'], 'detik': s['seconds'],
+         **{k: v for k, v in s.items() if k not in ('name', 'depth', 'seconds')}}
+        for s in run.spans
+    ]
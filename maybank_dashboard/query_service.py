@@ -0,0 +1,308 @@
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from artifacts import ARTIFACTS
+from edges import network_edge_columns
+from filter_index import FilterIndex
+from graph_core import top_k
+from ingest import CACHE_DIR, SOURCE_XLSX, load_transactions, source_sha256
+from pipeline import METRIC_COLUMNS, RANKINGS
+from render_cache import RenderCache, filter_key
+
+log = logging.getLogger("query_service")
+
+# Sheet workbook ranking (urutan sama dengan write_rankings)
+RANKING_SHEETS = {'retention': 0, 'acquisition': 1}
+FORMATS = {'json': "application/json", 'arrow': "application/vnd.apache.arrow.stream"}
+MAX_PAGE_SIZE = 1000
+
+
+class QueryError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# Latensi per endpoint (jendela n request terakhir) untuk /stats
+class LatencyStats:
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, error=False):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + int(error)
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for endpoint, samples in self._samples.items():
+                ms = np.asarray(samples) * 1000
+                result[endpoint] = {
+                    'count': self._counts[endpoint],
+                    'errors': self._errors[endpoint],
+                    'mean_ms': round(float(ms.mean()), 3),
+                    'p50_ms': round(float(np.percentile(ms, 50)), 3),
+                    'p95_ms': round(float(np.percentile(ms, 95)), 3),
+                    'max_ms': round(float(ms.max()), 3),
+                }
+            return result
+
+
+def _param(params, name, default=None, cast=str):
+    values = params.get(name)
+    if not values or values[-1] == "":
+        return default
+    try:
+        return cast(values[-1])
+    except ValueError:
+        raise QueryError(f"Parameter '{name}' tidak valid: {values[-1]!r}")
+
+
+# Satu halaman frame -> (frame halaman, info paging)
+def paginate(frame, page=1, page_size=100):
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        raise QueryError(f"page_size harus 1..{MAX_PAGE_SIZE}")
+    n_pages = max(1, math.ceil(len(frame) / page_size))
+    if page < 1 or page > n_pages:
+        raise QueryError(f"page harus 1..{n_pages}")
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size], {'page': page, 'page_size': page_size,
+                                                  'n_pages': n_pages, 'total': len(frame)}
+
+
+# Body response: JSON (info paging + rows) atau Arrow IPC stream (info paging
+# di metadata schema)
+def encode(frame, info, fmt):
+    frame = frame.reset_index(drop=True)
+    if fmt == 'arrow':
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               b'paging': json.dumps(info).encode("utf-8")})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    rows = json.loads(frame.to_json(orient='records', double_precision=15))
+    return json.dumps({**info, 'columns': list(frame.columns), 'rows': rows}).encode("utf-8")
+
+
+# Query metrik, ranking, dan subgraf top-N di atas store yang sama dengan
+# dashboard (cache Feather transaksi, FilterIndex, ARTIFACTS). Response di-cache
+# LRU per endpoint + parameter + versi data (hash sumber / mtime artefak).
+class QueryService:
+    def __init__(self, src=SOURCE_XLSX, artifact_dir=".", cache_dir=CACHE_DIR, cache=None):
+        self.src = src
+        self.artifact_dir = artifact_dir
+        self.cache_dir = cache_dir
+        self.cache = cache or RenderCache(max_entries=256, max_bytes=128 * 1024 * 1024)
+        self.latency = LatencyStats()
+        self._index = None
+        self._lock = threading.Lock()
+        self.endpoints = {
+            '/nodes': self.nodes,
+            '/rankings': self.rankings,
+            '/subgraph': self.subgraph,
+        }
+
+    # FilterIndex disimpan bersama (mtime, ukuran) dan hash sumber yang dipakai
+    # membangunnya, sehingga versi cache /subgraph selalu sesuai data di index.
+    # Request biasa hanya melakukan os.stat tanpa lock; hash dan rebuild hanya
+    # saat stat berubah, di dalam lock dengan pengecekan ulang agar satu thread
+    # saja yang membangun. stat diambil sebelum hash: bila file berubah di
+    # tengah rebuild, request berikutnya melihat stat baru dan membangun ulang.
+    def _current_index(self):
+        stat = os.stat(self.src)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        current = self._index
+        if current is not None and current[0] == stamp:
+            return current[1], current[2]
+        with self._lock:
+            current = self._index
+            if current is None or current[0] != stamp:
+                version = source_sha256(self.src, self.cache_dir)
+                if current is not None and current[1] == version:
+                    index = current[2]
+                else:
+                    df = load_transactions(self.src, self.cache_dir)
+                    index = FilterIndex(df.assign(**network_edge_columns(df)))
+                self._index = current = (stamp, version, index)
+            return current[1], current[2]
+
+    @property
+    def index(self):
+        return self._current_index()[1]
+
+    def _artifact(self, name):
+        path = os.path.join(self.artifact_dir, name)
+        if not os.path.exists(path):
+            raise QueryError(f"Artefak {name} belum ada, jalankan pipeline.py", status=404)
+        return path
+
+    def _version(self, endpoint, params):
+        if endpoint == '/subgraph':
+            return self._current_index()[0]
+        if endpoint == '/nodes':
+            path = self._artifact('df_metric.csv')
+        else:
+            path = self._artifact(RANKINGS[self._weighting(params, 'amt')]['excel'])
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _weighting(self, params, default=None):
+        weighting = _param(params, 'weighting', default)
+        if weighting not in RANKINGS:
+            raise QueryError(f"weighting harus salah satu dari {sorted(RANKINGS)}")
+        return weighting
+
+    # Metrik per node (df_metric.csv): filter substring nama, urut per kolom
+    def nodes(self, params):
+        frame = ARTIFACTS.table(self._artifact('df_metric.csv'))
+        weighting = _param(params, 'weighting')
+        if weighting is not None:
+            self._weighting(params)
+            frame = frame[['node'] + [c for c in METRIC_COLUMNS if c.startswith(weighting + '_')]]
+        query = _param(params, 'q')
+        if query:
+            frame = frame[frame['node'].str.contains(query, case=False, regex=False, na=False)]
+        sort = _param(params, 'sort')
+        if sort is not None:
+            if sort not in frame.columns:
+                raise QueryError(f"Kolom sort tidak dikenal: {sort}")
+            frame = frame.sort_values(sort, ascending=_param(params, 'order', 'desc') == 'asc', kind='stable')
+        return frame
+
+    # Hasil core_candidates per pembobotan (workbook ranking pipeline)
+    def rankings(self, params):
+        cfg = RANKINGS[self._weighting(params, 'amt')]
+        kind = _param(params, 'kind', 'retention')
+        if kind not in RANKING_SHEETS:
+            raise QueryError(f"kind harus salah satu dari {sorted(RANKING_SHEETS)}")
+        return ARTIFACTS.rankings(self._artifact(cfg['excel']))[RANKING_SHEETS[kind]]
+
+    # Subgraf top-N setelah filter amount/tipe (sama seperti tab Network
+    # Analysis, tanpa layout). part=nodes atau part=edges.
+    def subgraph(self, params):
+        index = self.index
+        lo = _param(params, 'min_amount', float(index.amount.min()) if len(index.amount) else 0.0, float)
+        hi = _param(params, 'max_amount', float(index.amount.max()) if len(index.amount) else 0.0, float)
+        types = _param(params, 'types')
+        types = list(index.types) if types is None else types.split(",")
+        top_n = _param(params, 'top_n', 200, int)
+        if top_n < 1:
+            raise QueryError("top_n harus >= 1")
+        part = _param(params, 'part', 'nodes')
+        if part not in ('nodes', 'edges'):
+            raise QueryError("part harus 'nodes' atau 'edges'")
+
+        graph = index.graph(lo, hi, types)
+        if graph.n_nodes == 0:
+            return pd.DataFrame(columns=['node', 'tx_value', 'degree'] if part == 'nodes' else
+                                ['source', 'target', 'weight_amount', 'weight_trx', 'type'])
+        tx_value = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+        top_ids = top_k(tx_value, top_n)
+        if part == 'edges':
+            return graph.subgraph(top_ids).edge_frame()
+        return pd.DataFrame({'node': graph.names[top_ids], 'tx_value': tx_value[top_ids],
+                             'degree': graph.degree()[top_ids]})
+
+    def stats(self):
+        return {'latency': self.latency.stats(), 'cache': self.cache.stats()}
+
+    # Jalankan satu request -> (status, content type, body)
+    def handle(self, path, params):
+        endpoint = urlparse(path).path.rstrip("/") or "/"
+        start = time.perf_counter()
+        error = False
+        try:
+            if endpoint == '/health':
+                return 200, FORMATS['json'], b'{"status": "ok"}'
+            if endpoint == '/stats':
+                return 200, FORMATS['json'], json.dumps(self.stats()).encode("utf-8")
+            handler = self.endpoints.get(endpoint)
+            if handler is None:
+                raise QueryError(f"Endpoint tidak dikenal: {endpoint}", status=404)
+
+            fmt = _param(params, 'format', 'json')
+            if fmt not in FORMATS:
+                raise QueryError(f"format harus salah satu dari {sorted(FORMATS)}")
+            page = _param(params, 'page', 1, int)
+            page_size = _param(params, 'page_size', 100, int)
+            query = {k: v[-1] for k, v in params.items()}
+            key = filter_key(endpoint=endpoint, version=self._version(endpoint, params), params=query)
+
+            def render():
+                frame, info = paginate(handler(params), page, page_size)
+                return encode(frame, info, fmt)
+
+            return 200, FORMATS[fmt], self.cache.get_or_render(key, render)
+        except QueryError as e:
+            error = True
+            return e.status, FORMATS['json'], json.dumps({'error': str(e)}).encode("utf-8")
+        except Exception as e:
+            error = True
+            log.exception("request %s gagal", path)
+            return 500, FORMATS['json'], json.dumps({'error': f"Kesalahan internal: {e!r}"}).encode("utf-8")
+        finally:
+            self.latency.record(endpoint, time.perf_counter() - start, error)
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, content_type, body = service.handle(url.path, parse_qs(url.query))
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+# Server HTTP di thread terpisah (mis. berdampingan dengan Streamlit atau untuk
+# klien lokal di bench). port=0 memilih port bebas; alamat di server.server_address.
+def start_server(service, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="query-service", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layanan query lokal: metrik, ranking, dan subgraf (JSON / Arrow)")
+    parser.add_argument("--src", default=SOURCE_XLSX)
+    parser.add_argument("--artifact-dir", default=".")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    service = QueryService(args.src, args.artifact_dir, args.cache_dir)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Query service di http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
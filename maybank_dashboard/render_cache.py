@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+# Key cache dari state filter: urutan argumen/isi list tidak berpengaruh
+def filter_key(**state):
+    def normalize(value):
+        if isinstance(value, (list, set, frozenset)):
+            return sorted(normalize(v) for v in value)
+        if isinstance(value, tuple):
+            return [normalize(v) for v in value]
+        return value
+
+    payload = json.dumps({k: normalize(v) for k, v in state.items()}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Cache LRU hasil render (HTML) untuk semua sesi dalam satu proses server.
+# Dibatasi jumlah entri dan total ukuran; request bersamaan untuk key yang sama
+# menunggu satu render saja (tidak dirender ganda).
+class RenderCache:
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get_or_render(self, key, render, *args, **kwargs):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = {'event': threading.Event()}
+                self.misses += 1
+                owner = True
+            else:
+                self.waits += 1
+                owner = False
+
+        if not owner:
+            pending['event'].wait()
+            if 'error' in pending:
+                raise pending['error']
+            return pending['value']
+
+        # Render di luar lock agar sesi lain dengan key berbeda tidak tertahan
+        try:
+            value = render(*args, **kwargs)
+        except Exception as e:
+            pending['error'] = e
+            with self._lock:
+                del self._pending[key]
+            pending['event'].set()
+            raise
+
+        pending['value'] = value
+        with self._lock:
+            self._store(key, value)
+            del self._pending[key]
+        pending['event'].set()
+        return value
+
+    def _store(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        self._items[key] = value
+        self._bytes += size
+        while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+            _, old = self._items.popitem(last=False)
+            self._bytes -= len(old)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'evictions': self.evictions,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'hit_rate': (self.hits + self.waits) / lookups if lookups else 0.0,
+            }
+
+
+# Instance bersama untuk seluruh proses (modul hanya diimpor sekali oleh Streamlit)
+NETWORK_HTML_CACHE = RenderCache()
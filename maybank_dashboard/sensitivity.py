@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+
+# Pilih top-k per baris (skor tertinggi); skor sama dipecah berdasarkan posisi
+# paling awal, sama seperti rank(method='min').nsmallest(k) di versi lama
+def _topk_mask(scores, k):
+    n = scores.shape[1]
+    if k >= n:
+        return np.ones_like(scores, dtype=bool)
+    kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1][:, None]
+    greater = scores > kth
+    equal = scores == kth
+    need = k - greater.sum(axis=1, keepdims=True)
+    return greater | (equal & (np.cumsum(equal, axis=1) <= need))
+
+
+# Sensitivity analysis: seberapa sering node masuk top-k untuk bobot metrik acak.
+# Semua bobot ditarik sebagai matriks (n_samples x metrik) dari RandomState yang
+# sama dengan versi loop, diproses per chunk agar memori tetap terbatas.
+def core_candidates(df, metrics, k=20, n_samples=100, seed=42, thresh=0.8,
+                    max_chunk_cells=4_000_000):
+    rng = np.random.RandomState(seed)
+    nodes = df['node'].values
+    counts = np.zeros(len(df), dtype=np.int64)
+
+    # Node dengan metrik NaN (skornya NaN) hanya masuk top-k bila k melebihi
+    # jumlah node valid: nsmallest versi lama mengisi sisa slot dengan node NaN
+    # sesuai urutan posisi, di setiap sampel
+    X = df[list(metrics)].to_numpy(dtype=np.float64)
+    missing = np.isnan(X).any(axis=1)
+    valid = np.flatnonzero(~missing)
+    X = X[valid]
+    counts[np.flatnonzero(missing)[:max(k - len(valid), 0)]] = n_samples
+
+    chunk_size = max(1, max_chunk_cells // max(len(valid), 1))
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        w = rng.rand(size, len(metrics))
+        w = w / w.sum(axis=1, keepdims=True)
+        if len(valid) == 0:
+            continue
+
+        # Skor gabungan diakumulasi per metrik (urutan sama dengan versi lama)
+        scores = np.zeros((size, len(valid)))
+        for j in range(len(metrics)):
+            scores += X[:, j] * w[:, j][:, None]
+
+        selected = _topk_mask(scores, k)
+        counts[valid] += np.bincount(np.nonzero(selected)[1], minlength=len(valid))
+
+    # Normalisasi dan ambil node yang sering muncul di top-k
+    freq = pd.Series(counts, index=nodes, dtype=int) / n_samples
+    return freq[freq >= thresh].sort_values(ascending=False)
@@ -0,0 +1,89 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['debitor_name', 'debitor_bank', 'sender_recipient_name', 'sender_recipient_bank',
+           'type', 'amount_tx_idr', 'trx']
+
+
+# Popularitas berekor berat (Zipf) untuk n entitas: sedikit entitas sangat aktif
+def _zipf_weights(n, exponent, rng):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+# Data transaksi sintetis dengan skema sama seperti workbook asli.
+# - debitor: nasabah, sebagian besar di B1 (Maybank), aktivitas Zipf
+# - lawan transaksi: nasabah B1 lain (transfer internal) atau entitas bank lain;
+#   pangsa bank lain juga Zipf sehingga beberapa bank mendominasi
+# - amount: lognormal dengan ekor Pareto; trx berkorelasi dengan amount
+def generate_transactions(n_rows, n_customers=None, n_counterparties=None, n_banks=20,
+                          b1_share=0.9, internal_share=0.3, incoming_share=0.5,
+                          activity_exponent=1.1, seed=0):
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(100, n_rows // 20)
+    n_counterparties = n_counterparties or max(100, n_rows // 10)
+    banks = np.array([f"B{i}" for i in range(1, n_banks + 1)], dtype=object)
+
+    # Nasabah: nama unik, bank B1 atau bank lain (mis. rekening debitor non-Maybank)
+    customer_names = np.array([f"C{i:07d}" for i in range(n_customers)], dtype=object)
+    customer_banks = np.where(rng.random(n_customers) < b1_share, "B1",
+                              banks[rng.integers(1, n_banks, n_customers)] if n_banks > 1 else "B1")
+    counterparty_names = np.array([f"P{i:07d}" for i in range(n_counterparties)], dtype=object)
+    bank_share = _zipf_weights(max(n_banks - 1, 1), 1.2, rng)
+    counterparty_banks = (banks[1:][rng.choice(n_banks - 1, n_counterparties, p=bank_share)]
+                          if n_banks > 1 else np.full(n_counterparties, "B1", dtype=object))
+
+    debitor = rng.choice(n_customers, n_rows, p=_zipf_weights(n_customers, activity_exponent, rng))
+    internal = rng.random(n_rows) < internal_share
+    other_customer = rng.choice(n_customers, n_rows, p=_zipf_weights(n_customers, activity_exponent, rng))
+    counterparty = rng.choice(n_counterparties, n_rows, p=_zipf_weights(n_counterparties, activity_exponent, rng))
+
+    lawan_name = np.where(internal, customer_names[other_customer], counterparty_names[counterparty])
+    lawan_bank = np.where(internal, customer_banks[other_customer], counterparty_banks[counterparty])
+
+    amount = rng.lognormal(15, 1.5, n_rows)
+    tail = rng.random(n_rows) < 0.02
+    amount[tail] *= 1 + rng.pareto(1.5, tail.sum()) * 20
+    trx = 1 + rng.poisson(np.clip(np.log10(amount) - 5, 0.1, None) * 3)
+
+    return pd.DataFrame({
+        'debitor_name': customer_names[debitor],
+        'debitor_bank': customer_banks[debitor],
+        'sender_recipient_name': lawan_name,
+        'sender_recipient_bank': lawan_bank,
+        'type': np.where(rng.random(n_rows) < incoming_share, 'INCOMING', 'OUTGOING'),
+        'amount_tx_idr': amount.round(2),
+        'trx': trx.astype(np.int64),
+    })[COLUMNS]
+
+
+# Tulis sesuai ekstensi (csv/parquet/xlsx), sama dengan yang dibaca ingest.read_source
+def write_transactions(df, path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    elif ext == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator data transaksi sintetis")
+    parser.add_argument("out", help="File output (.csv, .parquet, atau .xlsx)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--counterparties", type=int, default=None)
+    parser.add_argument("--banks", type=int, default=20)
+    parser.add_argument("--b1-share", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generate_transactions(args.rows, args.customers, args.counterparties, args.banks,
+                               b1_share=args.b1_share, seed=args.seed)
+    write_transactions(df, args.out)
+    print(f"{len(df):,} transaksi -> {args.out}")
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("warmup")
+
+
+# Warm-up cache di thread latar. Task dikelompokkan per tahap:
+# tahap dijalankan berurutan, task dalam satu tahap paralel (thread pool).
+# Task yang gagal dicatat dan tidak menghentikan task lain; pemanggil yang
+# menunggu task tsb akan menjalankannya sendiri dan melihat error aslinya.
+class Warmup:
+    def __init__(self, stages, workers=2):
+        self.stages = [list(stage) for stage in stages]
+        self.workers = workers
+        self.status = {name: 'menunggu' for stage in self.stages for name, _ in stage}
+        self.seconds = {}
+        self.errors = {}
+        self._events = {name: threading.Event() for name in self.status}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        if self._thread is None:
+            self.started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run_task(self, name, fn):
+        with self._lock:
+            self.status[name] = 'berjalan'
+        start = time.perf_counter()
+        status, error = 'gagal', None
+        try:
+            fn()
+            status = 'selesai'
+        except Exception as e:
+            log.exception("warmup task=%s gagal", name)
+            error = repr(e)
+        finally:
+            # Event selalu di-set (juga bila task gagal) agar pemanggil yang
+            # menunggu task ini tidak tertahan selamanya
+            with self._lock:
+                self.seconds[name] = round(time.perf_counter() - start, 3)
+                self.status[name] = status
+                if error is not None:
+                    self.errors[name] = error
+            self._events[name].set()
+        log.info("warmup task=%s status=%s seconds=%.3f", name, status, self.seconds[name])
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+            for stage in self.stages:
+                list(pool.map(lambda task: self._run_task(*task), stage))
+        self.finished_at = time.perf_counter()
+
+    # Task selesai (berhasil atau gagal); names=None berarti semua task
+    def done(self, names=None):
+        return all(self._events[name].is_set() for name in (names or self._events))
+
+    def wait(self, names=None, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for name in names or self._events:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not self._events[name].wait(remaining):
+                return False
+        return True
+
+    def progress(self):
+        return sum(event.is_set() for event in self._events.values()) / max(len(self._events), 1)
+
+    def running(self):
+        with self._lock:
+            return [name for name, status in self.status.items() if status == 'berjalan']
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    # Ringkasan per task untuk panel status
+    def summary(self):
+        with self._lock:
+            return [{'task': name, 'status': status, 'detik': self.seconds.get(name),
+                     'error': self.errors.get(name)} for name, status in self.status.items()]
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modul dashboard saling import secara flat (from edges import ...), sama
+# seperti saat dijalankan dari folder maybank_dashboard
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "maybank_dashboard"))
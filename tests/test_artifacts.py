@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+import pytest
+
+from artifacts import ArtifactStore
+
+
+def write_rankings(path, n_rows):
+    with pd.ExcelWriter(path) as writer:
+        for sheet, scale in (("Retensi", 1.0), ("Akuisisi", 0.5)):
+            pd.DataFrame({
+                'node': [f"E{i:03d}|B1" for i in range(n_rows)],
+                'score_value': [scale * (n_rows - i) for i in range(n_rows)],
+            }).to_excel(writer, sheet_name=sheet, index=False)
+
+
+def bump_mtime(path, ns):
+    os.utime(path, ns=(ns, ns))
+
+
+def test_html_served_from_memory_until_file_changes(tmp_path):
+    path = str(tmp_path / "view.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html>lama</html>")
+    store = ArtifactStore()
+
+    first = store.html(path)
+    assert first == "<html>lama</html>" and store.loads == 1
+    for _ in range(3):
+        assert store.html(path) is first
+    assert store.loads == 1
+
+    # Ukuran sama, hanya mtime yang berubah: tetap dibaca ulang
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html>baru</html>")
+    bump_mtime(path, os.stat(path).st_mtime_ns + 1_000_000)
+    assert store.html(path) == "<html>baru</html>" and store.loads == 2
+    assert store.html(path) == "<html>baru</html>" and store.loads == 2
+
+
+def test_rankings_shape_and_reload(tmp_path):
+    path = str(tmp_path / "rankings.xlsx")
+    write_rankings(path, 25)
+    store = ArtifactStore()
+
+    sheets = store.rankings(path)
+    assert len(sheets) == 2 and store.loads == 1
+    assert all(list(frame.columns) == ['Entity', 'Score'] for frame in sheets)
+    assert sheets[0]['Entity'].iloc[0] == "E000|B1" and sheets[1]['Score'].iloc[0] == 12.5
+    assert store.rankings(path) is sheets and store.loads == 1
+
+    write_rankings(path, 7)
+    bump_mtime(path, os.stat(path).st_mtime_ns + 1_000_000)
+    assert len(store.rankings(path)[0]) == 7 and store.loads == 2
+
+
+@pytest.mark.parametrize("page, expected_first, expected_len", [
+    (1, "E000|B1", 10),
+    (3, "E020|B1", 5),
+    # Halaman di luar rentang dijepit ke halaman pertama / terakhir
+    (0, "E000|B1", 10),
+    (9, "E020|B1", 5),
+])
+def test_rankings_page(tmp_path, page, expected_first, expected_len):
+    path = str(tmp_path / "rankings.xlsx")
+    write_rankings(path, 25)
+    store = ArtifactStore()
+
+    frame, n_pages = store.rankings_page(path, 1, page, page_size=10)
+    assert n_pages == 3
+    assert frame['Entity'].iloc[0] == expected_first and len(frame) == expected_len
+    assert store.rankings_page(path, 0, 2, page_size=25)[1] == 1
+    assert store.loads == 1
+
+
+def test_rankings_page_of_empty_sheet(tmp_path):
+    path = str(tmp_path / "rankings.xlsx")
+    write_rankings(path, 0)
+    frame, n_pages = ArtifactStore().rankings_page(path, 0)
+    assert n_pages == 1 and frame.empty
+
+
+def test_preload_skips_missing_files(tmp_path):
+    html = str(tmp_path / "view.html")
+    with open(html, "w", encoding="utf-8") as f:
+        f.write("<html></html>")
+    store = ArtifactStore()
+    store.preload([html, str(tmp_path / "tidak_ada.html")], [str(tmp_path / "tidak_ada.xlsx")])
+    assert store.loads == 1
+    store.html(html)
+    assert store.loads == 1
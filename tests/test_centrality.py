@@ -0,0 +1,160 @@
+import math
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+import centrality
+from centrality import WEIGHTINGS, betweenness, closeness, pagerank
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return ArrayGraph.from_edge_frame(prepare_transactions(random_transactions(3_000, seed=0)))
+
+
+# Dua komponen terpisah, rantai satu arah, dan node tanpa edge masuk: tidak
+# strongly connected, sehingga faktor Wasserman-Faust ikut teruji
+@pytest.fixture(scope="module")
+def split_graph():
+    edges = pd.DataFrame({
+        'source': ["A", "B", "C", "C", "D", "X", "Y", "Y", "Z"],
+        'target': ["B", "C", "A", "D", "E", "Y", "Z", "X", "W"],
+        'amount_tx_idr': [5.0, 2.0, 0.0, 4.0, 1.0, 3.0, 3.0, 6.0, 2.0],
+        'trx': [1, 2, 1, 3, 1, 1, 2, 2, 0],
+        'type': "OUTGOING",
+    })
+    return ArrayGraph.from_edge_frame(edges)
+
+
+def as_array(graph, values):
+    return np.array([values[name] for name in graph.names])
+
+
+# Closeness notebook: jarak 1/bobot, bobot 0 dianggap jarak 1
+def networkx_closeness(graph, weight):
+    G = graph.to_networkx()
+    if weight is None:
+        return as_array(graph, nx.closeness_centrality(G, wf_improved=True))
+    distance = lambda u, v, d: 1 / d[weight] if d[weight] else 1
+    return as_array(graph, nx.closeness_centrality(G, distance=distance, wf_improved=True))
+
+
+@pytest.mark.parametrize("weight", WEIGHTINGS)
+def test_betweenness_matches_networkx(graph, weight):
+    result = betweenness(graph, weights=(weight,), workers=1)[weight]
+    expected = as_array(graph, nx.betweenness_centrality(graph.to_networkx(), weight=weight))
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_parallel_betweenness_matches_serial(graph):
+    serial = betweenness(graph, workers=1)
+    parallel = betweenness(graph, workers=2, chunk_size=64)
+    for weight in WEIGHTINGS:
+        np.testing.assert_allclose(parallel[weight], serial[weight], rtol=1e-12, atol=1e-15)
+
+
+def test_sampled_betweenness_is_deterministic_per_seed(graph):
+    first = betweenness(graph, k=40, seed=7, workers=1)
+    again = betweenness(graph, k=40, seed=7, workers=2, chunk_size=8)
+    other = betweenness(graph, k=40, seed=8, workers=1)
+    for weight in WEIGHTINGS:
+        np.testing.assert_allclose(again[weight], first[weight], rtol=1e-12, atol=1e-15)
+    assert not np.allclose(other['weight_amount'], first['weight_amount'])
+
+
+
+@pytest.fixture(scope="module")
+def exact_betweenness(graph):
+    return betweenness(graph, workers=1)
+
+
+def pivot_counts(monkeypatch):
+    counts = []
+    run_sharded = centrality.run_sharded
+
+    def counting(chunk_fn, adjs, n_nodes, sources, *args, **kwargs):
+        sources = list(sources)
+        counts.append(len(sources))
+        return run_sharded(chunk_fn, adjs, n_nodes, sources, *args, **kwargs)
+
+    monkeypatch.setattr(centrality, "run_sharded", counting)
+    return counts
+
+
+# Jaminan epsilon/delta: |estimasi - exact| <= epsilon untuk semua node dengan
+# peluang >= 1 - delta. Seed tetap, jadi batas ini diuji secara deterministik;
+# galat rata-rata jauh di bawah epsilon.
+@pytest.mark.parametrize("seed", [0, 1])
+def test_sampled_betweenness_within_epsilon_of_exact(graph, exact_betweenness, seed):
+    epsilon = 0.15
+    sampled = betweenness(graph, epsilon=epsilon, seed=seed, workers=1)
+    for weight in WEIGHTINGS:
+        error = np.abs(sampled[weight] - exact_betweenness[weight])
+        assert error.max() <= epsilon
+        assert error.mean() <= 0.01
+
+
+@pytest.mark.parametrize("epsilon, delta", [(0.15, 0.1), (0.3, 0.1), (0.3, 0.01)])
+def test_epsilon_sets_pivot_count(graph, monkeypatch, epsilon, delta):
+    counts = pivot_counts(monkeypatch)
+    betweenness(graph, weights=(None,), epsilon=epsilon, delta=delta, seed=0, workers=1)
+    expected = math.ceil(math.log(2 * graph.n_nodes / delta) / (2 * epsilon ** 2))
+    assert expected < graph.n_nodes
+    assert counts == [expected]
+
+
+# k >= n (langsung atau dari epsilon kecil) jatuh ke Brandes exact atas semua source
+@pytest.mark.parametrize("mode", [
+    lambda n: {'k': n},
+    lambda n: {'k': n + 5},
+    lambda n: {'epsilon': 0.01},
+], ids=["k=n", "k>n", "epsilon"])
+def test_pivots_at_least_n_match_exact(graph, exact_betweenness, monkeypatch, mode):
+    counts = pivot_counts(monkeypatch)
+    result = betweenness(graph, seed=0, workers=1, **mode(graph.n_nodes))
+    assert counts == [graph.n_nodes]
+    for weight in WEIGHTINGS:
+        np.testing.assert_allclose(result[weight], exact_betweenness[weight], rtol=1e-12, atol=1e-15)
+
+@pytest.mark.parametrize("weight", WEIGHTINGS)
+def test_closeness_matches_networkx(graph, weight):
+    result = closeness(graph, weights=(weight,), workers=1)[weight]
+    np.testing.assert_allclose(result, networkx_closeness(graph, weight), rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize("weight", WEIGHTINGS)
+def test_closeness_not_strongly_connected(split_graph, weight):
+    assert not nx.is_strongly_connected(split_graph.to_networkx())
+    result = closeness(split_graph, weights=(weight,), workers=2, chunk_size=3)[weight]
+    np.testing.assert_allclose(result, networkx_closeness(split_graph, weight), rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize("name", ["graph", "split_graph"])
+@pytest.mark.parametrize("weight", WEIGHTINGS)
+def test_pagerank_matches_networkx(request, name, weight):
+    graph = request.getfixturevalue(name)
+    assert (graph.out_degree() == 0).any()
+    result = pagerank(graph, weights=(weight,))[weight]
+    expected = as_array(graph, nx.pagerank(graph.to_networkx(), weight=weight))
+    np.testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-15)
+
+
+def test_pagerank_warm_start_needs_fewer_iterations():
+    df = random_transactions(3_000, seed=0)
+    before = ArrayGraph.from_edge_frame(prepare_transactions(df.iloc[:2_950]))
+    after = ArrayGraph.from_edge_frame(prepare_transactions(df))
+    previous = {w: pd.Series(x, index=before.names) for w, x in pagerank(before).items()}
+
+    cold, cold_iterations = pagerank(after, return_iterations=True)
+    warm, warm_iterations = pagerank(after, nstart=previous, return_iterations=True)
+    exact = pagerank(after, tol=1e-12)
+    for weight in WEIGHTINGS:
+        assert warm_iterations[weight] < cold_iterations[weight]
+        # Kriteria berhenti sama dengan networkx: galat L1 < N * tol
+        for scores in (cold, warm):
+            assert np.abs(scores[weight] - exact[weight]).sum() < after.n_nodes * 1e-6
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_cube import build_dashboard_cube
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def data():
+    df = prepare_transactions(random_transactions(4_000, n_banks=6, seed=0))
+    edges_df = ArrayGraph.from_edge_frame(df).edge_frame().rename(columns={'weight_amount': 'amount_tx_idr'})
+    # Entitas tanpa kode bank: tidak masuk bank partner maupun total B1
+    extra = pd.DataFrame({
+        'source': ["KAS", "E00001 (B1)", "KAS"],
+        'target': ["E00001 (B1)", "KAS", "E00002 (B2)"],
+        'amount_tx_idr': [5_000.0, 7_000.0, 9_000.0],
+        'weight_trx': 1.0,
+        'type': ["INCOMING", "OUTGOING", "OUTGOING"],
+    })
+    edges_df = pd.concat([edges_df, extra], ignore_index=True)
+    nodes_df = pd.DataFrame({'entity': pd.unique(pd.concat([edges_df['source'], edges_df['target']]))})
+    return df, nodes_df, edges_df
+
+
+@pytest.fixture(scope="module")
+def cube(data):
+    return build_dashboard_cube(*data)
+
+
+# --- Perhitungan tab Dashboard sebelum ada cube ---
+
+def baseline_top(df, k):
+    top = df.sort_values(by="amount_tx_idr", ascending=False, kind='stable').head(k)
+    top["label"] = top.apply(lambda row: f"{row['debitor_name']} → {row['sender_recipient_name']}", axis=1)
+    return top
+
+
+def baseline_partners(edges_df):
+    partner_stats = edges_df.copy()
+    partner_stats['Bank'] = partner_stats['source'].str.extract(r'\((B\d+)\)')[0]
+    bank_partners = partner_stats.groupby('Bank').agg(
+        Count=('Bank', 'size'),
+        Total_Amount=('amount_tx_idr', 'sum')
+    ).reset_index()
+    bank_partners = bank_partners[bank_partners['Bank'] != 'B1']
+    return bank_partners.sort_values('Count', ascending=False, kind='stable')
+
+
+@pytest.mark.parametrize("k", [1, 5, 10, 50])
+def test_top_transactions_match_sort_with_ties(data, k):
+    df = data[0]
+    top = build_dashboard_cube(df, k=k)['top_transactions']
+    expected = baseline_top(df, k)
+    # Amount kelipatan 1000 sehingga banyak nilai kembar di batas top-K
+    assert df['amount_tx_idr'].duplicated().any()
+    assert list(top.columns) == ['debitor_name', 'sender_recipient_name', 'amount_tx_idr', 'label']
+    for col in ('debitor_name', 'sender_recipient_name', 'label'):
+        assert top[col].astype(str).tolist() == expected[col].astype(str).tolist()
+    assert top['amount_tx_idr'].tolist() == expected['amount_tx_idr'].tolist()
+
+
+def test_top_transactions_tie_order_is_row_order():
+    df = pd.DataFrame({
+        'debitor_name': list("ABCDE"),
+        'sender_recipient_name': list("VWXYZ"),
+        'amount_tx_idr': [1.0, 3.0, 2.0, 3.0, 3.0],
+        'type': "OUTGOING",
+    })
+    top = build_dashboard_cube(df, k=2)['top_transactions']
+    assert top['label'].tolist() == ["B → W", "D → Y"]
+
+
+# Amount kosong tidak dibuang saat ingest: NaN berada paling akhir seperti
+# sort_values, bukan mengosongkan hasil top-K
+@pytest.mark.parametrize("k", [1, 2, 5, 12])
+def test_top_transactions_with_nan_amounts(k):
+    df = pd.DataFrame({
+        'debitor_name': [f"D{i}" for i in range(12)],
+        'sender_recipient_name': [f"S{i}" for i in range(12)],
+        'amount_tx_idr': [np.nan] * 10 + [5.0, 7.0],
+        'type': "OUTGOING",
+    })
+    top = build_dashboard_cube(df, k=k)['top_transactions']
+    expected = baseline_top(df, k)
+    assert top['label'].tolist() == expected['label'].tolist()
+    np.testing.assert_array_equal(top['amount_tx_idr'], expected['amount_tx_idr'])
+
+    mixed = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    assert build_dashboard_cube(mixed, k=k)['top_transactions']['label'].tolist() == baseline_top(mixed, k)['label'].tolist()
+
+
+def test_type_summary(data, cube):
+    df = data[0]
+    expected = df.groupby('type', observed=True).agg(
+        Count=('type', 'count'),
+        Total_Amount=('amount_tx_idr', 'sum')
+    ).reset_index().rename(columns={'type': 'Type'})
+    pd.testing.assert_frame_equal(cube['type_summary'], expected)
+
+
+def test_kpis_match_baseline(data, cube):
+    _, nodes_df, edges_df = data
+    is_b1 = nodes_df['entity'].str.contains(r'\(B1\)', na=False)
+    assert cube['n_maybank_nodes'] == nodes_df[is_b1].shape[0]
+    assert cube['n_external_entities'] == nodes_df[~is_b1].shape[0]
+    assert cube['n_connections'] == edges_df.shape[0]
+
+    incoming_amount = edges_df[
+        (edges_df['type'] == 'INCOMING') &
+        (edges_df['target'].str.contains(r'\(B1\)', na=False))
+    ]['amount_tx_idr'].sum()
+    outgoing_amount = edges_df[
+        (edges_df['type'] == 'OUTGOING') &
+        (edges_df['source'].str.contains(r'\(B1\)', na=False))
+    ]['amount_tx_idr'].sum()
+    assert cube['incoming_amount'] == pytest.approx(incoming_amount, rel=1e-12)
+    assert cube['outgoing_amount'] == pytest.approx(outgoing_amount, rel=1e-12)
+
+
+def test_flows_cube_matches_groupby(data, cube):
+    edges_df = data[2]
+    keyed = pd.DataFrame({
+        'bank': edges_df['source'].str.extract(r'\((B\d+)\)')[0].fillna("-"),
+        'source_b1': edges_df['source'].str.contains(r'\(B1\)', na=False),
+        'target_b1': edges_df['target'].str.contains(r'\(B1\)', na=False),
+        'type': edges_df['type'].astype(str),
+        'amount_tx_idr': edges_df['amount_tx_idr'],
+    })
+    keys = ['bank', 'source_b1', 'target_b1', 'type']
+    expected = keyed.groupby(keys).agg(Count=('amount_tx_idr', 'size'), Total_Amount=('amount_tx_idr', 'sum'))
+
+    flows = cube['flows'].astype({'bank': object, 'type': str})
+    flows['bank'] = flows['bank'].fillna("-")
+    flows = flows.set_index(keys).sort_index()
+    assert flows['Count'].sum() == len(edges_df)
+    assert flows.index.equals(expected.index)
+    assert flows['Count'].tolist() == expected['Count'].tolist()
+    np.testing.assert_allclose(flows['Total_Amount'], expected['Total_Amount'], rtol=1e-12)
+
+
+def test_bank_partners_match_baseline(data, cube):
+    expected = baseline_partners(data[2])
+    partners = cube['bank_partners']
+    assert list(partners.columns) == ['Bank', 'Count', 'Total_Amount']
+    assert partners['Bank'].tolist() == expected['Bank'].tolist()
+    assert partners['Count'].tolist() == expected['Count'].tolist()
+    np.testing.assert_allclose(partners['Total_Amount'], expected['Total_Amount'], rtol=1e-12)
+    assert 'B1' not in partners['Bank'].tolist()
+
+
+def test_without_nodes_and_edges_only_df_tables(data):
+    cube = build_dashboard_cube(data[0])
+    assert set(cube) == {'top_transactions', 'type_summary'}
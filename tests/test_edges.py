@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from bench import legacy_edge_columns
+from edges import add_edge_columns, build_edge_columns, network_edge_columns
+from filter_index import FilterIndex
+
+
+# Arah edge tab Network Analysis lama (lambda per baris di tab 2)
+def legacy_network_edge_columns(df):
+    return df.apply(
+        lambda row: pd.Series({
+            'source': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})",
+            'target': f"{row['debitor_name']} ({row['debitor_bank']})"
+        }) if row['type'].upper() == 'INCOMING' else pd.Series({
+            'source': f"{row['debitor_name']} ({row['debitor_bank']})",
+            'target': f"{row['sender_recipient_name']} ({row['sender_recipient_bank']})"
+        }),
+        axis=1
+    )
+
+
+def missing_as_none(values):
+    return [None if pd.isna(value) else value for value in values]
+
+
+def sample_transactions(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array(["PT ANDALAN", "BUDI SANTOSO", "CV MAJU JAYA ", "Siti", "X"], dtype=object)
+    banks = np.array(["B1", "B2", "B3", np.nan], dtype=object)
+    types = np.array(["INCOMING", "OUTGOING", "incoming", "Outgoing", "REVERSAL", ""], dtype=object)
+    return pd.DataFrame({
+        'debitor_name': names[rng.integers(0, len(names), n_rows)],
+        'debitor_bank': "B1",
+        'sender_recipient_name': names[rng.integers(0, len(names), n_rows)],
+        'sender_recipient_bank': banks[rng.integers(0, len(banks), n_rows)],
+        'type': types[rng.integers(0, len(types), n_rows)],
+        'amount_tx_idr': rng.integers(1, 1_000_000, n_rows).astype(float),
+        'trx': rng.integers(1, 10, n_rows),
+    }, index=np.arange(n_rows) * 3)
+
+
+def test_build_edge_columns_matches_row_wise():
+    df = sample_transactions()
+    expected = legacy_edge_columns(df)
+    result = build_edge_columns(df)
+    assert list(result.columns) == ['source', 'target']
+    assert result.index.equals(df.index)
+    for column in ('source', 'target'):
+        assert missing_as_none(result[column]) == missing_as_none(expected[column])
+
+
+def test_mixed_case_and_other_types():
+    df = pd.DataFrame({
+        'debitor_name': ["A", "A", "A", "A", "A", "A"],
+        'debitor_bank': "B1",
+        'sender_recipient_name': ["P", "Q", "R", "S", "T", "U"],
+        'sender_recipient_bank': ["B2", "B3", "B2", np.nan, "B2", "B2"],
+        'type': ["INCOMING", "incoming", "OutGoing", "OUTGOING", "REVERSAL", ""],
+    })
+    result = build_edge_columns(df)
+    assert missing_as_none(result['source']) == ["P (B2)", "Q (B3)", "A (B1)", "A (B1)", None, None]
+    assert missing_as_none(result['target']) == ["A (B1)", "A (B1)", "R (B2)", "S (nan)", None, None]
+
+
+def test_add_edge_columns_keeps_input():
+    df = sample_transactions(20)
+    result = add_edge_columns(df)
+    assert 'source' not in df.columns
+    assert result.drop(columns=['source', 'target']).equals(df)
+
+
+def test_network_edge_columns_match_old_tab():
+    df = add_edge_columns(sample_transactions())
+    expected = legacy_network_edge_columns(df)
+    result = network_edge_columns(df)
+    assert result.index.equals(df.index)
+    for column in ('source', 'target'):
+        assert result[column].tolist() == expected[column].tolist()
+    # Kolom source/target load_data tidak berubah
+    assert df['source'].isna().any()
+
+
+# Tipe lain (mis. REVERSAL) tetap bisa dipilih di tab 2 sebagai edge debitor -> lawan
+def test_other_types_in_network_filter_index():
+    df = add_edge_columns(pd.DataFrame({
+        'debitor_name': ["A", "A", "A"],
+        'debitor_bank': "B1",
+        'sender_recipient_name': ["P", "Q", "R"],
+        'sender_recipient_bank': "B2",
+        'type': ["INCOMING", "REVERSAL", "outgoing"],
+        'amount_tx_idr': [1.0, 2.0, 3.0],
+        'trx': 1,
+    }))
+    index = FilterIndex(df.assign(**network_edge_columns(df)))
+    edges = index.graph(0, 10, ['REVERSAL']).edge_frame()
+    assert edges[['source', 'target']].values.tolist() == [["A (B1)", "Q (B2)"]]
+    assert index.count(0, 10, list(index.types)) == 3
+    assert FilterIndex(df).count(0, 10, ['REVERSAL']) == 0
@@ -0,0 +1,145 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from entity_index import EntityIndex, ego_frames, ego_network, induced_edges
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return ArrayGraph.from_edge_frame(prepare_transactions(random_transactions(2_000, n_entities=300, seed=0)))
+
+
+@pytest.fixture(scope="module")
+def index(graph):
+    return EntityIndex(graph.names)
+
+
+# Bobot berbeda semua supaya urutan fan-out pasti:
+# A->B 10, A->C 5, D->A 7, A->E 1, B->F 3, B->G 8, C->H 9, D->I 2
+@pytest.fixture(scope="module")
+def small_graph():
+    edges = pd.DataFrame({
+        'source': ["A", "A", "D", "A", "B", "B", "C", "D"],
+        'target': ["B", "C", "A", "E", "F", "G", "H", "I"],
+        'amount_tx_idr': [10.0, 5.0, 7.0, 1.0, 3.0, 8.0, 9.0, 2.0],
+        'trx': 1,
+        'type': "OUTGOING",
+    })
+    return ArrayGraph.from_edge_frame(edges)
+
+
+def names_by_hop(graph, ids, hop):
+    return [set(graph.names[ids[hop == h]]) for h in range(hop.max() + 1)]
+
+
+def test_prefix_is_case_insensitive_and_sorted(graph, index):
+    ids = index.prefix("  e0001", limit=1_000)
+    expected = sorted((name for name in graph.names if name.lower().startswith("e0001")), key=str.lower)
+    assert list(graph.names[ids]) == expected
+    assert len(index.prefix("E0001", limit=3)) == min(3, len(expected))
+    assert len(index.prefix("")) == 0
+    assert len(index.prefix("zzz")) == 0
+
+
+def test_substring_matches_scan(graph, index):
+    expected = np.flatnonzero(pd.Series(graph.names).str.lower().str.contains("(b2)", regex=False))
+    assert np.array_equal(index.substring("(B2)", limit=len(graph.names)), expected)
+    assert len(index.substring("a\nb")) == 0
+
+
+def test_search_puts_prefix_hits_first(graph, index):
+    ids = index.search("0001", limit=1_000)
+    assert len(set(ids.tolist())) == len(ids)
+    assert all("0001" in name.lower() for name in graph.names[ids])
+    assert set(ids.tolist()) == set(index.substring("0001", limit=1_000).tolist())
+
+
+def test_lookup(graph, index):
+    for node in (0, graph.n_nodes // 2, graph.n_nodes - 1):
+        assert index.lookup(graph.names[node]) == node
+    assert index.lookup("TIDAK ADA (B1)") == -1
+    assert index.lookup(graph.names[0].lower()) == -1
+    assert index.lookup("") == -1
+
+
+@pytest.mark.parametrize("direction", ['out', 'in', 'both'])
+@pytest.mark.parametrize("hops", [1, 2])
+def test_ego_network_matches_networkx(graph, direction, hops):
+    G = graph.to_networkx()
+    if direction == 'in':
+        G = G.reverse(copy=False)
+    elif direction == 'both':
+        G = G.to_undirected(as_view=True)
+    degree = graph.degree()
+    for center in np.argsort(-degree, kind='stable')[:3]:
+        ids, hop, edge_ids = ego_network(graph, int(center), hops, fanout=None, direction=direction)
+        lengths = nx.single_source_shortest_path_length(G, graph.names[center], cutoff=hops)
+        assert dict(zip(graph.names[ids], hop.tolist())) == lengths
+        assert ids[0] == center and len(set(ids.tolist())) == len(ids)
+
+
+def test_fanout_keeps_strongest_neighbours(graph):
+    weight = graph.weights['weight_amount']
+    for center in np.argsort(-graph.degree(), kind='stable')[:5]:
+        # Bobot tetangga = edge terbesar di antara kedua arah
+        strongest = {}
+        for mask, other in ((graph.src == center, graph.dst), (graph.dst == center, graph.src)):
+            for neighbor, w in zip(other[mask].tolist(), weight[mask].tolist()):
+                strongest[neighbor] = max(strongest.get(neighbor, -np.inf), w)
+        strongest.pop(int(center), None)
+
+        ids, hop, _ = ego_network(graph, int(center), 1, fanout=5)
+        chosen = ids[hop == 1].tolist()
+        assert len(chosen) == min(5, len(strongest))
+        left_out = [w for neighbor, w in strongest.items() if neighbor not in chosen]
+        assert min(strongest[n] for n in chosen) >= max(left_out, default=-np.inf)
+        # Urutan: tetangga terkuat lebih dulu
+        assert [strongest[n] for n in chosen] == sorted((strongest[n] for n in chosen), reverse=True)
+
+
+def test_fanout_per_hop(small_graph):
+    ids, hop, _ = ego_network(small_graph, small_graph.names.tolist().index("A"), 2, fanout=2)
+    assert list(small_graph.names[ids[hop == 1]]) == ["B", "D"]
+    assert names_by_hop(small_graph, ids, hop) == [{"A"}, {"B", "D"}, {"F", "G", "I"}]
+
+    ids, hop, _ = ego_network(small_graph, 0, 2, fanout=[2, 1])
+    assert names_by_hop(small_graph, ids, hop) == [{"A"}, {"B", "D"}, {"G", "I"}]
+
+    ids, hop, _ = ego_network(small_graph, 0, 2, fanout=2, direction='out')
+    assert names_by_hop(small_graph, ids, hop) == [{"A"}, {"B", "C"}, {"G", "F", "H"}]
+
+    ids, hop, _ = ego_network(small_graph, 0, 3, fanout=2, direction='in')
+    assert names_by_hop(small_graph, ids, hop) == [{"A"}, {"D"}]
+
+    with pytest.raises(ValueError, match="direction"):
+        ego_network(small_graph, 0, direction='up')
+
+
+def test_induced_edges(graph):
+    rng = np.random.default_rng(0)
+    nodes = rng.choice(graph.n_nodes, 60, replace=False)
+    expected = np.flatnonzero(np.isin(graph.src, nodes) & np.isin(graph.dst, nodes))
+    assert np.array_equal(induced_edges(graph, nodes), expected)
+    assert len(induced_edges(graph, [])) == 0
+
+
+def test_ego_frames_columns(small_graph):
+    ids, hop, edge_ids = ego_network(small_graph, 0, 1, fanout=None)
+    tx_value = small_graph.in_degree('weight_amount') + small_graph.out_degree('weight_amount')
+    degree = small_graph.degree()
+    nodes, edges = ego_frames(small_graph, ids, hop, edge_ids, tx_value, degree)
+
+    assert list(nodes.columns) == ['node', 'tx_value', 'degree', 'hop']
+    by_name = nodes.set_index('node')
+    assert by_name.loc["A"].tolist() == [23.0, 4, 0]
+    assert by_name.loc["D"].tolist() == [9.0, 2, 1]
+
+    assert list(edges.columns) == ['source', 'target', 'weight_amount', 'weight_trx', 'type']
+    assert sorted(zip(edges['source'], edges['target'], edges['weight_amount'])) == [
+        ("A", "B", 10.0), ("A", "C", 5.0), ("A", "E", 1.0), ("D", "A", 7.0)]
+    assert (edges['weight_trx'] == 1.0).all() and (edges['type'] == "OUTGOING").all()
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from filter_index import FilterIndex
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def df():
+    df = prepare_transactions(random_transactions(3_000, seed=0))
+    # Sebagian amount kosong: tidak pernah lolos filter rentang
+    df.loc[df.index[::97], 'amount_tx_idr'] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def index(df):
+    return FilterIndex(df)
+
+
+def mask_graph(df, lo, hi, types):
+    mask = (df['amount_tx_idr'] >= lo) & (df['amount_tx_idr'] <= hi) & df['type'].isin(types)
+    return ArrayGraph.from_edge_frame(df[mask]), int(mask.sum())
+
+
+def assert_same_graph(expected, graph):
+    assert np.array_equal(expected.names, graph.names)
+    assert np.array_equal(expected.src, graph.src) and np.array_equal(expected.dst, graph.dst)
+    assert np.array_equal(expected.edge_type, graph.edge_type)
+    for w in ('weight_amount', 'weight_trx'):
+        assert np.array_equal(expected.weights[w], graph.weights[w])
+
+
+# Batas diambil dari nilai amount yang ada sehingga kedua ujung inklusif teruji;
+# (0.5, 0.5) memilih tepat satu nilai amount
+@pytest.mark.parametrize("types", [['INCOMING'], ['OUTGOING', 'INCOMING'], ['INCOMING', 'REVERSAL']])
+@pytest.mark.parametrize("q_lo, q_hi", [(0.0, 1.0), (0.25, 0.5), (0.5, 0.5)])
+def test_graph_matches_boolean_mask(df, index, q_lo, q_hi, types):
+    lo, hi = df['amount_tx_idr'].quantile([q_lo, q_hi], interpolation='nearest')
+    assert (df['amount_tx_idr'] == lo).sum() > 1 and (df['amount_tx_idr'] == hi).sum() > 1
+    expected, n_rows = mask_graph(df, lo, hi, types)
+    assert n_rows > 0
+    assert index.count(lo, hi, types) == n_rows
+    assert_same_graph(expected, index.graph(lo, hi, types))
+
+    mask = (df['amount_tx_idr'] >= lo) & (df['amount_tx_idr'] <= hi) & df['type'].isin(types)
+    assert np.array_equal(index.rows(lo, hi, types), np.flatnonzero(mask.to_numpy()))
+
+
+def test_nan_amounts_are_never_selected(df, index):
+    nan_rows = np.flatnonzero(df['amount_tx_idr'].isna().to_numpy())
+    assert len(nan_rows) > 0
+    rows = index.rows(float('-inf'), float('inf'), list(index.types))
+    assert not np.isin(nan_rows, rows).any()
+    assert len(rows) == len(df) - len(nan_rows)
+
+
+@pytest.mark.parametrize("lo, hi, types", [
+    (0.0, float('inf'), []),
+    (0.0, float('inf'), ['REVERSAL']),
+    (2_000_000.0, 3_000_000.0, ['INCOMING', 'OUTGOING']),
+    # lo > hi
+    (500_000.0, 100_000.0, ['INCOMING']),
+])
+def test_empty_selection(df, index, lo, hi, types):
+    expected, n_rows = mask_graph(df, lo, hi, types)
+    assert n_rows == 0 and index.count(lo, hi, types) == 0
+    assert len(index.rows(lo, hi, types)) == 0
+    graph = index.graph(lo, hi, types)
+    assert graph.n_nodes == graph.n_edges == 0
+    assert_same_graph(expected, graph)
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from flow_trace import FlowIndex, path_subgraph, trace_flows
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def index():
+    graph = ArrayGraph.from_edge_frame(prepare_transactions(random_transactions(1_500, n_entities=200, seed=0)))
+    return FlowIndex(graph)
+
+
+@pytest.fixture(scope="module")
+def sources(index):
+    tx_value = index.graph.in_degree('weight_amount') + index.graph.out_degree('weight_amount')
+    rng = np.random.default_rng(0)
+    hubs = np.argsort(-tx_value, kind='stable')[:3]
+    return [int(s) for s in np.concatenate([hubs, rng.choice(index.graph.n_nodes, 3, replace=False)])]
+
+
+# Semua skor jalur sederhana dari source ke tujuan (DFS penuh)
+def _brute_flow_scores(index, source, is_target, max_hops, min_amount, bottleneck):
+    scores = []
+
+    def visit(node, on_path, score, hops):
+        for e in range(index.indptr[node], index.indptr[node + 1]):
+            v, amount = int(index.dst[e]), index.amount[e]
+            if amount < min_amount or v in on_path:
+                continue
+            child = min(score, amount) if bottleneck else score + amount
+            if is_target[v]:
+                scores.append(child)
+            elif hops + 1 < max_hops:
+                visit(v, on_path | {v}, child, hops + 1)
+
+    visit(source, {source}, np.inf if bottleneck else 0.0, 0)
+    return sorted(scores, reverse=True)
+
+
+def expected_scores(index, source, k, max_hops, min_amount=0.0, mode='bottleneck', target_bank=None):
+    is_target = index.targets(source, None, target_bank)
+    is_target[source] = False
+    return _brute_flow_scores(index, source, is_target, max_hops, min_amount, mode == 'bottleneck')[:k]
+
+
+@pytest.mark.parametrize("mode", ['bottleneck', 'total'])
+@pytest.mark.parametrize("target_bank", [None, 'B1'])
+def test_top_k_matches_brute_force(index, sources, mode, target_bank):
+    for source in sources:
+        paths, truncated = trace_flows(index, source, None, target_bank, 5, 3, 0.0, mode)
+        assert not truncated
+        np.testing.assert_allclose([path['score'] for path in paths],
+                                   expected_scores(index, source, 5, 3, mode=mode, target_bank=target_bank))
+
+
+@pytest.mark.parametrize("mode", ['bottleneck', 'total'])
+def test_paths_are_simple_and_consistent(index, sources, mode):
+    amount = index.graph.weights['weight_amount']
+    for source in sources:
+        paths, _ = trace_flows(index, source, None, None, 10, 4, 0.0, mode)
+        for path in paths:
+            nodes, edges = path['nodes'], path['edges']
+            assert nodes[0] == source and len(set(nodes)) == len(nodes)
+            assert path['hops'] == len(edges) == len(nodes) - 1
+            assert np.array_equal(index.graph.src[edges], nodes[:-1])
+            assert np.array_equal(index.graph.dst[edges], nodes[1:])
+            # Berhenti di tujuan pertama: hanya node terakhir di bank lain
+            codes = index.bank_codes[nodes]
+            assert codes[-1] != codes[0] and np.all(codes[:-1] == codes[0])
+            score = amount[edges].min() if mode == 'bottleneck' else amount[edges].sum()
+            assert path['score'] == pytest.approx(score)
+
+
+def test_max_hops_limits_path_length(index, sources):
+    for max_hops in (1, 2):
+        for source in sources:
+            paths, _ = trace_flows(index, source, k=20, max_hops=max_hops)
+            assert all(path['hops'] <= max_hops for path in paths)
+            np.testing.assert_allclose([path['score'] for path in paths],
+                                       expected_scores(index, source, 20, max_hops))
+    assert trace_flows(index, sources[0], max_hops=0) == ([], False)
+
+
+@pytest.mark.parametrize("mode", ['bottleneck', 'total'])
+def test_min_amount_prunes_edges(index, sources, mode):
+    min_amount = float(np.median(index.amount))
+    amount = index.graph.weights['weight_amount']
+    for source in sources:
+        paths, _ = trace_flows(index, source, k=5, max_hops=3, min_amount=min_amount, mode=mode)
+        assert all(amount[path['edges']].min() >= min_amount for path in paths)
+        np.testing.assert_allclose([path['score'] for path in paths],
+                                   expected_scores(index, source, 5, 3, min_amount, mode))
+
+
+def test_explicit_target(index, sources):
+    source = sources[0]
+    target = int(index.dst[index.indptr[source]])
+    paths, _ = trace_flows(index, source, target=target, k=3, max_hops=3)
+    assert paths and all(path['nodes'][-1] == target for path in paths)
+    assert paths[0]['score'] >= index.amount[index.indptr[source]]
+
+
+def test_max_scanned_sets_truncated(index, sources):
+    source = sources[0]
+    full, truncated = trace_flows(index, source, k=50, max_hops=4)
+    assert not truncated
+    partial, truncated = trace_flows(index, source, k=50, max_hops=4, max_scanned=50)
+    assert truncated and len(partial) < 50
+    # Jalur yang sempat selesai tetap dikembalikan urut skor
+    scores = [path['score'] for path in partial]
+    assert scores == sorted(scores, reverse=True)
+    assert all(len(set(path['nodes'])) == len(path['nodes']) for path in partial)
+
+
+def test_invalid_mode(index):
+    with pytest.raises(ValueError, match="mode"):
+        trace_flows(index, 0, mode='max')
+
+
+def test_path_subgraph_unions_nodes_and_edges():
+    paths = [
+        {'nodes': [0, 1, 2], 'edges': [5, 7], 'score': 3.0, 'hops': 2},
+        {'nodes': [0, 3, 1, 4], 'edges': [6, 8, 9], 'score': 2.0, 'hops': 3},
+    ]
+    node_ids, hops, edge_ids = path_subgraph(paths)
+    assert dict(zip(node_ids.tolist(), hops.tolist())) == {0: 0, 1: 1, 2: 2, 3: 1, 4: 3}
+    assert edge_ids.tolist() == [5, 6, 7, 8, 9]
+
+    node_ids, hops, edge_ids = path_subgraph([])
+    assert len(node_ids) == len(hops) == len(edge_ids) == 0
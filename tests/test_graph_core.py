@@ -0,0 +1,171 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from graph_core import ArrayGraph, top_k
+from ingest import prepare_transactions
+from transactions import random_transactions
+
+
+def stable_top(values, k):
+    values = np.asarray(values, dtype=np.float64)
+    return np.argsort(-np.where(np.isnan(values), -np.inf, values), kind='stable')[:max(k, 0)]
+
+
+@pytest.mark.parametrize("values", [
+    [3.0, 1.0, 3.0, 2.0, 3.0, 1.0],
+    [5.0, 5.0, 5.0, 5.0],
+    [1.0, np.nan, 3.0],
+    [1.0, np.nan, 3.0, 2.0],
+    [np.nan] * 10 + [5.0, 7.0],
+    [np.nan, np.nan],
+    [],
+])
+@pytest.mark.parametrize("k", [0, 1, 2, 5, 20])
+def test_top_k_matches_stable_argsort(values, k):
+    assert top_k(np.asarray(values, dtype=np.float64), k).tolist() == stable_top(values, k).tolist()
+
+
+def test_top_k_nan_sorted_last():
+    assert top_k([1.0, np.nan, 3.0], 1).tolist() == [2]
+    assert top_k([1.0, np.nan, 3.0, 2.0], 2).tolist() == [2, 3]
+    assert top_k(np.r_[[np.nan] * 10, [5.0, 7.0]], 5).tolist() == [11, 10, 0, 1, 2]
+
+
+def test_top_k_random_with_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        values = rng.integers(0, 20, 500).astype(np.float64)
+        values[rng.random(500) < 0.05] = np.nan
+        for k in (1, 7, 100, 499, 500, 501):
+            assert top_k(values, k).tolist() == stable_top(values, k).tolist()
+
+
+def test_top_k_integer_input():
+    values = np.array([2, 9, 9, 1, 4], dtype=np.int64)
+    assert top_k(values, 3).tolist() == [1, 2, 4]
+    assert top_k(values, 10).tolist() == [1, 2, 4, 0, 3]
+    assert top_k(values, 0).tolist() == []
+
+
+# --- ArrayGraph vs networkx DiGraph dari frame edge yang sama ---
+
+@pytest.fixture(scope="module")
+def edges_df():
+    df = prepare_transactions(random_transactions(1_500, n_entities=200, seed=0))
+    df = df[['source', 'target', 'amount_tx_idr', 'trx', 'type']].astype({'type': object})
+    # Pasangan kembar dengan tipe berbeda, self-loop, dan endpoint kosong
+    extra = pd.DataFrame({
+        'source': ["P", "P", "Q", "P", None, "R"],
+        'target': ["Q", "Q", "P", "Q", "P", "R"],
+        'amount_tx_idr': [1.0, 2.5, 4.0, 0.5, 9.0, 3.0],
+        'trx': [1, 1, 2, 3, 1, 1],
+        'type': ["INCOMING", "OUTGOING", "OUTGOING", "REVERSAL", "OUTGOING", "OUTGOING"],
+    })
+    return pd.concat([df, extra], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def graph(edges_df):
+    return ArrayGraph.from_edge_frame(edges_df)
+
+
+@pytest.fixture(scope="module")
+def reference(edges_df):
+    G = nx.DiGraph()
+    for src, dst, amount, trx, edge_type in edges_df.itertuples(index=False):
+        if pd.isna(src) or pd.isna(dst):
+            continue
+        if not G.has_edge(src, dst):
+            G.add_edge(src, dst, weight_amount=0.0, weight_trx=0.0)
+        G[src][dst]['weight_amount'] += amount
+        G[src][dst]['weight_trx'] += trx
+        G[src][dst]['type'] = edge_type
+    return G
+
+
+def edge_dict(frame):
+    return {(s, t): (a, n, ty) for s, t, a, n, ty in frame[['source', 'target', 'weight_amount', 'weight_trx', 'type']]
+            .itertuples(index=False)}
+
+
+def test_nodes_in_first_appearance_order(graph, reference):
+    assert graph.names.tolist() == list(reference.nodes)
+    assert graph.n_edges == reference.number_of_edges()
+
+
+def test_csr_csc_neighbors(graph, reference):
+    for node, name in enumerate(graph.names):
+        out = graph.out_neighbors(node)
+        into = graph.in_neighbors(node)
+        assert set(graph.names[out]) == set(reference.successors(name))
+        assert set(graph.names[into]) == set(reference.predecessors(name))
+        assert (np.diff(out) > 0).all() and (np.diff(into) > 0).all()
+
+    # out_edge / in_edge menunjuk ke edge asli dengan endpoint yang sama
+    rows = np.repeat(np.arange(graph.n_nodes), np.diff(graph.out_indptr))
+    assert (graph.src[graph.out_edge] == rows).all() and (graph.dst[graph.out_edge] == graph.out_indices).all()
+    rows = np.repeat(np.arange(graph.n_nodes), np.diff(graph.in_indptr))
+    assert (graph.dst[graph.in_edge] == rows).all() and (graph.src[graph.in_edge] == graph.in_indices).all()
+
+
+@pytest.mark.parametrize("weight", [None, 'weight_amount', 'weight_trx'])
+def test_degrees(graph, reference, weight):
+    out_degree = [reference.out_degree(name, weight=weight) for name in graph.names]
+    in_degree = [reference.in_degree(name, weight=weight) for name in graph.names]
+    np.testing.assert_allclose(graph.out_degree(weight), out_degree, rtol=1e-12)
+    np.testing.assert_allclose(graph.in_degree(weight), in_degree, rtol=1e-12)
+    np.testing.assert_allclose(graph.degree(weight), np.add(out_degree, in_degree), rtol=1e-12)
+
+
+# Bobot dijumlah per pasangan, tipe dari transaksi terakhir, endpoint kosong dibuang
+def test_duplicate_edges_aggregated(graph, reference):
+    result = edge_dict(graph.edge_frame())
+    assert set(result) == set(reference.edges)
+    for (s, t), (amount, trx, edge_type) in result.items():
+        data = reference[s][t]
+        assert amount == pytest.approx(data['weight_amount'], rel=1e-12)
+        assert trx == data['weight_trx'] and edge_type == data['type']
+    assert result[("P", "Q")] == (4.0, 5.0, "REVERSAL")
+    assert result[("R", "R")] == (3.0, 1.0, "OUTGOING")
+
+
+def test_subgraph_matches_networkx(graph, reference):
+    rng = np.random.default_rng(1)
+    ids = rng.choice(graph.n_nodes, size=60, replace=False)
+    sub = graph.subgraph(ids)
+    assert sub.names.tolist() == graph.names[ids].tolist()
+
+    expected = reference.subgraph(sub.names)
+    result = edge_dict(sub.edge_frame())
+    assert set(result) == set(expected.edges)
+    for (s, t), (amount, trx, edge_type) in result.items():
+        assert (amount, trx, edge_type) == (expected[s][t]['weight_amount'], expected[s][t]['weight_trx'],
+                                            expected[s][t]['type'])
+    assert nx.utils.edges_equal(sub.to_networkx().edges(data=True), expected.edges(data=True))
+    assert graph.subgraph([]).n_nodes == 0 and graph.subgraph([]).n_edges == 0
+
+
+def test_edge_frame_round_trip(graph):
+    frame = graph.edge_frame()
+    again = ArrayGraph.from_edge_frame(frame, amount='weight_amount', trx='weight_trx')
+    assert edge_dict(again.edge_frame()) == edge_dict(frame)
+    assert sorted(again.names) == sorted(graph.names)
+    np.testing.assert_array_equal(again.degree('weight_amount')[again.node_ids(graph.names)],
+                                  graph.degree('weight_amount'))
+
+
+@pytest.mark.parametrize("direction", ['out', 'in'])
+def test_reachable(graph, reference, direction):
+    G = reference if direction == 'out' else reference.reverse(copy=False)
+    rng = np.random.default_rng(2)
+    for seeds in ([0], rng.choice(graph.n_nodes, size=3, replace=False).tolist(), []):
+        names = graph.names[seeds]
+        expected = set(names).union(*[nx.descendants(G, name) for name in names])
+        assert set(graph.names[graph.reachable(seeds, direction)]) == expected
+
+        for hops in (0, 1, 2):
+            expected = set(names).union(*[nx.single_source_shortest_path_length(G, name, cutoff=hops)
+                                          for name in names])
+            assert set(graph.names[graph.reachable(seeds, direction, max_hops=hops)]) == expected
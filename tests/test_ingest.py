@@ -0,0 +1,143 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import ingest
+from ingest import (build_cache, cache_paths, file_sha256, is_cache_fresh, load_transactions,
+                    load_versioned_transactions)
+from transactions import random_transactions
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "transactions.csv")
+    random_transactions(300, seed=0).to_csv(path, index=False)
+    return path, str(tmp_path / "cache")
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def counting_build(*args, **kwargs):
+        calls.append(1)
+        return build_cache(*args, **kwargs)
+
+    monkeypatch.setattr(ingest, "build_cache", counting_build)
+    return calls
+
+
+def test_cache_built_once(source, builds):
+    src, cache_dir = source
+    assert not is_cache_fresh(src, cache_dir)
+    first = load_transactions(src, cache_dir)
+    assert is_cache_fresh(src, cache_dir)
+    pd.testing.assert_frame_equal(load_transactions(src, cache_dir), first)
+    assert len(builds) == 1
+
+
+def test_rebuild_on_content_change(source, builds):
+    src, cache_dir = source
+    load_transactions(src, cache_dir)
+    random_transactions(500, seed=1).to_csv(src, index=False)
+    os.utime(src, (1, 1))
+
+    assert not is_cache_fresh(src, cache_dir)
+    assert len(load_transactions(src, cache_dir)) == len(ingest.read_source(src).drop_duplicates())
+    assert len(builds) == 2
+
+
+def test_no_rebuild_when_only_mtime_changes(source, builds):
+    src, cache_dir = source
+    load_transactions(src, cache_dir)
+    os.utime(src, (1, 1))
+
+    assert is_cache_fresh(src, cache_dir)
+    load_transactions(src, cache_dir)
+    assert len(builds) == 1
+    # mtime baru disimpan di metadata: cek berikutnya tidak perlu hash ulang
+    assert ingest._read_meta(cache_paths(src, cache_dir)[1])['mtime'] == 1
+
+
+def test_rebuild_on_cache_version_bump(source, builds, monkeypatch):
+    src, cache_dir = source
+    load_transactions(src, cache_dir)
+    monkeypatch.setattr(ingest, "CACHE_VERSION", ingest.CACHE_VERSION + 1)
+
+    assert not is_cache_fresh(src, cache_dir)
+    load_transactions(src, cache_dir)
+    assert len(builds) == 2
+    assert ingest._read_meta(cache_paths(src, cache_dir)[1])['version'] == ingest.CACHE_VERSION
+
+
+def test_missing_cache_file_is_not_fresh(source):
+    src, cache_dir = source
+    data_path = build_cache(src, cache_dir)
+    os.remove(data_path)
+    assert not is_cache_fresh(src, cache_dir)
+
+
+# Build bersamaan (mis. dashboard + pipeline) memakai file sementara masing-masing:
+# semua penulis ditahan di barrier sehingga tulisan pasti tumpang tindih. Tidak
+# ada file .tmp tersisa dan cache akhir utuh.
+def test_concurrent_builds_do_not_share_temp_files(source, monkeypatch):
+    src, cache_dir = source
+    n = 4
+    barrier = threading.Barrier(n, timeout=10)
+    paths, errors = [], []
+    write_feather = ingest.feather.write_feather
+
+    def overlapping_write(df, path, **kwargs):
+        paths.append(path)
+        barrier.wait()
+        write_feather(df, path, **kwargs)
+
+    monkeypatch.setattr(ingest.feather, "write_feather", overlapping_write)
+
+    def run():
+        try:
+            build_cache(src, cache_dir)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(paths)) == n
+    assert all(os.path.dirname(path) == cache_dir for path in paths)
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+    assert is_cache_fresh(src, cache_dir)
+    assert len(load_transactions(src, cache_dir)) == len(ingest.read_source(src).drop_duplicates())
+
+
+# Proses lain membangun ulang cache tepat setelah file Feather dibaca: frame dan
+# versi tetap berasal dari file yang sama (versi lama), bukan metadata baru
+def test_version_matches_frame_when_rebuilt_concurrently(source, monkeypatch):
+    src, cache_dir = source
+    old_sha = file_sha256(src)
+    build_cache(src, cache_dir)
+    read_table = ingest.feather.read_table
+    rebuilt = []
+
+    def read_then_rebuild(path, **kwargs):
+        table = read_table(path, **kwargs)
+        if not rebuilt:
+            rebuilt.append(1)
+            random_transactions(500, seed=1).to_csv(src, index=False)
+            build_cache(src, cache_dir)
+        return table
+
+    monkeypatch.setattr(ingest.feather, "read_table", read_then_rebuild)
+    df, version = load_versioned_transactions(src, cache_dir)
+    assert rebuilt and version == old_sha
+    assert ingest._read_meta(cache_paths(src, cache_dir)[1])['sha256'] == file_sha256(src) != old_sha
+    assert len(df) == 300
+
+    df, version = load_versioned_transactions(src, cache_dir)
+    assert version == file_sha256(src) and len(df) == len(ingest.read_source(src).drop_duplicates())
@@ -0,0 +1,48 @@
+import logging
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from louvain import _one_level, detect_communities, louvain, modularity, undirected_edges
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from synthetic import generate_transactions
+
+
+@pytest.mark.parametrize("rows, seed", [(3_000, 0), (3_000, 1), (30_000, 0)])
+@pytest.mark.parametrize("weight", ['weight_amount', 'weight_trx', None])
+def test_modularity_close_to_networkx(rows, seed, weight):
+    graph = ArrayGraph.from_edge_frame(prepare_transactions(generate_transactions(rows, seed=seed)))
+    u, v, w = undirected_edges(graph, weight)
+    q = modularity(graph.n_nodes, u, v, w, louvain(graph, weight))
+
+    G = nx.Graph()
+    G.add_nodes_from(range(graph.n_nodes))
+    G.add_weighted_edges_from(zip(u.tolist(), v.tolist(), w.tolist()))
+    expected = nx.community.modularity(G, nx.community.louvain_communities(G, weight='weight', seed=0))
+    assert q >= 0.97 * expected
+
+
+def test_detect_communities_uses_disk_cache(tmp_path):
+    graph = ArrayGraph.from_edge_frame(prepare_transactions(generate_transactions(2_000, seed=3)))
+    first = detect_communities(graph, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert np.array_equal(first, detect_communities(graph, cache_dir=str(tmp_path)))
+    assert np.bincount(first)[0] == np.bincount(first).max()
+
+
+# Di segitiga semua kandidat saling bertabrakan sehingga batch tidak bisa jalan:
+# perpindahan berurutan menggabungkan ketiga node dalam satu iterasi
+def test_sequential_moves_within_one_iteration():
+    u, v, w = np.array([0, 0, 1]), np.array([1, 2, 2]), np.ones(3)
+    membership = _one_level(3, u, v, w, 1.0, np.random.default_rng(0), max_iter=1)
+    assert len(set(membership.tolist())) == 1
+
+
+def test_max_iter_is_logged(caplog):
+    graph = ArrayGraph.from_edge_frame(prepare_transactions(generate_transactions(3_000, seed=0)))
+    u, v, w = undirected_edges(graph)
+    with caplog.at_level(logging.WARNING, logger="louvain"):
+        _one_level(graph.n_nodes, u, v, w, 1.0, np.random.default_rng(0), max_iter=1)
+    assert "max_iter=1" in caplog.text
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import FilterIndex
+from graph_core import ArrayGraph
+from ingest import prepare_transactions
+from network_view import (bank_code, build_top_view, collapse_by_bank, collapse_by_community, compute_layout,
+                          render_network_html, view_args)
+from transactions import random_transactions
+
+
+@pytest.fixture(scope="module")
+def df():
+    return prepare_transactions(random_transactions(2_000, seed=0))
+
+
+@pytest.fixture(scope="module")
+def index(df):
+    return FilterIndex(df)
+
+
+def test_view_args_normalizes_filter_state():
+    base = view_args((np.float64(1_000), 5e5), ['OUTGOING', 'INCOMING'], 200, 300, None, [3, 1])
+    assert base == view_args((1_000.0, 500_000.0), ['INCOMING', 'OUTGOING'], np.int64(200), 300, None, (1, 3))
+    assert base != view_args((1_000.0, 500_000.0), ['INCOMING'], 200, 300, None, (1, 3))
+    assert base != view_args((1_000.0, 500_000.0), ['INCOMING', 'OUTGOING'], 100, 300, None, (1, 3))
+    assert base != view_args((1_000.0, 500_000.0), ['INCOMING', 'OUTGOING'], 200, None, None, (1, 3))
+    assert view_args((0, 1), [], 5)[3:] == (None, None, (), False)
+
+
+def test_build_top_view_selects_top_n(df, index):
+    lo, hi = df['amount_tx_idr'].quantile([0.2, 0.8])
+    nodes, edges, max_degree = build_top_view(index, (lo, hi), ['INCOMING', 'OUTGOING'], 50)
+
+    mask = (df['amount_tx_idr'] >= lo) & (df['amount_tx_idr'] <= hi)
+    graph = ArrayGraph.from_edge_frame(df[mask])
+    tx_value = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+    expected = graph.names[np.argsort(-tx_value, kind='stable')[:50]]
+    assert nodes['node'].tolist() == expected.tolist()
+    assert np.isfinite(nodes[['x', 'y']].to_numpy()).all()
+    assert set(edges['source']) | set(edges['target']) <= set(expected)
+    assert max_degree == graph.degree().max()
+
+
+def test_build_top_view_lod_and_communities(df, index):
+    nodes, _, _ = build_top_view(index, (0, np.inf), ['INCOMING', 'OUTGOING'], 100, lod_keep=20)
+    assert (nodes['members'] == 1).sum() == 20
+    assert nodes['node'].str.startswith("Lainnya (").sum() == len(nodes) - 20
+
+    def membership_of(names):
+        return np.array([int(name[1:6]) % 3 for name in names])
+
+    nodes, _, _ = build_top_view(index, (0, np.inf), ['INCOMING'], 30, membership_of=membership_of,
+                                 communities=(1,))
+    assert (nodes['community'] == 1).all() and len(nodes) == 30
+    nodes, _, _ = build_top_view(index, (0, np.inf), ['INCOMING'], 30, membership_of=membership_of,
+                                 collapse_communities=True)
+    assert sorted(nodes['node']) == ["Komunitas 0", "Komunitas 1", "Komunitas 2"]
+    assert nodes['members'].sum() == 30
+
+
+def test_build_top_view_empty(index):
+    assert build_top_view(index, (0, np.inf), ['REVERSAL'], 10) is None
+    assert build_top_view(index, (0, np.inf), ['INCOMING'], 10, membership_of=lambda names: np.zeros(len(names)),
+                          communities=(7,)) is None
+
+
+# Memo tab Network Analysis: st.cache_data di atas build_top_view dengan argumen
+# view_args (index tidak ikut di-hash). State sama -> satu komputasi.
+def test_memo_key_follows_filter_state(index):
+    st = pytest.importorskip("streamlit")
+    calls = []
+
+    @st.cache_data(max_entries=32, show_spinner=False)
+    def build_network_view(_index, amount_range, selected_types, top_n, lod_keep=None,
+                           community_weight=None, communities=(), collapse_communities=False):
+        calls.append((amount_range, selected_types, top_n))
+        return build_top_view(_index, amount_range, selected_types, top_n, lod_keep)
+
+    first = build_network_view(index, *view_args((0, 1e6), ['OUTGOING', 'INCOMING'], 20))
+    again = build_network_view(index, *view_args((0.0, 1_000_000.0), ['INCOMING', 'OUTGOING'], 20))
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first[0], again[0])
+
+    build_network_view(index, *view_args((0, 5e5), ['INCOMING', 'OUTGOING'], 20))
+    build_network_view(index, *view_args((0, 1e6), ['INCOMING'], 20))
+    build_network_view(index, *view_args((0, 1e6), ['INCOMING', 'OUTGOING'], 10))
+    assert len(calls) == 4
+
+
+@pytest.fixture(scope="module")
+def top(df):
+    graph = ArrayGraph.from_edge_frame(df)
+    tx_value = graph.in_degree('weight_amount') + graph.out_degree('weight_amount')
+    nodes = pd.DataFrame({'node': graph.names, 'tx_value': tx_value, 'degree': graph.degree()})
+    return nodes, graph.edge_frame()
+
+
+def merged_edges(edges, mapping):
+    # Agregasi acuan: map endpoint ke grupnya, buang self-loop, jumlahkan per pasangan
+    mapped = edges.assign(source=edges['source'].replace(mapping), target=edges['target'].replace(mapping))
+    mapped = mapped[mapped['source'] != mapped['target']]
+    return mapped.groupby(['source', 'target'])[['weight_amount', 'weight_trx']].sum()
+
+
+def test_bank_code():
+    codes = bank_code(["E00001 (B1)", "PT A (JKT) (B14)", "KAS", "E00002 (B3) X", None])
+    assert codes.iloc[:2].tolist() == ["B1", "B14"]
+    assert codes.iloc[2:].isna().all()
+
+
+def test_collapse_by_bank_small_frame():
+    nodes = pd.DataFrame({
+        'node': ["A (B1)", "B (B2)", "C (B2)", "D (B2)", "E"],
+        'tx_value': [100.0, 50.0, 3.0, 2.0, 1.0],
+        'degree': [3, 2, 1, 1, 1],
+    })
+    edges = pd.DataFrame({
+        'source': ["A (B1)", "A (B1)", "C (B2)", "B (B2)", "E"],
+        'target': ["C (B2)", "D (B2)", "D (B2)", "C (B2)", "A (B1)"],
+        'weight_amount': [10.0, 20.0, 5.0, 7.0, 1.0],
+        'weight_trx': [1.0, 2.0, 1.0, 3.0, 1.0],
+        'type': "OUTGOING",
+    })
+    merged_nodes, merged = collapse_by_bank(nodes, edges, keep=2)
+
+    assert merged_nodes['node'].tolist() == ["A (B1)", "B (B2)", "Lainnya (B2)", "Lainnya (?)"]
+    assert merged_nodes['tx_value'].tolist() == [100.0, 50.0, 5.0, 1.0]
+    assert merged_nodes['degree'].tolist() == [3, 2, 2, 1]
+    assert merged_nodes['members'].tolist() == [1, 1, 2, 1]
+    # C -> D masuk grup yang sama (self-loop dibuang); A -> C dan A -> D digabung
+    merged = merged.set_index(['source', 'target'])
+    assert merged.loc[("A (B1)", "Lainnya (B2)"), ['weight_amount', 'weight_trx']].tolist() == [30.0, 3.0]
+    assert merged.loc[("B (B2)", "Lainnya (B2)"), 'weight_amount'] == 7.0
+    assert merged.loc[("Lainnya (?)", "A (B1)"), 'weight_amount'] == 1.0
+    assert len(merged) == 3
+
+    same_nodes, same_edges = collapse_by_bank(nodes, edges, keep=None)
+    assert (same_nodes['members'] == 1).all() and same_edges is edges
+
+
+@pytest.mark.parametrize("keep", [10, 100])
+def test_collapse_by_bank_preserves_totals(top, keep):
+    nodes, edges = top
+    merged_nodes, merged = collapse_by_bank(nodes, edges, keep)
+
+    assert len(merged_nodes) > keep and merged_nodes['node'].is_unique
+    assert merged_nodes['tx_value'].sum() == pytest.approx(nodes['tx_value'].sum(), rel=1e-12)
+    assert merged_nodes['members'].sum() == len(nodes)
+    kept = nodes.sort_values('tx_value', ascending=False, kind='stable')['node'].iloc[:keep]
+    assert merged_nodes['node'].iloc[:keep].tolist() == kept.tolist()
+
+    # Tiap pasangan edge muncul sekali dan bobotnya sama dengan agregasi acuan
+    rest = nodes[~nodes['node'].isin(kept)]
+    mapping = dict(zip(rest['node'], "Lainnya (" + bank_code(rest['node']).fillna('?') + ")"))
+    expected = merged_edges(edges, mapping)
+    assert not merged.duplicated(['source', 'target']).any()
+    actual = merged.set_index(['source', 'target']).loc[expected.index]
+    assert len(merged) == len(expected)
+    np.testing.assert_allclose(actual['weight_amount'], expected['weight_amount'], rtol=1e-12)
+    np.testing.assert_allclose(actual['weight_trx'], expected['weight_trx'], rtol=1e-12)
+
+
+def test_collapse_by_community(top):
+    nodes, edges = top
+    nodes = nodes.assign(community=np.arange(len(nodes)) % 4)
+    merged_nodes, merged = collapse_by_community(nodes, edges)
+
+    assert sorted(merged_nodes['node']) == [f"Komunitas {c}" for c in range(4)]
+    expected = nodes.groupby('community')[['tx_value', 'degree']].sum()
+    merged_nodes = merged_nodes.set_index('community').loc[expected.index]
+    np.testing.assert_allclose(merged_nodes['tx_value'], expected['tx_value'], rtol=1e-12)
+    assert merged_nodes['degree'].tolist() == expected['degree'].tolist()
+    assert merged_nodes['members'].tolist() == nodes['community'].value_counts().sort_index().tolist()
+
+    mapping = dict(zip(nodes['node'], "Komunitas " + nodes['community'].astype(str)))
+    expected = merged_edges(edges, mapping)
+    assert len(merged) == len(expected) and not merged.duplicated(['source', 'target']).any()
+    actual = merged.set_index(['source', 'target']).loc[expected.index]
+    np.testing.assert_allclose(actual['weight_amount'], expected['weight_amount'], rtol=1e-12)
+
+
+def test_compute_layout_finite_and_deterministic(top):
+    nodes, edges = top
+    nodes = nodes.iloc[:300]
+    laid_out = compute_layout(nodes, edges, seed=3)
+    assert laid_out['node'].tolist() == nodes['node'].tolist()
+    assert np.isfinite(laid_out[['x', 'y']].to_numpy()).all()
+    assert laid_out[['x', 'y']].abs().to_numpy().max() > 0
+    pd.testing.assert_frame_equal(compute_layout(nodes, edges, seed=3), laid_out)
+
+    # Node tanpa edge dan graf satu node tetap mendapat posisi berhingga
+    isolated = compute_layout(nodes.iloc[:5], edges.iloc[:0])
+    single = compute_layout(nodes.iloc[:1], edges)
+    assert np.isfinite(isolated[['x', 'y']].to_numpy()).all()
+    assert np.isfinite(single[['x', 'y']].to_numpy()).all()
+
+
+def test_render_network_html_uses_server_positions(top):
+    pytest.importorskip("pyvis")
+    nodes, edges = top
+    nodes = compute_layout(nodes.iloc[:20], edges)
+    edges = edges[edges['source'].isin(nodes['node']) & edges['target'].isin(nodes['node'])]
+
+    html = render_network_html(nodes, edges, max_degree=nodes['degree'].max())
+    assert '"physics": {\n        "enabled": false' in html
+    for x, y in nodes[['x', 'y']].itertuples(index=False):
+        assert f'"x": {x}, "y": {y}' in html
+
+    html = render_network_html(nodes.drop(columns=['x', 'y']), edges, max_degree=nodes['degree'].max())
+    assert '"physics": {\n        "enabled": true' in html and '"x": ' not in html
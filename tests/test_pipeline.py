@@ -0,0 +1,81 @@
+import os
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import parse_args, run_pipeline, stage_graph
+from transactions import random_transactions
+
+
+# Graf notebook: hanya 'INCOMING' yang dibalik, tipe lain dianggap OUTGOING.
+# Key memakai f-string (nilai kosong -> "nan") seperti pipe_key; notebook asli
+# menjumlahkan Series sehingga key baris tsb menjadi NaN.
+def notebook_graph(df):
+    G = nx.DiGraph()
+    for _, row in df.iterrows():
+        debitor = f"{str(row['debitor_name']).strip()}|{row['debitor_bank']}"
+        lawan = f"{str(row['sender_recipient_name']).strip()}|{row['sender_recipient_bank']}"
+        src, dst = (lawan, debitor) if row['type'] == 'INCOMING' else (debitor, lawan)
+        if not G.has_edge(src, dst):
+            G.add_edge(src, dst, weight_amount=0.0, weight_trx=0)
+        G[src][dst]['weight_amount'] += row['amount_tx_idr']
+        G[src][dst]['weight_trx'] += row['trx']
+    return G
+
+
+def test_metric_graph_matches_notebook_for_other_types():
+    df = random_transactions(500, seed=1)
+    df['type'] = df['type'].astype(object)
+    df.loc[::7, 'type'] = "REVERSAL"
+    df.loc[::11, 'type'] = "incoming"
+    df.loc[::13, 'sender_recipient_bank'] = np.nan
+
+    edges = stage_graph(None, df).edge_frame()
+    expected = notebook_graph(df)
+    result = {(s, t): (a, n) for s, t, a, n in
+              zip(edges['source'], edges['target'], edges['weight_amount'], edges['weight_trx'])}
+    assert set(result) == set(expected.edges)
+    for (s, t), (amount, trx) in result.items():
+        assert amount == pytest.approx(expected[s][t]['weight_amount'])
+        assert trx == expected[s][t]['weight_trx']
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory):
+    root = tmp_path_factory.mktemp("pipeline")
+    path = str(root / "transactions.xlsx")
+    random_transactions(400, seed=0).to_excel(path, index=False)
+    return root, path
+
+
+def pipeline_args(root, src, out_dir, *extra):
+    return parse_args(["--src", src, "--out-dir", str(root / out_dir), "--cache-dir", str(root / "cache"),
+                       "--betweenness-k", "16", "--n-samples", "10", "--workers", "1", *extra])
+
+
+def test_cached_rerun_writes_every_artifact(source):
+    root, src = source
+    run_pipeline(pipeline_args(root, src, "first"))
+    _, summary = run_pipeline(pipeline_args(root, src, "second"))
+
+    status = {record['stage']: record['status'] for record in summary['stages']}
+    assert status['metrics'] == 'cached'
+    assert not [name for name in os.listdir(root / "cache" / "pipeline") if name.endswith(".tmp")]
+    assert sorted(os.listdir(root / "first")) == sorted(os.listdir(root / "second"))
+    for name in ('df_metric.csv', 'df_metric2.csv'):
+        pd.testing.assert_frame_equal(pd.read_csv(root / "first" / name), pd.read_csv(root / "second" / name))
+
+
+def test_skip_non_cacheable_stage_with_running_dependents(source):
+    root, src = source
+    with pytest.raises(ValueError, match="ingest"):
+        run_pipeline(pipeline_args(root, src, "skip", "--skip", "ingest"))
+
+    run_pipeline(pipeline_args(root, src, "warm"))
+    _, summary = run_pipeline(pipeline_args(root, src, "skip", "--skip", "ingest", "graph", "tables"))
+    status = {record['stage']: record['status'] for record in summary['stages']}
+    assert status['graph'] == 'skipped'
+    assert status['metric_tables'] == 'run'
+    assert os.path.exists(root / "skip" / "df_metric2.csv")
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def no_active_run():
+    profiling.start_run("reset", enabled=False)
+    yield
+    profiling.start_run("reset", enabled=False)
+
+
+def read_log(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("env, params, expected", [
+    ("1", None, True),
+    ("", None, False),
+    ("", {'profile': "true"}, True),
+    ("1", {'profile': "0"}, False),
+    ("", {}, False),
+])
+def test_is_enabled(monkeypatch, env, params, expected):
+    monkeypatch.setenv(profiling.ENV_VAR, env)
+    assert profiling.is_enabled(params) is expected
+
+
+def test_span_without_run_is_noop():
+    with profiling.span('tahap', rows=3) as stage:
+        stage['nodes'] = 1
+        profiling.annotate(cache_hit=True)
+    assert profiling.current_run() is None
+
+
+def test_nested_spans_and_counters(tmp_path):
+    log_path = str(tmp_path / "profile.jsonl")
+    run = profiling.start_run("rerun", session="s1")
+    with profiling.span('load', cache_hit=True):
+        profiling.annotate(cache_hit=False, rows=10)
+        with profiling.span('parse') as stage:
+            stage['rows'] = 5
+    with profiling.span('render'):
+        pass
+    profiling.finish_run(run, log_path)
+
+    assert profiling.current_run() is None
+    assert [(s['name'], s['depth']) for s in run.spans] == [('load', 0), ('parse', 1), ('render', 0)]
+    load, parse, _ = run.spans
+    assert load['cache_hit'] is False and load['rows'] == 10 and parse['rows'] == 5
+    assert all(s['seconds'] is not None for s in run.spans)
+    assert load['seconds'] >= parse['seconds'] and run.seconds >= load['seconds']
+
+    record, = read_log(log_path)
+    assert record['run'] == "rerun" and record['session'] == "s1" and record['run_id'] == run.id
+    assert record['spans'] == run.spans
+
+    rows = profiling.breakdown(run)
+    assert [row['tahap'] for row in rows] == ['load', '  parse', 'render']
+    assert rows[0]['rows'] == 10 and 'depth' not in rows[0]
+    assert profiling.breakdown(None) == []
+
+
+def test_span_closes_on_error():
+    run = profiling.start_run("rerun")
+    with pytest.raises(RuntimeError):
+        with profiling.span('gagal'):
+            raise RuntimeError("x")
+    with profiling.span('berikutnya'):
+        pass
+    assert run.spans[0]['seconds'] is not None
+    assert run.spans[1]['depth'] == 0
+
+
+def test_run_or_span_standalone_writes_one_line(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "sub" / "profile.jsonl")
+    monkeypatch.setenv(profiling.LOG_ENV_VAR, log_path)
+    for _ in range(2):
+        with profiling.run_or_span('tab_network', session="s1") as run:
+            with profiling.span('filter_graph'):
+                pass
+        assert profiling.current_run() is None
+
+    records = read_log(log_path)
+    assert [r['run'] for r in records] == ['tab_network', 'tab_network']
+    assert records[0]['run_id'] != records[1]['run_id']
+    assert [s['name'] for s in records[1]['spans']] == ['filter_graph']
+    assert run.seconds is not None
+
+
+def test_run_or_span_inside_run_becomes_span(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "profile.jsonl")
+    monkeypatch.setenv(profiling.LOG_ENV_VAR, log_path)
+    run = profiling.start_run("rerun")
+    with profiling.run_or_span('tab_dashboard') as inner:
+        with profiling.span('dashboard_cube'):
+            pass
+    assert inner is run
+    assert [(s['name'], s['depth']) for s in run.spans] == [('tab_dashboard', 0), ('dashboard_cube', 1)]
+    assert not (tmp_path / "profile.jsonl").exists()
+
+    profiling.finish_run(run)
+    assert len(read_log(log_path)) == 1
+
+
+def test_disabled_run_writes_nothing(tmp_path, monkeypatch):
+    log_path = tmp_path / "profile.jsonl"
+    monkeypatch.setenv(profiling.LOG_ENV_VAR, str(log_path))
+    with profiling.run_or_span('tab_network', enabled=False) as run:
+        with profiling.span('filter_graph'):
+            pass
+    assert run is None and not log_path.exists()
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+
+import pytest
+
+import query_service
+from query_service import QueryService
+from synthetic import generate_transactions, write_transactions
+
+
+@pytest.fixture
+def service(tmp_path):
+    src = str(tmp_path / "transactions.parquet")
+    write_transactions(generate_transactions(300, seed=0), src)
+    return QueryService(src, str(tmp_path), str(tmp_path / "cache"))
+
+
+def get(service, path, **params):
+    status, _, body = service.handle(path, {k: [str(v)] for k, v in params.items()})
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize("top_n", [0, -3])
+def test_subgraph_rejects_non_positive_top_n(service, top_n):
+    status, body = get(service, "/subgraph", top_n=top_n)
+    assert status == 400 and "top_n" in body['error']
+
+
+@pytest.mark.parametrize("name", ["version", "endpoint"])
+def test_reserved_parameter_names_do_not_break_cache_key(service, name):
+    status, body = get(service, "/subgraph", top_n=5, **{name: "x"})
+    assert status == 200 and len(body['rows']) == 5
+
+
+def test_unexpected_error_returns_500_and_is_counted(service):
+    def broken(params):
+        raise RuntimeError("boom")
+
+    service.endpoints['/subgraph'] = broken
+    status, body = get(service, "/subgraph")
+    assert status == 500 and "boom" in body['error']
+    assert service.stats()['latency']['/subgraph']['errors'] == 1
+
+
+def test_subgraph_follows_source_changes(service):
+    _, before = get(service, "/subgraph", top_n=1000)
+    write_transactions(generate_transactions(600, seed=1), service.src)
+    os.utime(service.src, (1, 1))
+    _, after = get(service, "/subgraph", top_n=1000)
+    assert after['total'] != before['total']
+    assert after['total'] == service.index.graph(float('-inf'), float('inf'), list(service.index.types)).n_nodes
+
+
+def test_index_checks_stat_and_rebuilds_once(service, monkeypatch):
+    calls = {'sha256': 0, 'build': 0}
+    sha256, build = query_service.source_sha256, query_service.FilterIndex
+
+    def counting_sha256(*args):
+        calls['sha256'] += 1
+        return sha256(*args)
+
+    def counting_build(df):
+        calls['build'] += 1
+        return build(df)
+
+    monkeypatch.setattr(query_service, "source_sha256", counting_sha256)
+    monkeypatch.setattr(query_service, "FilterIndex", counting_build)
+
+    first = service.index
+    for _ in range(5):
+        assert get(service, "/subgraph", top_n=3)[0] == 200
+    assert calls == {'sha256': 1, 'build': 1}
+
+    # Hanya mtime berubah: hash dihitung ulang, index lama tetap dipakai
+    os.utime(service.src, (1, 1))
+    assert service.index is first
+    assert calls == {'sha256': 2, 'build': 1}
+
+    # Isi berubah: banyak request bersamaan, index dibangun sekali
+    write_transactions(generate_transactions(500, seed=2), service.src)
+    os.utime(service.src, (2, 2))
+    threads = [threading.Thread(target=get, args=(service, "/subgraph")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == {'sha256': 3, 'build': 2}
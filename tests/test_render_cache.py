@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+
+import pytest
+
+from ingest import load_versioned_transactions
+from render_cache import RenderCache, filter_key
+from transactions import random_transactions
+
+
+def render(value):
+    return value
+
+
+def test_filter_key_ignores_list_order():
+    assert filter_key(types=['A', 'B'], top_n=5) == filter_key(top_n=5, types=['B', 'A'])
+    assert filter_key(amount_range=(1, 2)) != filter_key(amount_range=(2, 1))
+
+
+def test_lru_evicts_by_entry_count():
+    cache = RenderCache(max_entries=2)
+    cache.get_or_render('a', render, "A")
+    cache.get_or_render('b', render, "B")
+    # 'a' dipakai lagi sehingga 'b' menjadi yang paling lama
+    assert cache.get_or_render('a', render, "lain") == "A"
+    cache.get_or_render('c', render, "C")
+
+    assert cache.get_or_render('a', render, "baru") == "A"
+    assert cache.get_or_render('b', render, "B2") == "B2"
+    stats = cache.stats()
+    assert stats['evictions'] == 2 and stats['entries'] == 2
+    assert stats['hits'] == 2 and stats['misses'] == 4
+
+
+def test_lru_evicts_by_total_bytes():
+    cache = RenderCache(max_entries=100, max_bytes=10)
+    cache.get_or_render('a', render, "x" * 4)
+    cache.get_or_render('b', render, "x" * 4)
+    cache.get_or_render('c', render, "x" * 4)
+    assert cache.stats()['entries'] == 2 and cache.stats()['bytes'] == 8
+    assert cache.get_or_render('a', render, "y") == "y"
+
+    # Nilai lebih besar dari batas dikembalikan tanpa disimpan dan tanpa
+    # mengusir entri lain
+    before = cache.stats()
+    assert cache.get_or_render('big', render, "z" * 11) == "z" * 11
+    assert cache.stats()['entries'] == before['entries'] and cache.stats()['bytes'] == before['bytes']
+
+
+def test_clear():
+    cache = RenderCache()
+    cache.get_or_render('a', render, "A")
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+    assert cache.get_or_render('a', render, "B") == "B"
+
+
+def run_concurrently(n, fn):
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+# Render pertama ditahan sampai semua thread lain sudah menunggu key yang sama
+def blocking_render(cache, n_waiters, outcome):
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return outcome()
+
+    def waiters_ready():
+        deadline = time.monotonic() + 5
+        while cache.stats()['waits'] < n_waiters and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+
+    return slow, calls, waiters_ready
+
+
+def test_concurrent_requests_render_once():
+    cache = RenderCache()
+    slow, calls, waiters_ready = blocking_render(cache, 7, lambda: "<html>")
+    threads, results, errors = run_concurrently(8, lambda: cache.get_or_render('k', slow))
+    waiters_ready()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["<html>"] * 8 and errors == [None] * 8
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['waits'] == 7 and stats['entries'] == 1
+
+
+def test_render_error_reaches_every_waiter_without_poisoning_key():
+    cache = RenderCache()
+
+    def fail():
+        raise RuntimeError("render gagal")
+
+    slow, calls, waiters_ready = blocking_render(cache, 4, fail)
+    threads, results, errors = run_concurrently(5, lambda: cache.get_or_render('k', slow))
+    waiters_ready()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert all(isinstance(e, RuntimeError) and "render gagal" in str(e) for e in errors)
+    assert cache.stats()['entries'] == 0
+
+    # Key tidak tertahan: request berikutnya merender ulang dan tersimpan
+    assert cache.get_or_render('k', render, "ok") == "ok"
+    assert cache.get_or_render('k', render, "lain") == "ok"
+
+
+# Key HTML memakai versi dari frame yang dimuat: file sumber yang berubah setelah
+# frame dimuat tidak mengubah key frame lama, dan memuat ulang menghasilkan key
+# (dan HTML) baru yang sesuai isi frame baru
+def test_view_key_follows_loaded_frame(tmp_path):
+    src = str(tmp_path / "transactions.csv")
+    cache_dir = str(tmp_path / "cache")
+    random_transactions(200, seed=0).to_csv(src, index=False)
+
+    cache = RenderCache()
+
+    def view(df, version):
+        key = filter_key(data=version, types=['INCOMING', 'OUTGOING'], top_n=10)
+        return cache.get_or_render(key, lambda: f"<html>{len(df)} {df['amount_tx_idr'].sum()}</html>")
+
+    def expected_html(df):
+        return f"<html>{len(df)} {df['amount_tx_idr'].sum()}</html>"
+
+    old_df, old_version = load_versioned_transactions(src, cache_dir)
+    assert view(old_df, old_version) == expected_html(old_df)
+
+    random_transactions(300, seed=1).to_csv(src, index=False)
+    os.utime(src, (1, 1))
+    # Frame lama masih dipakai: key dan HTML tetap milik frame lama
+    assert view(old_df, old_version) == expected_html(old_df)
+
+    new_df, new_version = load_versioned_transactions(src, cache_dir)
+    assert new_version != old_version and len(new_df) != len(old_df)
+    assert view(new_df, new_version) == expected_html(new_df)
+    assert cache.stats()['misses'] == 2
+
+    # Hanya mtime berubah: versi (dan entri cache) tetap
+    os.utime(src, (2, 2))
+    assert load_versioned_transactions(src, cache_dir)[1] == new_version
+
+
+def test_stats_hit_rate():
+    cache = RenderCache(max_entries=1)
+    for _ in range(3):
+        cache.get_or_render('a', render, "A")
+    assert cache.stats()['hit_rate'] == pytest.approx(2 / 3)
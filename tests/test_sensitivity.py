@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import legacy_core_candidates
+from sensitivity import core_candidates
+
+
+# Metrik hasil MinMax dengan banyak nilai kembar: beberapa node identik di semua
+# metrik (skor seri untuk setiap bobot), banyak nol, dan satu baris NaN
+def tied_metrics(n_nodes=60, seed=0):
+    rng = np.random.default_rng(seed)
+    metrics = ['m1', 'm2', 'm3']
+    df = pd.DataFrame({'node': [f"N{i}|B1" for i in range(n_nodes)]})
+    for m in metrics:
+        df[m] = rng.integers(0, 5, n_nodes) / 4
+    df.loc[10:14, metrics] = df.loc[3, metrics].to_numpy()
+    df.loc[20, 'm2'] = np.nan
+    return df, metrics
+
+
+@pytest.mark.parametrize("k", [1, 5, 12, 60])
+def test_core_candidates_matches_loop_with_ties(k):
+    df, metrics = tied_metrics()
+    expected = legacy_core_candidates(df, metrics, k=k, n_samples=50, seed=3, thresh=0.0)
+    result = core_candidates(df, metrics, k=k, n_samples=50, seed=3, thresh=0.0, max_chunk_cells=7 * len(df))
+    pd.testing.assert_series_equal(result, expected)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from graph_core import ArrayGraph
+from ingest import FingerprintSet, prepare_transactions, read_source, stream_edge_table
+from transactions import random_transactions
+
+
+# Duplikat tersebar: salinan baris awal di akhir file (potongan berbeda),
+# satu baris kembar berdampingan (potongan yang sama), dan tipe tak dikenal.
+# Lebih dari 1024 edge unik agar kolom edge sempat diperbesar.
+def transactions_with_duplicates():
+    df = random_transactions(2_500, n_entities=3_000, seed=5)
+    df['type'] = df['type'].astype(object)
+    df.loc[[3, 50, 120], 'type'] = "REVERSAL"
+    return pd.concat([df.iloc[:10], df.iloc[[10, 10]], df.iloc[11:], df.iloc[:25]], ignore_index=True)
+
+
+def write_source(df, path):
+    if path.endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+@pytest.mark.parametrize("chunk_rows", [7, 300, 10_000])
+def test_stream_matches_in_memory(tmp_path, ext, chunk_rows):
+    df = transactions_with_duplicates()
+    path = str(tmp_path / f"transactions{ext}")
+    write_source(df, path)
+
+    full = ArrayGraph.from_edge_frame(prepare_transactions(read_source(path)))
+    table = stream_edge_table(path, chunk_rows)
+    streamed = ArrayGraph.from_edge_frame(table.edge_frame())
+
+    assert full.n_edges > 1024
+    assert table.rows_read == len(df)
+    assert table.rows_kept == len(read_source(path).drop_duplicates())
+    assert table.n_edges == full.n_edges
+    assert np.array_equal(full.names, streamed.names)
+    assert np.array_equal(full.src, streamed.src) and np.array_equal(full.dst, streamed.dst)
+    assert np.array_equal(full.edge_type, streamed.edge_type)
+    for weight in ('weight_amount', 'weight_trx'):
+        assert np.array_equal(full.weights[weight], streamed.weights[weight])
+
+
+def test_fingerprint_set_across_runs():
+    seen = FingerprintSet()
+    for start in range(0, 100, 10):
+        seen.add(np.arange(start, start + 15, dtype=np.uint64))
+    assert len(seen.to_array()) == 105
+    assert seen.contains(np.array([0, 104, 105], dtype=np.uint64)).tolist() == [True, True, False]
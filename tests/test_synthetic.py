@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from edges import build_edge_columns
+from ingest import load_transactions
+from synthetic import COLUMNS, generate_transactions, write_transactions
+
+
+@pytest.fixture(scope="module")
+def df():
+    return generate_transactions(20_000, n_banks=8, seed=0)
+
+
+def test_schema_matches_ingest(df, tmp_path):
+    assert list(df.columns) == COLUMNS
+    assert not df.isna().any().any()
+    assert set(df['type']) == {'INCOMING', 'OUTGOING'}
+    assert pd.api.types.is_float_dtype(df['amount_tx_idr']) and (df['amount_tx_idr'] > 0).all()
+    assert pd.api.types.is_integer_dtype(df['trx']) and (df['trx'] >= 1).all()
+
+    # Setiap baris menjadi satu edge berarah (tidak ada tipe di luar INCOMING/OUTGOING)
+    edges = build_edge_columns(df)
+    assert edges['source'].notna().all() and edges['target'].notna().all()
+
+    for ext in ("csv", "parquet"):
+        src = str(tmp_path / f"transactions.{ext}")
+        write_transactions(df.iloc[:2_000], src)
+        loaded = load_transactions(src, str(tmp_path / f"cache_{ext}"))
+        assert len(loaded) == len(df.iloc[:2_000].drop_duplicates())
+        assert set(COLUMNS) | {'source', 'target'} <= set(loaded.columns)
+        assert loaded['source'].notna().all()
+
+
+@pytest.mark.parametrize("n_rows, n_banks", [(1, 1), (500, 3), (20_000, 8)])
+def test_row_and_bank_counts(n_rows, n_banks):
+    df = generate_transactions(n_rows, n_customers=50, n_counterparties=80, n_banks=n_banks, seed=1)
+    assert len(df) == n_rows
+    banks = pd.concat([df['debitor_bank'], df['sender_recipient_bank']])
+    assert set(banks) <= {f"B{i}" for i in range(1, n_banks + 1)}
+    if n_rows >= 500:
+        assert banks.nunique() == n_banks
+    assert df['debitor_name'].nunique() <= 50
+    assert df['debitor_name'].str.startswith("C").all()
+    assert df['sender_recipient_name'].str[0].isin(["C", "P"]).all()
+
+
+# Lognormal murni (sigma 1.5) memberi ~20% nominal pada 1% transaksi teratas
+# dan max/median ~400; ekor Pareto menaikkan keduanya jauh di atas itu.
+# Aktivitas debitor juga terkonsentrasi pada sedikit nasabah (Zipf).
+def test_amounts_and_activity_are_heavy_tailed(df):
+    amount = np.sort(df['amount_tx_idr'].to_numpy())[::-1]
+    assert amount[:len(amount) // 100].sum() / amount.sum() > 0.35
+    assert amount[0] / np.median(amount) > 2_000
+
+    counts = df['debitor_name'].value_counts()
+    assert counts.iloc[:len(counts) // 100].sum() / len(df) > 0.2
+    assert df['debitor_bank'].value_counts().index[0] == "B1"
+
+
+def test_same_seed_same_output(df):
+    pd.testing.assert_frame_equal(generate_transactions(20_000, n_banks=8, seed=0), df)
+    assert not generate_transactions(20_000, n_banks=8, seed=1).equals(df)
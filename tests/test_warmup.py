@@ -0,0 +1,67 @@
+import threading
+
+from warmup import Warmup
+
+
+def test_failing_task_sets_event_and_records_error():
+    ran = []
+
+    def broken():
+        raise RuntimeError("data tidak ada")
+
+    warmup = Warmup([
+        [('data', broken)],
+        [('cube', lambda: ran.append('cube')), ('index', lambda: ran.append('index'))],
+    ]).start()
+
+    # Loop polling dashboard: harus selesai walau task yang ditunggu gagal
+    polls = 0
+    while not warmup.wait(['data'], timeout=0.05):
+        polls += 1
+        assert polls < 100
+    assert warmup.wait(timeout=5) and warmup.done()
+
+    summary = {row['task']: row for row in warmup.summary()}
+    assert summary['data']['status'] == 'gagal' and "data tidak ada" in summary['data']['error']
+    assert summary['cube']['status'] == 'selesai' and summary['cube']['error'] is None
+    assert sorted(ran) == ['cube', 'index']
+    assert warmup.progress() == 1.0 and warmup.running() == []
+
+
+def test_stages_run_in_order_and_tasks_within_stage_in_parallel():
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def parallel(name):
+        def task():
+            both_running.wait()
+            order.append(name)
+        return task
+
+    warmup = Warmup([
+        [('a', parallel('a')), ('b', parallel('b'))],
+        [('c', lambda: order.append('c'))],
+    ], workers=2).start()
+    assert warmup.wait(timeout=5)
+    assert sorted(order[:2]) == ['a', 'b'] and order[2] == 'c'
+    assert all(row['status'] == 'selesai' for row in warmup.summary())
+
+
+def test_wait_times_out_while_task_runs():
+    release = threading.Event()
+    warmup = Warmup([[('lambat', lambda: release.wait(5))], [('berikut', lambda: None)]]).start()
+    try:
+        assert not warmup.wait(['lambat'], timeout=0.05)
+        assert not warmup.done() and warmup.running() == ['lambat']
+        assert warmup.progress() == 0.0
+    finally:
+        release.set()
+    assert warmup.wait(timeout=5) and warmup.elapsed() > 0
+
+
+def test_start_is_idempotent():
+    calls = []
+    warmup = Warmup([[('data', lambda: calls.append(1))]])
+    assert warmup.elapsed() == 0.0
+    warmup.start().start()
+    assert warmup.wait(timeout=5) and calls == [1]
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+
+# Transaksi acak dengan skema workbook. Aktivitas entitas berekor berat (pareto)
+# sehingga graf punya hub seperti data asli; amount kelipatan 1000 supaya ada
+# jarak terpendek yang seri pada graf berbobot.
+def random_transactions(n_rows, n_entities=None, n_banks=5, seed=0):
+    rng = np.random.default_rng(seed)
+    n_entities = n_entities or max(20, n_rows // 4)
+    activity = rng.pareto(1.5, n_entities) + 1
+    activity /= activity.sum()
+    names = np.array([f"E{i:05d}" for i in range(n_entities)], dtype=object)
+    banks = np.array([f"B{i % n_banks + 1}" for i in range(n_entities)], dtype=object)
+
+    debitor = rng.choice(n_entities, n_rows, p=activity)
+    lawan = rng.choice(n_entities, n_rows, p=activity)
+    return pd.DataFrame({
+        'debitor_name': names[debitor],
+        'debitor_bank': banks[debitor],
+        'sender_recipient_name': names[lawan],
+        'sender_recipient_bank': banks[lawan],
+        'type': np.where(rng.random(n_rows) < 0.5, 'INCOMING', 'OUTGOING'),
+        'amount_tx_idr': rng.integers(1, 1_000, n_rows) * 1000.0,
+        'trx': rng.integers(1, 10, n_rows),
+    })